@@ -0,0 +1,9 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fire_door_oa.settings')
+# ASGI 部署默认启用异步视图，设置 ASYNC_VIEWS=False 可退回同步视图
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
@@ -1,7 +1,8 @@
-import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
-import dj_database_url
+
+from system.db.pool import database_from_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -29,25 +30,33 @@ DJANGO_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
+    'rest_framework',
     'corsheaders',
 ]
 
 LOCAL_APPS = [
     # 您的应用
+    'users',
+    'orders',
+    'system',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # 中间件
 MIDDLEWARE = [
+    'system.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'system.middleware.StaticFilesMiddleware',
+    'system.middleware.ReplicaRoutingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'system.middleware.RequestProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'fire_door_oa.urls'
@@ -72,13 +81,9 @@ WSGI_APPLICATION = 'fire_door_oa.wsgi.application'
 
 # 数据库配置
 if config('DATABASE_URL', default=None):
-    # 生产环境使用PostgreSQL
+    # 生产环境使用PostgreSQL，默认启用进程内连接池，选项见 system.db.pool.database_from_url
     DATABASES = {
-        'default': dj_database_url.parse(
-            config('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': database_from_url(config('DATABASE_URL'), conn_max_age=600)
     }
 else:
     # 开发环境使用SQLite
@@ -89,6 +94,119 @@ else:
         }
     }
 
+# 只读副本：列表、统计、下载等只读请求的查询走副本，写操作和刚写过数据的客户端走主库
+if config('DATABASE_REPLICA_URL', default=None):
+    DATABASES['replica'] = database_from_url(config('DATABASE_REPLICA_URL'), conn_max_age=600)
+elif config('SQLITE_REPLICA', default=False, cast=bool):
+    # 本地用第二个 SQLite 文件模拟副本，用 manage.py sync_sqlite_replica 从主库复制数据
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('SQLITE_REPLICA_PATH', default=str(BASE_DIR / 'db_replica.sqlite3')),
+    }
+
+if 'replica' in DATABASES:
+    # 用本配置跑测试时副本直接复用主库连接；manage.py test 默认的 test_settings 用两个独立的 SQLite 文件
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['system.db.router.ReplicaRouter']
+
+DATABASE_REPLICA = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': config('REPLICA_STICKY_SECONDS', default=5, cast=int),
+    'RETRY_SECONDS': config('REPLICA_RETRY_SECONDS', default=30, cast=int),
+}
+
+# 自定义用户模型
+AUTH_USER_MODEL = 'users.User'
+
+# 缓存配置：多个 worker 之间必须共享（认证缓存失效、统计缓存等）
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    # 单机部署时同一主机上的 gunicorn worker 通过文件缓存共享
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+# gunicorn worker 数，与 gunicorn.conf.py 读取同一环境变量。多于一个 worker 时
+# 缓存的 add 必须跨进程原子（登录限流、幂等键的锁），manage.py check --deploy 会检查
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=2, cast=int)
+
+# 认证用户身份的缓存时间（秒），用户变更时会主动失效
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# I/O 密集的接口（列表、上传、下载）使用异步视图，asgi.py 会默认开启
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# 管理控制台汇总的缓存时间（秒），订单或用户写入时会主动失效
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+
+# 订单归档：出库或完成后超过 AFTER_DAYS 天未变动的订单由 manage.py archive_orders 分批移入归档表
+ORDER_ARCHIVE = {
+    'AFTER_DAYS': config('ORDER_ARCHIVE_AFTER_DAYS', default=180, cast=int),
+    'BATCH_SIZE': config('ORDER_ARCHIVE_BATCH_SIZE', default=500, cast=int),
+}
+
+# 订单增量同步（/api/orders/changes/）：每页条数、移除记录保留天数和等待事务提交的秒数
+ORDER_CHANGES = {
+    'LIMIT': config('ORDER_CHANGES_LIMIT', default=100, cast=int),
+    'MAX_LIMIT': config('ORDER_CHANGES_MAX_LIMIT', default=500, cast=int),
+    'RETENTION_DAYS': config('ORDER_CHANGES_RETENTION_DAYS', default=30, cast=int),
+    'SETTLE_SECONDS': config('ORDER_CHANGES_SETTLE_SECONDS', default=2, cast=int),
+}
+
+# 幂等请求：带 Idempotency-Key 的下单和流转请求，响应在共享缓存中保留 TTL 秒供重试重放
+IDEMPOTENCY = {
+    'TTL': config('IDEMPOTENCY_TTL', default=24 * 3600, cast=int),
+    'LOCK_TIMEOUT': config('IDEMPOTENCY_LOCK_TIMEOUT', default=300, cast=int),
+}
+
+# REST framework 配置
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.CachedJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    # orjson 编解码，除浮点数外输出与 DRF 自带的 JSONRenderer 逐字节一致（见 system/renderers.py）
+    'DEFAULT_RENDERER_CLASSES': [
+        'system.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'system.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # 客户端与应用之间的反向代理层数，Render 为 1。限流按 X-Forwarded-For 倒数第 NUM_PROXIES 个地址
+    # （由最外层可信代理追加）识别客户端；为 0 时只用 REMOTE_ADDR，不信任客户端发来的该请求头
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+# 登录限流（令牌桶，状态存放在共享缓存中）
+LOGIN_THROTTLE = {
+    'ip': {
+        'CAPACITY': config('LOGIN_THROTTLE_IP_CAPACITY', default=60, cast=int),
+        'REFILL_PER_MINUTE': config('LOGIN_THROTTLE_IP_PER_MINUTE', default=60, cast=int),
+    },
+    'username': {
+        'CAPACITY': config('LOGIN_THROTTLE_USER_CAPACITY', default=5, cast=int),
+        'REFILL_PER_MINUTE': config('LOGIN_THROTTLE_USER_PER_MINUTE', default=5, cast=int),
+    },
+}
+
+# 登录记录（最后登录时间和IP）批量写入间隔（秒）
+LOGIN_RECORD_FLUSH_INTERVAL = config('LOGIN_RECORD_FLUSH_INTERVAL', default=5, cast=int)
+
 # 密码验证
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -125,6 +243,10 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1",
 ]
 
+# 终端重试时携带 Idempotency-Key，并能读到响应是否为重放
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
 # 静态文件配置
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -136,8 +258,25 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# 确保媒体目录存在
-os.makedirs(MEDIA_ROOT, exist_ok=True)
+# 目录由文件存储在第一次写入时创建，启动时不访问文件系统
+
+# 对象存储（S3 兼容）：设置 S3_BUCKET 后订单文件存到对象存储，
+# 客户端通过预签名 URL 直接上传下载（见 orders/transfers.py、前端 utils/fileTransfer.js）。
+# 浏览器直传是跨域 PUT，存储桶需要为前端域名配置 CORS，允许 PUT 和 Content-Type 请求头
+S3_STORAGE = {
+    'ENDPOINT_URL': config('S3_ENDPOINT_URL', default='https://s3.amazonaws.com'),
+    'PUBLIC_ENDPOINT_URL': config('S3_PUBLIC_ENDPOINT_URL', default=''),
+    'BUCKET': config('S3_BUCKET', default=''),
+    'ACCESS_KEY': config('S3_ACCESS_KEY', default=''),
+    'SECRET_KEY': config('S3_SECRET_KEY', default=''),
+    'REGION': config('S3_REGION', default='us-east-1'),
+    'ADDRESSING_STYLE': config('S3_ADDRESSING_STYLE', default='path'),
+    'PREFIX': config('S3_PREFIX', default=''),
+    'PRESIGN_EXPIRES': config('S3_PRESIGN_EXPIRES', default=300, cast=int),
+    'MAX_UPLOAD_SIZE': config('S3_MAX_UPLOAD_SIZE', default=100 * 1024 * 1024, cast=int),
+}
+if S3_STORAGE['BUCKET']:
+    DEFAULT_FILE_STORAGE = 'system.storage.S3Storage'
 
 # 静态文件存储
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -153,3 +292,31 @@ X_FRAME_OPTIONS = 'DENY'
 
 # 默认主键字段类型
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# 慢请求采样分析（默认关闭，生产排查时通过环境变量开启）
+REQUEST_PROFILER = {
+    'ENABLED': config('PROFILER_ENABLED', default=False, cast=bool),
+    # 只保存耗时超过该阈值的请求
+    'THRESHOLD_MS': config('PROFILER_THRESHOLD_MS', default=500, cast=int),
+    # 参与采样的请求比例（0~1）
+    'SAMPLE_RATE': config('PROFILER_SAMPLE_RATE', default=1.0, cast=float),
+    # 调用栈采样间隔
+    'INTERVAL_MS': config('PROFILER_INTERVAL_MS', default=5, cast=int),
+    # 磁盘上最多保留的分析记录数（环形覆盖）
+    'MAX_PROFILES': config('PROFILER_MAX_PROFILES', default=50, cast=int),
+    'DIRECTORY': config('PROFILER_DIR', default=str(BASE_DIR / 'profiles')),
+}
+
+# 慢查询日志：按 SQL 指纹聚合并自动抓取执行计划，用 manage.py slow_queries 查看
+SLOW_QUERY_LOG = {
+    'ENABLED': config('SLOW_QUERY_LOG_ENABLED', default=False, cast=bool),
+    'THRESHOLD_MS': config('SLOW_QUERY_THRESHOLD_MS', default=100, cast=int),
+    # 每个指纹首次出现时执行一次 EXPLAIN
+    'EXPLAIN': config('SLOW_QUERY_EXPLAIN', default=True, cast=bool),
+    # 进程内统计写入磁盘的最小间隔（秒）
+    'FLUSH_INTERVAL': config('SLOW_QUERY_FLUSH_INTERVAL', default=30, cast=int),
+    'DIRECTORY': config('SLOW_QUERY_DIR', default=str(BASE_DIR / 'slow_queries')),
+}
+
+# 冷启动预算：从启动解释器到返回第一个响应的毫秒数，manage.py startup_profile 超出时报错
+STARTUP_BUDGET_MS = config('STARTUP_BUDGET_MS', default=1500, cast=int)
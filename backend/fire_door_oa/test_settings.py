@@ -0,0 +1,31 @@
+"""测试配置
+
+两个 SQLite 文件分别模拟主库和只读副本，读写分离路由的测试在真实的两个数据库上运行；
+副本的表结构和数据由测试用 sync_sqlite_replica 从主库复制。缓存用进程内存，
+不读写开发环境的文件缓存。manage.py test 默认使用本配置。
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'NAME': str(BASE_DIR / 'test_primary.sqlite3')},
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'NAME': str(BASE_DIR / 'test_replica.sqlite3')},
+    },
+}
+DATABASE_ROUTERS = ['system.db.router.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# 测试里创建用户不需要慢哈希
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -7,6 +7,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),  # 确保这个路径存在
     path('api/orders/', include('orders.urls')),  # 确保这个路径存在
+    path('api/system/', include('system.urls')),
 ]
 
 # 在开发环境中提供媒体文件服务
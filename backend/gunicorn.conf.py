@@ -0,0 +1,44 @@
+"""gunicorn 生产配置
+
+SERVER_MODE=asgi（默认）时使用 uvicorn worker 运行 fire_door_oa.asgi，
+慢速上传下载只占用事件循环上的协程；SERVER_MODE=wsgi 时退回同步 worker。
+"""
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'asgi')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'fire_door_oa.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'fire_door_oa.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# 定期重启 worker，避免长时间运行后内存增长
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    """worker 加载完应用后、开始接收请求前预热，第一个请求不再承担一次性的初始化
+
+    post_fork 时应用还没有加载（未开启 preload_app），因此放在这个钩子里。
+    """
+    if os.environ.get('WORKER_WARMUP', 'true').lower() in ('0', 'false', 'no'):
+        return
+    from system.warmup import warm_up
+
+    report = warm_up()
+    worker.log.info(f"worker {worker.pid} 预热完成: "
+                    + ', '.join(f"{name} {step['ms']}ms" for name, step in report.items()))
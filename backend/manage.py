@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fire_door_oa.settings')
+    # 测试默认用两个 SQLite 文件模拟主库和副本（见 fire_door_oa/test_settings.py）
+    default_settings = 'fire_door_oa.test_settings' if sys.argv[1:2] == ['test'] else 'fire_door_oa.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -0,0 +1,30 @@
+from django.contrib import admin
+
+from system.admin import LargeTableAdmin
+
+from .archive import ORDER_RELATED
+from .models import Order
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ('order_number', 'project_name', 'ordered_by', 'status', 'user', 'created_at')
+    # 状态筛选走 (status, -created_at) 索引；不按用户筛选，否则侧栏要列出全部用户
+    list_filter = ('status',)
+    list_select_related = ('user',)
+    autocomplete_fields = ORDER_RELATED
+    # 只用于显示搜索框，实际查询见 get_search_results
+    search_fields = ('order_number',)
+    search_help_text = '按订单号搜索（可只输入开头部分，如 YP202610）'
+    readonly_fields = ('id', 'order_number', 'created_at', 'updated_at')
+
+    def get_search_results(self, request, queryset, search_term):
+        # 订单号有唯一索引：前缀匹配写成范围查询，各数据库都能直接在索引上查找
+        term = search_term.strip().upper()
+        if not term:
+            return queryset, False
+        return queryset.filter(order_number__gte=term, order_number__lt=term + '\uffff'), False
+
+    def has_delete_permission(self, request, obj=None):
+        # 只有超级管理员或管理员角色可以删除
+        return request.user.is_superuser or request.user.has_permission('delete_orders')
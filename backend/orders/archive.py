@@ -0,0 +1,146 @@
+"""已完成订单的冷热分离
+
+出库或完成、且超过 AFTER_DAYS 天未变动的订单分批从 Order 表移到 ArchivedOrder 表，
+各队列和统计只扫描体量稳定的 Order 表。按主键查找（详情、下载）和搜索先查在用表，
+找不到再查归档表。归档只移动数据库记录，文件路径不变。
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .changes import record_removed
+from .dashboard import ARCHIVE_GROUPS, invalidate_dashboard
+from .models import ArchivedOrder, Order
+
+# 只有流程已经结束的订单会被归档
+ARCHIVE_STATUSES = ('out_warehouse', 'completed')
+
+# 订单号按月编号（YP+年月+序号），新订单号只和 Order 表比较，
+# 归档年龄不少于一个多月，当月的订单号不会出现在归档表中
+MIN_AFTER_DAYS = 32
+
+ARCHIVE_DEFAULTS = {
+    'AFTER_DAYS': 180,
+    'BATCH_SIZE': 500,
+}
+
+# 订单序列化时用到的全部外键
+ORDER_RELATED = ('user', 'reviewed_by', 'production_started_by', 'inbound_by', 'outbound_by')
+
+SEARCH_FIELDS = ('order_number', 'project_name', 'ordered_by')
+SEARCH_LIMIT = 50
+
+_FIELDS = [field.attname for field in Order._meta.concrete_fields]
+
+
+def get_archive_settings():
+    return {**ARCHIVE_DEFAULTS, **getattr(settings, 'ORDER_ARCHIVE', {})}
+
+
+def archive_cutoff(after_days=None):
+    after_days = get_archive_settings()['AFTER_DAYS'] if after_days is None else after_days
+    if after_days < MIN_AFTER_DAYS:
+        raise ValueError(f'归档天数不能少于 {MIN_AFTER_DAYS} 天')
+    return timezone.now() - timedelta(days=after_days)
+
+
+def archivable_orders(cutoff):
+    return Order.objects.filter(status__in=ARCHIVE_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size):
+    """把一批可归档订单移入归档表，返回移动的条数
+
+    复制和删除在同一个事务里完成，每批只锁 batch_size 行，不影响在用订单的流转。
+    """
+    using = router.db_for_write(Order)
+    with transaction.atomic(using=using):
+        ids = list(
+            archivable_orders(cutoff).using(using)
+            .select_for_update(skip_locked=True)
+            .order_by('updated_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        rows = list(Order.objects.using(using).filter(pk__in=ids).values(*_FIELDS))
+        ArchivedOrder.objects.using(using).bulk_create([ArchivedOrder(**row) for row in rows])
+        # 归档的订单不再出现在订单列表中，增量同步的客户端要从本地缓存移除
+        record_removed(rows, reason='archived')
+        # 不逐条发送 post_delete（每条都会清一次控制台缓存），批量结束后统一清除；
+        # 没有外键引用订单；附件记录只按 order_id 关联，归档后照常可查
+        Order.objects.using(using).filter(pk__in=ids)._raw_delete(using)
+    return len(ids)
+
+
+def archive_orders(after_days=None, batch_size=None, max_batches=None, on_batch=None):
+    """按批归档，直到没有可归档的订单或达到 max_batches，返回归档总数"""
+    config = get_archive_settings()
+    cutoff = archive_cutoff(after_days)
+    batch_size = batch_size or config['BATCH_SIZE']
+
+    total = batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            moved = archive_batch(cutoff, batch_size)
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if on_batch is not None:
+                on_batch(batches, moved, total)
+    finally:
+        if total:
+            invalidate_dashboard('order_counts', *ARCHIVE_GROUPS)
+    return total
+
+
+def _lookup_querysets(related, only):
+    for model in (Order, ArchivedOrder):
+        queryset = model.objects.select_related(*related)
+        yield queryset.only(*only) if only else queryset
+
+
+def find_order(pk, related=(), only=()):
+    """按主键查找订单，在用表没有时查归档表，都没有时抛出 Order.DoesNotExist"""
+    for queryset in _lookup_querysets(related, only):
+        try:
+            return queryset.get(pk=pk)
+        except queryset.model.DoesNotExist:
+            pass
+    raise Order.DoesNotExist(f'订单 {pk} 不存在')
+
+
+async def afind_order(pk, related=(), only=()):
+    """find_order 的异步版本"""
+    for queryset in _lookup_querysets(related, only):
+        try:
+            return await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            pass
+    raise Order.DoesNotExist(f'订单 {pk} 不存在')
+
+
+def search_filter(term, field=None):
+    fields = (field,) if field in SEARCH_FIELDS else SEARCH_FIELDS
+    condition = Q()
+    for name in fields:
+        condition |= Q(**{f'{name}__icontains': term})
+    return condition
+
+
+def search_orders(term, field=None, limit=SEARCH_LIMIT):
+    """在用订单和归档订单中按订单号、项目名称或下单人搜索，各取最新的 limit 条
+
+    返回 (在用订单列表, 归档订单列表)。
+    """
+    condition = search_filter(term, field)
+    hot, archived = (
+        list(queryset.filter(condition).order_by('-created_at')[:limit])
+        for queryset in _lookup_querysets(ORDER_RELATED, ())
+    )
+    return hot, archived
@@ -0,0 +1,487 @@
+"""ASGI 部署下 I/O 密集接口的异步版本
+
+URL、权限和返回格式与 views.py 中对应的同步视图一致，settings.ASYNC_VIEWS 开启时
+由 urls.py 替换同步版本。数据库访问走异步 ORM，文件读写和 multipart 解析放到
+线程池，慢速上传下载只占用事件循环上的一个协程，不会占住整个 worker。
+"""
+import logging
+import mimetypes
+import os
+import uuid
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.http import (
+    HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse,
+)
+from django.http.multipartparser import MultiPartParserError
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from rest_framework import exceptions, status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from system.idempotency import idempotent, parse_form
+from system.renderers import ORJSONRenderer
+from system.streaming import astream_json_array
+from users.authentication import aauthenticate
+from users.roles import permission_mask, role_has_permission, roles_with_permission
+
+from .archive import ORDER_RELATED, afind_order
+from .attachments import afind_attachment, describe_upload, etag_matches, record_attachment
+from .models import Order
+from .serializers import OrderCreateSerializer, OrderSerializer, ProductionSheetSerializer
+from .transfers import UploadError, download_url, received_file
+from .views import StandardResultsSetPagination, StreamingListMixin, parse_version
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+FILE_TYPES = ('order_file', 'production_sheet', 'outbound_file')
+
+_renderer = ORJSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """用与同步视图相同的渲染器输出，两种视图的响应逐字节一致"""
+    return HttpResponse(_renderer.render(data), status=status, content_type=_renderer.media_type)
+
+
+def in_thread(func):
+    """在线程池中执行不访问数据库的阻塞调用（文件读写、multipart 解析）"""
+    return sync_to_async(func, thread_sensitive=False)
+
+
+def async_api_view(methods, *permissions, message='您没有权限执行此操作', role_detail=False):
+    """异步视图装饰器：限定请求方法、认证并按角色权限鉴权
+
+    不传权限名时只要求登录。无权限时默认与 DRF 权限类一致（detail 字段）；
+    对应同步视图使用 role_required 的传 role_detail=True，返回相同的 error/detail 格式。
+    """
+    mask = permission_mask(*permissions) if permissions else None
+    required_roles = ' 或 '.join(roles_with_permission(mask)) if permissions else ''
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return json_response({
+                    'detail': f'不允许 "{request.method}" 方法。'
+                }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+            try:
+                user = await aauthenticate(request)
+            except exceptions.AuthenticationFailed as e:
+                detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+                return json_response(detail, status=status.HTTP_401_UNAUTHORIZED)
+            if user is None:
+                return json_response({
+                    'detail': str(exceptions.NotAuthenticated.default_detail)
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            if mask is not None and not role_has_permission(user.role, mask):
+                if role_detail:
+                    return json_response({
+                        'error': message,
+                        'detail': f'当前角色: {user.role}, 需要角色: {required_roles}'
+                    }, status=status.HTTP_403_FORBIDDEN)
+                return json_response({'detail': message}, status=status.HTTP_403_FORBIDDEN)
+            request.user = user
+            return await view_func(request, *args, **kwargs)
+
+        # 只接受 JWT 或安全方法下的 session，与 DRF 视图一样跳过 CSRF 中间件
+        wrapped.csrf_exempt = True
+        return wrapped
+    return decorator
+
+
+# ---- 列表 ----
+
+def _page_size(request, pagination):
+    if pagination.page_size_query_param in request.GET:
+        try:
+            return min(max(int(request.GET[pagination.page_size_query_param]), 1), pagination.max_page_size)
+        except ValueError:
+            pass
+    return pagination.page_size
+
+
+async def _page(request, queryset, page_size, pagination):
+    """返回 (分页字段, 本页查询集)；页码无效时返回 (None, None)"""
+    count = await queryset.acount()
+    paginator = Paginator(range(count), page_size)
+    page_number = request.GET.get(pagination.page_query_param, 1)
+    if page_number in pagination.last_page_strings:
+        page_number = paginator.num_pages
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage:
+        return None, None
+
+    url = request.build_absolute_uri()
+    param = pagination.page_query_param
+    previous = None
+    if page.has_previous():
+        number = page.previous_page_number()
+        previous = remove_query_param(url, param) if number == 1 else replace_query_param(url, param, number)
+    head = {
+        'count': count,
+        'next': replace_query_param(url, param, page.next_page_number()) if page.has_next() else None,
+        'previous': previous,
+    }
+    return head, queryset[page.start_index() - 1:page.end_index()]
+
+
+async def paginate(request, queryset, pagination_class=StandardResultsSetPagination):
+    """与 PageNumberPagination 相同的参数和返回结构，COUNT 和取数走异步 ORM"""
+    pagination = pagination_class()
+    head, page = await _page(request, queryset, _page_size(request, pagination), pagination)
+    if head is None:
+        return None
+    items = [order async for order in page]
+    return {**head, 'results': OrderSerializer(items, many=True, context={'request': request}).data}
+
+
+async def _serialized_batches(request, queryset):
+    batch_size = StreamingListMixin.stream_batch_size
+    context = {'request': request}
+    batch = []
+    async for order in queryset.aiterator(chunk_size=batch_size):
+        batch.append(order)
+        if len(batch) == batch_size:
+            yield OrderSerializer(batch, many=True, context=context).data
+            batch = []
+    if batch:
+        yield OrderSerializer(batch, many=True, context=context).data
+
+
+async def stream_list(request, queryset, pagination_class=StandardResultsSetPagination):
+    """与 StreamingListMixin.streaming_list 相同：大结果模式返回流式响应，否则返回 None"""
+    pagination = pagination_class()
+    if request.GET.get(pagination.page_size_query_param) == StreamingListMixin.all_page_size:
+        chunks = astream_json_array(_serialized_batches(request, queryset), count_key='count')
+        return StreamingHttpResponse(chunks, content_type='application/json')
+
+    page_size = _page_size(request, pagination)
+    if page_size < StreamingListMixin.stream_page_size:
+        return None
+    head, page = await _page(request, queryset, page_size, pagination)
+    if head is None:
+        return None
+    chunks = astream_json_array(_serialized_batches(request, page), head)
+    return StreamingHttpResponse(chunks, content_type='application/json')
+
+
+def order_list_view(queryset_factory, error_label, *permissions, message='您没有权限执行此操作',
+                    streaming=False):
+    """生成分页订单列表的异步视图；streaming 为 True 时支持大结果流式输出"""
+
+    @async_api_view(('GET',), *permissions, message=message)
+    async def view(request):
+        try:
+            queryset = queryset_factory().select_related(*ORDER_RELATED)
+            if streaming:
+                response = await stream_list(request, queryset)
+                if response is not None:
+                    return response
+            data = await paginate(request, queryset)
+            if data is None:
+                return json_response({
+                    'detail': str(PageNumberPagination.invalid_page_message)
+                }, status=status.HTTP_404_NOT_FOUND)
+            return json_response(data)
+        except Exception as e:
+            logger.error(f"{error_label}失败: {str(e)}")
+            return json_response({
+                'error': f'{error_label}失败: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return view
+
+
+my_orders = order_list_view(
+    lambda: Order.objects.all().order_by('-created_at'),
+    '获取订单列表',
+)
+pending_orders = order_list_view(
+    lambda: Order.objects.filter(status='pending').order_by('-created_at'),
+    '获取待审核订单', 'review_orders', message='需要管理员或审核员权限', streaming=True,
+)
+approved_orders = order_list_view(
+    lambda: Order.objects.filter(status='approved').order_by('-review_date'),
+    '获取已批准订单', 'upload_production_sheets', message='需要管理员或技术员权限', streaming=True,
+)
+ready_production_orders = order_list_view(
+    lambda: Order.objects.filter(status='ready_for_production').order_by('-production_started_at'),
+    '获取待生产订单', 'view_ready_for_production',
+)
+in_production_orders = order_list_view(
+    lambda: Order.objects.filter(status='in_production').order_by('-production_started_at'),
+    '获取生产中订单', 'manage_inventory', message='需要管理员或出入库员权限',
+)
+warehouse_orders = order_list_view(
+    lambda: Order.objects.filter(
+        status__in=['ready_for_production', 'in_production', 'in_warehouse', 'out_warehouse']
+    ).order_by('-created_at'),
+    '获取出入库订单', 'manage_inventory', message='您没有权限访问此功能',
+)
+
+
+# ---- 下载 ----
+
+async def _read_chunks(path):
+    """在线程池中分块读取文件，事件循环只负责把数据发给客户端"""
+    f = await in_thread(open)(path, 'rb')
+    async for chunk in _stream_file(f):
+        yield chunk
+
+
+async def _stream_file(f):
+    try:
+        while True:
+            chunk = await in_thread(f.read)(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await in_thread(f.close)()
+
+
+async def _attachment_response(request, attachment):
+    """与 views.attachment_response 相同：元数据取自附件记录，只在发送时打开文件"""
+    if etag_matches(request, attachment):
+        response = HttpResponseNotModified()
+        response['ETag'] = attachment.etag
+        return response
+
+    url = download_url(attachment.file, attachment.filename)
+    if url:
+        return HttpResponseRedirect(url)
+
+    try:
+        f = await in_thread(attachment.file.storage.open)(attachment.file.name, 'rb')
+    except FileNotFoundError:
+        logger.error(f"附件文件不存在: {attachment.file.name}（订单 {attachment.order_id}，"
+                     f"{attachment.kind} 第 {attachment.version} 版）")
+        return HttpResponse("文件在服务器上不存在。", status=status.HTTP_404_NOT_FOUND)
+    response = StreamingHttpResponse(_stream_file(f), content_type=attachment.content_type)
+    response['Content-Length'] = str(attachment.size)
+    response['Content-Disposition'] = content_disposition_header(True, attachment.filename)
+    response['ETag'] = attachment.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@async_api_view(('GET',), 'download_order_files', message='您没有权限下载订单文件')
+async def download_order_file(request, pk, file_type):
+    if file_type not in FILE_TYPES:
+        return HttpResponse("不支持的文件类型", status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        version = parse_version(request.GET.get('version'))
+    except ValueError:
+        return HttpResponse("版本号格式错误", status=status.HTTP_400_BAD_REQUEST)
+    attachment = await afind_attachment(pk, file_type, version)
+    if attachment is not None:
+        return await _attachment_response(request, attachment)
+    if version is not None:
+        return HttpResponse("该版本不存在。", status=status.HTTP_404_NOT_FOUND)
+
+    # 没有附件记录的旧订单按文件字段下载
+
+    try:
+        order = await afind_order(pk, only=('id', 'order_number', file_type))
+    except Order.DoesNotExist:
+        return HttpResponse("订单未找到。", status=status.HTTP_404_NOT_FOUND)
+
+    file_field = getattr(order, file_type)
+    if not file_field or not file_field.name:
+        return HttpResponse("文件未找到或未正确关联。", status=status.HTTP_404_NOT_FOUND)
+
+    # 对象存储：重定向到预签名地址，签名只是本地计算
+    url = download_url(file_field, os.path.basename(file_field.name))
+    if url:
+        return HttpResponseRedirect(url)
+
+    file_path = file_field.path
+    try:
+        size = await in_thread(os.path.getsize)(file_path)
+    except OSError:
+        logger.error(f"File does not exist at path: {file_path} for order PK: {pk}, file_type: {file_type}")
+        return HttpResponse("文件在服务器上不存在。", status=status.HTTP_404_NOT_FOUND)
+
+    filename = os.path.basename(file_field.name)
+    content_type, encoding = mimetypes.guess_type(filename)
+    response = StreamingHttpResponse(_read_chunks(file_path),
+                                     content_type=content_type or 'application/octet-stream')
+    response['Content-Length'] = str(size)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    logger.info(f"File download initiated for order PK: {pk}, file_type: {file_type}, filename: {filename}")
+    return response
+
+
+# ---- 上传 ----
+
+def _save_upload(order, field_name, upload):
+    """按字段的 upload_to 规则写入存储，返回存储后的文件名"""
+    field = order._meta.get_field(field_name)
+    return field.storage.save(field.generate_filename(order, upload.name), upload,
+                              max_length=field.max_length)
+
+
+async def _store(order, field_name, upload):
+    # 直传的文件已在对象存储中，upload 是对象键
+    name = upload if isinstance(upload, str) else await in_thread(_save_upload)(order, field_name, upload)
+    setattr(order, field_name, name)
+    return name
+
+
+async def _record(order, field_name, metadata, user):
+    await sync_to_async(record_attachment)(order, field_name, metadata, user)
+
+
+async def _discard(order, field_name, name):
+    storage = order._meta.get_field(field_name).storage
+    await in_thread(storage.delete)(name)
+
+
+def _bad_form(error):
+    return json_response({'error': f'请求数据解析失败: {error}'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def _received_file(data, files, field_name, user, order_id=None):
+    """表单上传的文件或直传令牌对应的对象键，核对对象时访问存储，放到线程池"""
+    return await in_thread(received_file)(data, files, field_name, user, order_id)
+
+
+@async_api_view(('POST',), 'create_order', message='您没有权限创建订单', role_detail=True)
+@idempotent
+async def create_order(request):
+    try:
+        data, files = await in_thread(parse_form)(request)
+    except MultiPartParserError as e:
+        return _bad_form(e)
+
+    try:
+        order_file, order_id = await _received_file(data, files, 'order_file', request.user)
+    except UploadError as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if not order_file:
+        return json_response({'error': '请上传下料单文件'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = OrderCreateSerializer(data=data)
+    if not serializer.is_valid():
+        return json_response({
+            'error': '数据验证失败',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    order = Order(id=order_id or uuid.uuid4(), user=request.user, **serializer.validated_data)
+    metadata = await in_thread(describe_upload)('order_file', order_file)
+    name = await _store(order, 'order_file', order_file)
+    try:
+        await order.asave(force_insert=True)
+    except Exception as e:
+        await _discard(order, 'order_file', name)
+        return json_response({'error': f'创建订单失败: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    await _record(order, 'order_file', metadata, request.user)
+
+    return json_response({
+        'message': '订单创建成功',
+        'order': OrderSerializer(order).data
+    }, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(('PUT', 'PATCH'), 'upload_production_sheets', message='需要管理员或技术员权限')
+@idempotent
+async def upload_production_sheet(request, pk):
+    try:
+        order = await Order.objects.select_related(*ORDER_RELATED).aget(pk=pk)
+    except Order.DoesNotExist:
+        return json_response({'detail': '未找到。'}, status=status.HTTP_404_NOT_FOUND)
+
+    if order.status != 'approved':
+        return json_response({
+            'error': f'只有已批准的订单才能开始生产，当前状态: {order.get_status_display()}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        data, files = await in_thread(parse_form)(request)
+    except MultiPartParserError as e:
+        return _bad_form(e)
+
+    try:
+        production_sheet, _ = await _received_file(data, files, 'production_sheet', request.user, order.pk)
+    except UploadError as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if not production_sheet:
+        return json_response({'error': '请上传生产面单文件'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = ProductionSheetSerializer(order, data=data, partial=True)
+    if not serializer.is_valid():
+        return json_response({
+            'error': '数据验证失败',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    for field, value in serializer.validated_data.items():
+        setattr(order, field, value)
+    metadata = await in_thread(describe_upload)('production_sheet', production_sheet)
+    name = await _store(order, 'production_sheet', production_sheet)
+    order.status = 'ready_for_production'
+    order.production_started_by = request.user
+    order.production_started_at = timezone.now()
+    try:
+        await order.asave()
+    except Exception as e:
+        await _discard(order, 'production_sheet', name)
+        return json_response({'error': f'上传生产面单失败: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    await _record(order, 'production_sheet', metadata, request.user)
+
+    return json_response({
+        'message': '生产面单上传成功，订单已转为待生产状态',
+        'order': OrderSerializer(order).data
+    })
+
+
+@async_api_view(('POST',), 'manage_inventory', message='您没有权限进行出库操作', role_detail=True)
+@idempotent
+async def order_outbound(request, order_id):
+    try:
+        order = await Order.objects.select_related(*ORDER_RELATED).aget(id=order_id)
+    except Order.DoesNotExist:
+        return json_response({'error': '订单不存在'}, status=status.HTTP_404_NOT_FOUND)
+
+    if order.status != 'in_warehouse':
+        return json_response({
+            'error': f'订单状态错误，当前状态：{order.get_status_display()}，只有已入库的订单才能出库'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        data, files = await in_thread(parse_form)(request)
+    except MultiPartParserError as e:
+        return _bad_form(e)
+
+    try:
+        outbound_file, _ = await _received_file(data, files, 'outbound_file', request.user, order.pk)
+    except UploadError as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if not outbound_file:
+        return json_response({'error': '请上传出库单文件'}, status=status.HTTP_400_BAD_REQUEST)
+
+    metadata = await in_thread(describe_upload)('outbound_file', outbound_file)
+    name = await _store(order, 'outbound_file', outbound_file)
+    order.status = 'out_warehouse'
+    order.outbound_by = request.user
+    order.outbound_at = timezone.now()
+    order.outbound_notes = data.get('outbound_notes', '')
+    try:
+        await order.asave()
+    except Exception as e:
+        await _discard(order, 'outbound_file', name)
+        return json_response({'error': f'出库操作失败: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    await _record(order, 'outbound_file', metadata, request.user)
+
+    return json_response({
+        'message': '出库成功',
+        'order': OrderSerializer(order).data
+    })
@@ -0,0 +1,156 @@
+"""订单文件版本
+
+新建、重新提交、上传生产面单和出库时，文件写入存储前先算出元数据（describe_upload），
+订单保存后记为一个新版本（record_attachment）。Order 上的文件字段仍指向最新版本，
+列表、打包和导出的用法不变；下载和版本列表直接查 (order_id, kind, -version) 索引。
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import Order, OrderAttachment
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+KINDS = dict(OrderAttachment.KIND_CHOICES)
+
+# 单次 PUT 上传的对象，ETag 就是内容的 md5；分片上传的 ETag 带 -分片数，不是内容摘要
+_MD5_ETAG = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _guess_type(filename):
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def describe_upload(kind, upload):
+    """文件写入存储前计算元数据
+
+    upload 为表单上传的文件（边读边算 sha256），或直传到对象存储后的对象键
+    （用对象存储给出的大小和 md5，不再下载）。content_type 按扩展名推断：
+    表单和直传请求里的类型都由客户端填写，下载时会原样作为响应类型返回。
+    """
+    if isinstance(upload, str):
+        info = Order._meta.get_field(kind).storage.object_info(upload)
+        filename = os.path.basename(upload)
+        etag = info['etag']
+        return {
+            'filename': filename,
+            'size': info['size'],
+            'content_type': _guess_type(filename),
+            'checksum': f'md5:{etag}' if _MD5_ETAG.match(etag) else f'etag:{etag}',
+        }
+
+    digest = hashlib.sha256()
+    for chunk in upload.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    filename = os.path.basename(upload.name)
+    return {
+        'filename': filename,
+        'size': upload.size,
+        'content_type': _guess_type(filename),
+        'checksum': f'sha256:{digest.hexdigest()}',
+    }
+
+
+def record_attachment(order, kind, metadata, user=None, uploaded_at=None):
+    """订单的 kind 字段已保存了新文件，记为下一个版本"""
+    extra = {'uploaded_at': uploaded_at} if uploaded_at else {}
+    for attempt in range(3):
+        latest = (
+            OrderAttachment.objects.filter(order_id=order.pk, kind=kind)
+            .aggregate(version=Max('version'))['version'] or 0
+        )
+        try:
+            with transaction.atomic():
+                return OrderAttachment.objects.create(
+                    order_id=order.pk,
+                    kind=kind,
+                    version=latest + 1,
+                    file=getattr(order, kind).name,
+                    uploaded_by=user,
+                    **metadata,
+                    **extra,
+                )
+        except IntegrityError:
+            # 同一订单同一类型并发上传，版本号冲突时重新取最新版本
+            if attempt == 2:
+                raise
+
+
+def find_attachment(order_id, kind, version=None):
+    """取指定版本，未指定时取最新版本；没有记录时返回 None"""
+    queryset = OrderAttachment.objects.filter(order_id=order_id, kind=kind)
+    if version is not None:
+        queryset = queryset.filter(version=version)
+    return queryset.order_by('-version').first()
+
+
+async def afind_attachment(order_id, kind, version=None):
+    """find_attachment 的异步版本"""
+    queryset = OrderAttachment.objects.filter(order_id=order_id, kind=kind)
+    if version is not None:
+        queryset = queryset.filter(version=version)
+    return await queryset.order_by('-version').afirst()
+
+
+def latest_attachments(order_ids):
+    """一次查询取多个订单各类型的最新版本，返回 {(order_id, kind): OrderAttachment}"""
+    latest = {}
+    for attachment in OrderAttachment.objects.filter(order_id__in=order_ids).order_by('-version'):
+        latest.setdefault((attachment.order_id, attachment.kind), attachment)
+    return latest
+
+
+def etag_matches(request, attachment):
+    """请求的 If-None-Match 是否包含该版本的 ETag"""
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return '*' in tags or attachment.etag in tags
+
+
+def backfill_attachments(model, batch_size, on_batch=None):
+    """为还没有附件记录的订单（model 为 Order 或 ArchivedOrder）把当前文件补记为第 1 版
+
+    按主键分批扫描，每批一次查询取出已有记录；文件不存在的跳过。返回补记的条数。
+    """
+    total, last_pk = 0, None
+    while True:
+        queryset = model.objects.order_by('pk').only('pk', 'order_number', *KINDS)
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        orders = list(queryset[:batch_size])
+        if not orders:
+            return total
+        last_pk = orders[-1].pk
+
+        recorded = set(
+            OrderAttachment.objects.filter(order_id__in=[order.pk for order in orders])
+            .values_list('order_id', 'kind')
+        )
+        created = 0
+        for order in orders:
+            for kind in KINDS:
+                file_field = getattr(order, kind)
+                if not file_field or (order.pk, kind) in recorded:
+                    continue
+                try:
+                    with file_field.open('rb'):
+                        metadata = describe_upload(kind, file_field)
+                    uploaded_at = file_field.storage.get_modified_time(file_field.name)
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(f"补记附件时文件不可读，已跳过: 订单 {order.order_number} {kind}: {str(e)}")
+                    continue
+                record_attachment(order, kind, metadata, uploaded_at=uploaded_at)
+                created += 1
+        total += created
+        if on_batch:
+            on_batch(model._meta.verbose_name, len(orders), created, total)
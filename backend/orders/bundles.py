@@ -0,0 +1,96 @@
+"""订单文件打包下载
+
+把一个或多个订单的下料单、生产面单和出库单边读边写进 ZIP 流式返回：
+每个文件按块读取后立即压缩发送，不生成临时文件，也不把整个文件读进内存。
+本身已经压缩过的格式（xlsx/docx/pdf/图片/压缩包）用存储方式，不再浪费 CPU。
+文件大小和修改时间优先取附件记录的元数据，没有记录的旧订单才逐个询问存储。
+"""
+import logging
+import os
+
+from system.streaming import ZipEntry, stream_zip
+
+from .attachments import latest_attachments
+from .models import ArchivedOrder, Order
+
+logger = logging.getLogger(__name__)
+
+# 文件字段 -> 包内文件名前缀，与单个文件下载的默认文件名一致
+FILE_LABELS = {
+    'order_file': '下料单',
+    'production_sheet': '生产面单',
+    'outbound_file': '出库单',
+}
+
+# 一次最多打包的订单数
+MAX_BUNDLE_ORDERS = 100
+
+READ_CHUNK_SIZE = 64 * 1024
+
+COMPRESSED_EXTENSIONS = {
+    '.xlsx', '.xlsm', '.docx', '.pptx', '.pdf', '.zip', '.rar', '.7z', '.gz',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4',
+}
+
+_ONLY = ('id', 'order_number', *FILE_LABELS)
+
+
+def bundle_orders(ids):
+    """按 ids 的顺序取订单，在用表没有的到归档表查找；不存在的 id 忽略"""
+    found = {order.pk: order for order in Order.objects.filter(pk__in=ids).only(*_ONLY)}
+    missing = [pk for pk in ids if pk not in found]
+    if missing:
+        found.update(
+            (order.pk, order) for order in ArchivedOrder.objects.filter(pk__in=missing).only(*_ONLY)
+        )
+    return [found[pk] for pk in ids if pk in found]
+
+
+def _read(f):
+    with f:
+        yield from f.chunks(READ_CHUNK_SIZE)
+
+
+def _entries(orders, prefix_with_order):
+    attachments = latest_attachments([order.pk for order in orders])
+    for order in orders:
+        for field_name, label in FILE_LABELS.items():
+            file_field = getattr(order, field_name)
+            if not file_field or not file_field.name:
+                continue
+
+            storage, name = file_field.storage, file_field.name
+            attachment = attachments.get((order.pk, field_name))
+            if attachment is not None and attachment.file.name == name:
+                size, modified = attachment.size, attachment.uploaded_at.timestamp()
+            else:
+                try:
+                    size = storage.size(name)
+                    modified = storage.get_modified_time(name).timestamp()
+                except (OSError, NotImplementedError):
+                    logger.warning(f"打包时文件不存在，已跳过: 订单 {order.order_number} {field_name} {name}")
+                    continue
+            # 写入条目头之前先打开文件：附件记录还在但文件已丢失时跳过该文件，
+            # 而不是在响应已经开始后中断，留下损坏的 ZIP
+            try:
+                f = storage.open(name, 'rb')
+            except OSError:
+                logger.warning(f"打包时文件不存在，已跳过: 订单 {order.order_number} {field_name} {name}")
+                continue
+
+            extension = os.path.splitext(name)[1].lower()
+            filename = f"{label}_{order.order_number}{extension}"
+            if prefix_with_order:
+                filename = f"{order.order_number}/{filename}"
+            yield ZipEntry(
+                filename,
+                _read(f),
+                compress=extension not in COMPRESSED_EXTENSIONS,
+                size=size,
+                modified=modified,
+            )
+
+
+def bundle_stream(orders):
+    """生成 ZIP 字节块；多个订单时每个订单一个目录"""
+    return stream_zip(_entries(orders, prefix_with_order=len(orders) > 1))
@@ -0,0 +1,141 @@
+"""订单增量同步
+
+客户端在本地缓存订单列表，每次刷新带上次拿到的游标请求 /api/orders/changes/?since=<cursor>，
+只取之后新建或修改的订单，以及已删除或归档、应从本地缓存移除的订单（OrderTombstone），
+不再每次重新拉取整页。不带 since 时从头开始，按页取完即为全量同步。
+
+- 订单按 (updated_at, id)、移除记录按 (removed_at, order_id) 走各自的索引做键集翻页，
+  两路按同一个位置合并，游标是最后一条的位置
+- 只返回 SETTLE_SECONDS 秒之前的变化：auto_now 时间在保存时取得，早于事务提交，
+  刚写入的行可能还有更早时间的事务没提交，等一会儿再返回就不会被游标跳过
+- 两路查询固定在主库上执行：同步接口是 GET 请求，读写分离时默认读副本，
+  副本的复制延迟没有上限，游标会越过之后才复制到副本的行，客户端再也拿不到这些变化
+- 移除记录保留 RETENTION_DAYS 天；游标里记着客户端已同步到的时间，
+  早于保留期的游标返回 410，客户端需要重新全量同步
+"""
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .models import OrderTombstone
+
+CHANGES_DEFAULTS = {
+    # 每页默认条数和上限
+    'LIMIT': 100,
+    'MAX_LIMIT': 500,
+    # 移除记录的保留天数，客户端超过这么久没有同步需要全量同步
+    'RETENTION_DAYS': 30,
+    # 只返回这么多秒之前的变化，应长于写订单事务的最长耗时
+    'SETTLE_SECONDS': 2,
+}
+
+
+class CursorError(ValueError):
+    """游标无法解析"""
+
+
+class CursorExpired(Exception):
+    """游标早于移除记录的保留期"""
+
+
+def get_changes_settings():
+    return {**CHANGES_DEFAULTS, **getattr(settings, 'ORDER_CHANGES', {})}
+
+
+def encode_cursor(position, synced_at):
+    """游标：最后一条的位置 (时间, 订单ID) 和客户端已完整同步到的时间，对客户端不透明"""
+    timestamp, pk = position
+    raw = f"{timestamp.isoformat()}|{pk}|{synced_at.isoformat()}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """返回 ((时间, 订单ID), 已同步到的时间)，格式不对时抛出 CursorError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, pk, synced_at = raw.split('|')
+        position = (datetime.fromisoformat(timestamp), uuid.UUID(pk))
+        synced_at = datetime.fromisoformat(synced_at)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorError('无效的同步游标') from e
+    if timezone.is_naive(position[0]) or timezone.is_naive(synced_at):
+        raise CursorError('无效的同步游标')
+    return position, synced_at
+
+
+def _after(queryset, time_field, id_field, position, until, limit):
+    """位置在 position 之后、时间不晚于 until 的前 limit 行"""
+    queryset = queryset.filter(**{f'{time_field}__lte': until})
+    if position is not None:
+        timestamp, pk = position
+        queryset = (
+            queryset.filter(**{f'{time_field}__gte': timestamp})
+            .exclude(**{time_field: timestamp, f'{id_field}__lte': pk})
+        )
+    return list(queryset.order_by(time_field, id_field)[:limit])
+
+
+def changes_since(queryset, since=None, limit=None):
+    """取 since 游标之后的变化
+
+    queryset 为要同步的订单（调用方决定 select_related），总是在主库上查询。返回
+    (changed, removed, cursor, has_more)：changed 为订单，removed 为 OrderTombstone，
+    两者合起来按位置排序后不超过 limit 条。游标无效时抛出 CursorError，过期时抛出 CursorExpired。
+    """
+    config = get_changes_settings()
+    limit = min(limit or config['LIMIT'], config['MAX_LIMIT'])
+    now = timezone.now()
+    until = now - timedelta(seconds=config['SETTLE_SECONDS'])
+
+    position = synced_at = None
+    if since:
+        position, synced_at = decode_cursor(since)
+        if synced_at < now - timedelta(days=config['RETENTION_DAYS']):
+            raise CursorExpired('同步游标已过期，请重新加载全部订单')
+
+    # 每路多取一条，合并后才知道是否还有下一页
+    orders = _after(queryset.using(DEFAULT_DB_ALIAS), 'updated_at', 'id', position, until, limit + 1)
+    tombstones = _after(OrderTombstone.objects.using(DEFAULT_DB_ALIAS), 'removed_at', 'order_id',
+                        position, until, limit + 1)
+    merged = sorted(
+        [((order.updated_at, order.pk), order) for order in orders]
+        + [((tombstone.removed_at, tombstone.order_id), tombstone) for tombstone in tombstones],
+        key=lambda item: item[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    if merged:
+        position = merged[-1][0]
+    elif position is None:
+        # 没有任何订单，下次从 until 之后开始
+        position = (until, uuid.UUID(int=0))
+    # 取完才算同步到 until；还有下一页时保持上次的时间（全量同步时为本次）
+    if not has_more or synced_at is None:
+        synced_at = until
+
+    changed, removed = [], []
+    for _, item in merged:
+        (removed if isinstance(item, OrderTombstone) else changed).append(item)
+    return changed, removed, encode_cursor(position, synced_at), has_more
+
+
+def record_removed(orders, reason='deleted'):
+    """记录离开订单表的订单，orders 为订单或含 id、order_number 的字典；顺带清理过期记录"""
+    removed_at = timezone.now()
+    tombstones = []
+    for order in orders:
+        if isinstance(order, dict):
+            order_id, order_number = order['id'], order['order_number']
+        else:
+            order_id, order_number = order.pk, order.order_number
+        tombstones.append(OrderTombstone(
+            order_id=order_id, order_number=order_number, reason=reason, removed_at=removed_at,
+        ))
+    OrderTombstone.objects.bulk_create(tombstones)
+    retention = timedelta(days=get_changes_settings()['RETENTION_DAYS'])
+    OrderTombstone.objects.filter(removed_at__lt=removed_at - retention).delete()
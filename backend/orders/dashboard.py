@@ -0,0 +1,151 @@
+"""管理控制台汇总数据
+
+控制台一屏需要的数据分为四类，每类一条聚合查询并单独缓存：
+订单状态分布、用户角色分布、各队列最新订单、今日吞吐量。
+订单或用户写入时由 signals 清除对应分组，缓存时间只是兜底。
+归档订单的状态分布单独缓存，只在归档任务运行后清除。
+缓存写入后要保持到下次失效，统计查询都在主库上执行，不从有复制延迟的副本取旧数据。
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import ArchivedOrder, Order
+
+User = get_user_model()
+
+CACHE_PREFIX = 'dashboard'
+
+# 控制台展示的待处理队列（订单状态）
+QUEUES = ('pending', 'approved', 'ready_for_production', 'in_production', 'in_warehouse')
+QUEUE_SIZE = 5
+
+# 今日吞吐量：指标 -> 对应的时间字段
+THROUGHPUT_FIELDS = {
+    'created': 'created_at',
+    'reviewed': 'review_date',
+    'production_started': 'production_started_at',
+    'inbound': 'inbound_at',
+    'outbound': 'outbound_at',
+}
+
+ORDER_GROUPS = ('order_counts', 'queues', 'throughput')
+USER_GROUPS = ('user_counts',)
+ARCHIVE_GROUPS = ('archived_counts',)
+
+
+def _cache_key(group):
+    if group == 'throughput':
+        # 按日期区分，跨天后自然换成新的统计
+        return f"{CACHE_PREFIX}:{group}:{timezone.localdate():%Y%m%d}"
+    return f"{CACHE_PREFIX}:{group}"
+
+
+def _cached(group, compute):
+    key = _cache_key(group)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    return value
+
+
+def invalidate_dashboard(*groups):
+    """清除指定分组的缓存，不传参数时清除全部"""
+    cache.delete_many([_cache_key(group) for group in groups or ORDER_GROUPS + USER_GROUPS + ARCHIVE_GROUPS])
+
+
+def _count_by_status(model):
+    counts = dict.fromkeys((value for value, _ in Order.STATUS_CHOICES), 0)
+    for row in model.objects.using(DEFAULT_DB_ALIAS).order_by().values('status').annotate(count=Count('pk')):
+        counts[row['status']] = row['count']
+    return counts
+
+
+def _compute_order_counts():
+    return _count_by_status(Order)
+
+
+def _compute_archived_counts():
+    return _count_by_status(ArchivedOrder)
+
+
+def _compute_user_counts():
+    by_role = {role: {'active': 0, 'inactive': 0} for role, _ in User.ROLE_CHOICES}
+    for row in User.objects.using(DEFAULT_DB_ALIAS).order_by().values('role', 'is_active').annotate(count=Count('pk')):
+        bucket = by_role.setdefault(row['role'], {'active': 0, 'inactive': 0})
+        bucket['active' if row['is_active'] else 'inactive'] += row['count']
+    active = sum(item['active'] for item in by_role.values())
+    inactive = sum(item['inactive'] for item in by_role.values())
+    return {'total': active + inactive, 'active': active, 'inactive': inactive, 'by_role': by_role}
+
+
+def _compute_queues():
+    # 按状态分区编号，一条查询取出每个队列最新的几条
+    rows = (
+        Order.objects.using(DEFAULT_DB_ALIAS).filter(status__in=QUEUES)
+        .annotate(rank=Window(RowNumber(), partition_by=F('status'),
+                              order_by=[F('updated_at').desc(), F('id').desc()]))
+        .filter(rank__lte=QUEUE_SIZE)
+        .order_by('status', 'rank')
+        .values('id', 'order_number', 'project_name', 'ordered_by', 'status',
+                'created_at', 'updated_at', 'user__username', 'user__full_name')
+    )
+    queues = {status: [] for status in QUEUES}
+    for row in rows:
+        queues[row['status']].append({
+            'id': str(row['id']),
+            'order_number': row['order_number'],
+            'project_name': row['project_name'],
+            'ordered_by': row['ordered_by'],
+            'status': row['status'],
+            'created_at': row['created_at'].isoformat(),
+            'updated_at': row['updated_at'].isoformat(),
+            'user': row['user__full_name'] or row['user__username'],
+        })
+    return queues
+
+
+def _compute_throughput():
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    # 每个环节的时间字段都随 save() 写入，updated_at 不早于其中任何一个；
+    # 先按 updated_at 过滤可以走 order_updated_id_idx，只聚合今天改动过的订单
+    touched_today = Order.objects.using(DEFAULT_DB_ALIAS).filter(updated_at__gte=today)
+    return touched_today.aggregate(**{
+        name: Count('pk', filter=Q(**{f"{field}__gte": today}))
+        for name, field in THROUGHPUT_FIELDS.items()
+    })
+
+
+def order_counts():
+    """全部订单（含已归档）的状态分布"""
+    counts = dict(_cached('order_counts', _compute_order_counts))
+    for key, count in _cached('archived_counts', _compute_archived_counts).items():
+        counts[key] = counts.get(key, 0) + count
+    return {'total': sum(counts.values()), 'by_status': counts}
+
+
+def user_counts():
+    return _cached('user_counts', _compute_user_counts)
+
+
+def recent_queues():
+    return _cached('queues', _compute_queues)
+
+
+def today_throughput():
+    return _cached('throughput', _compute_throughput)
+
+
+def dashboard_summary():
+    return {
+        'orders': order_counts(),
+        'users': user_counts(),
+        'queues': recent_queues(),
+        'throughput': today_throughput(),
+        'last_updated': timezone.now().isoformat(),
+    }
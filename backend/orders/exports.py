@@ -0,0 +1,185 @@
+"""订单导出（CSV / XLSX）
+
+按创建时间范围导出在用和已归档的订单及各环节时间。两张表各用一个服务端游标
+（QuerySet.iterator）按创建时间顺序读取，归并后每 CHUNK_SIZE 行一批：
+批内出现的用户一次查询解析姓名，整批格式化后作为一个数据块发送。
+表头在查询开始前就已发出，内存占用只与批大小有关。
+"""
+import csv
+import heapq
+import io
+import re
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from system.streaming import ZipEntry, stream_zip
+
+from .models import ArchivedOrder, Order
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+
+# 导出列，表头取字段的 verbose_name
+EXPORT_FIELDS = (
+    'order_number', 'project_name', 'ordered_by', 'status',
+    'user', 'created_at',
+    'reviewed_by', 'review_date', 'review_notes',
+    'production_started_by', 'production_started_at',
+    'inbound_by', 'inbound_at',
+    'outbound_by', 'outbound_at',
+)
+USER_FIELDS = ('user', 'reviewed_by', 'production_started_by', 'inbound_by', 'outbound_by')
+
+HEADERS = [str(Order._meta.get_field(name).verbose_name) for name in EXPORT_FIELDS] + ['已归档']
+
+_COLUMNS = [Order._meta.get_field(name).attname for name in EXPORT_FIELDS]
+_USER_INDEXES = [EXPORT_FIELDS.index(name) for name in USER_FIELDS]
+_CREATED_AT = EXPORT_FIELDS.index('created_at')
+_STATUS = EXPORT_FIELDS.index('status')
+_STATUS_LABELS = dict(Order.STATUS_CHOICES)
+
+
+def _rows(model, filters, archived):
+    queryset = (
+        model.objects.filter(**filters)
+        .order_by('created_at', 'pk')
+        .values_list(*_COLUMNS)
+    )
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield row + (archived,)
+
+
+def _format(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'tzinfo'):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def export_chunks(filters):
+    """生成格式化后的行，每批 CHUNK_SIZE 行"""
+    rows = heapq.merge(
+        _rows(Order, filters, False),
+        _rows(ArchivedOrder, filters, True),
+        key=lambda row: row[_CREATED_AT],
+    )
+    names = {}
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+
+        missing = {row[i] for row in chunk for i in _USER_INDEXES} - names.keys() - {None}
+        if missing:
+            for pk, full_name, username in User.objects.filter(pk__in=missing).values_list(
+                    'pk', 'full_name', 'username'):
+                names[pk] = full_name or username
+
+        formatted = []
+        for row in chunk:
+            values = list(row[:-1])
+            values[_STATUS] = _STATUS_LABELS.get(values[_STATUS], values[_STATUS])
+            for i in _USER_INDEXES:
+                values[i] = names.get(values[i], '')
+            formatted.append([_format(value) for value in values] + ['是' if row[-1] else ''])
+        yield formatted
+
+
+def csv_stream(filters):
+    # 带 BOM，Excel 直接打开不会把中文识别成乱码
+    yield '\ufeff'.encode('utf-8')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    yield buffer.getvalue().encode('utf-8')
+    for chunk in export_chunks(filters):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+
+
+# ---- XLSX ----
+# 只包含一个工作表的最小 SpreadsheetML 包，单元格用内联字符串，不需要共享字符串表，
+# 工作表可以逐行写入 ZIP。
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="订单" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# XML 1.0 不允许的控制字符（备注里可能出现）
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_row(number, values):
+    cells = ''.join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_INVALID_XML_CHARS.sub("", value))}</t></is></c>'
+        for value in values
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+def _xlsx_sheet(filters):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        + _xlsx_row(1, HEADERS)
+    ).encode('utf-8')
+    number = 1
+    for chunk in export_chunks(filters):
+        parts = []
+        for values in chunk:
+            number += 1
+            parts.append(_xlsx_row(number, values))
+        yield ''.join(parts).encode('utf-8')
+    yield b'</sheetData></worksheet>'
+
+
+def xlsx_stream(filters):
+    entries = [ZipEntry(name, [content.encode('utf-8')]) for name, content in _XLSX_PARTS.items()]
+    entries.append(ZipEntry('xl/worksheets/sheet1.xml', _xlsx_sheet(filters)))
+    return stream_zip(entries)
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -0,0 +1,119 @@
+"""按角色汇总的待办收件箱
+
+每个队列对应一个订单状态和处理它所需的权限。调用方的角色决定能看到哪些队列，
+各队列的数量用一条条件聚合查询，首页订单用一条按状态分区编号的窗口查询取出。
+结果按角色缓存，订单写入时由 signals 清除；缓存要保持到下次失效，所以在主库上查询。
+OWN_QUEUES 中的队列只列出调用方自己的订单，含这类队列的收件箱按用户缓存。
+"""
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, Count, F, Q, When, Window
+from django.db.models.functions import RowNumber
+
+from users.roles import ROLES, permission_mask, role_has_permission
+
+from .models import Order
+
+CACHE_PREFIX = 'inbox'
+PAGE_SIZE = 20
+
+# (状态, 显示名称, 排序时间字段, 处理该队列的权限)，排序与对应的列表接口一致
+QUEUES = (
+    ('pending', '待审核', 'created_at', ('review_orders',)),
+    ('rejected', '待修改', 'review_date', ('edit_rejected_orders',)),
+    ('approved', '待上传生产面单', 'review_date', ('upload_production_sheets',)),
+    ('ready_for_production', '待生产', 'production_started_at', ('view_ready_for_production',)),
+    ('in_production', '生产中', 'production_started_at', ('manage_inventory', 'track_production')),
+    ('in_warehouse', '待出库', 'inbound_at', ('manage_inventory',)),
+)
+
+# 只能处理自己订单的队列：被驳回的订单只有创建人可以重新提交
+OWN_QUEUES = ('rejected',)
+
+_QUEUE_MASKS = {status: permission_mask(*permissions) for status, _, _, permissions in QUEUES}
+
+
+def _cache_key(role, user_id=None):
+    if user_id is None:
+        return f"{CACHE_PREFIX}:{role}"
+    return f"{CACHE_PREFIX}:{role}:{user_id}"
+
+
+def invalidate_inbox(owner_id=None):
+    """清除各角色的收件箱；owner_id 为变化订单的创建人，一并清除其个人收件箱"""
+    keys = [_cache_key(role) for role, _, _ in ROLES]
+    if owner_id is not None:
+        keys += [_cache_key(role, owner_id) for role, _, _ in ROLES if has_own_queues(role)]
+    cache.delete_many(keys)
+
+
+def queues_for_role(role):
+    return [queue for queue in QUEUES if role_has_permission(role, _QUEUE_MASKS[queue[0]])]
+
+
+def has_own_queues(role):
+    return any(status in OWN_QUEUES for status, _, _, _ in queues_for_role(role))
+
+
+def _queue_filter(status, user_id):
+    condition = Q(status=status)
+    if status in OWN_QUEUES:
+        condition &= Q(user_id=user_id)
+    return condition
+
+
+def _compute_inbox(role, user_id=None):
+    queues = queues_for_role(role)
+    if not queues:
+        return {'role': role, 'queues': []}
+    statuses = [status for status, _, _, _ in queues]
+    conditions = {status: _queue_filter(status, user_id) for status in statuses}
+
+    counts = Order.objects.using(DEFAULT_DB_ALIAS).aggregate(**{
+        status: Count('pk', filter=condition) for status, condition in conditions.items()
+    })
+
+    # 每个队列按各自的时间字段倒序，统一成一个排序键后按状态分区取前 PAGE_SIZE 条
+    sort_key = Case(*(When(status=status, then=F(field)) for status, _, field, _ in queues))
+    orders = (
+        Order.objects.using(DEFAULT_DB_ALIAS).filter(reduce(operator.or_, conditions.values()))
+        .select_related('user', 'reviewed_by', 'production_started_by', 'inbound_by', 'outbound_by')
+        .annotate(rank=Window(RowNumber(), partition_by=F('status'),
+                              order_by=[sort_key.desc(nulls_last=True), F('created_at').desc()]))
+        .filter(rank__lte=PAGE_SIZE)
+        .order_by('rank')
+    )
+    # signals 在启动时就导入本模块，序列化器（连带 simplejwt）到生成收件箱时才加载
+    from .serializers import OrderSerializer
+
+    items = {status: [] for status in statuses}
+    for order in orders:
+        items[order.status].append(order)
+
+    return {
+        'role': role,
+        'queues': [
+            {
+                'status': status,
+                'label': label,
+                'count': counts[status],
+                'results': OrderSerializer(items[status], many=True).data,
+            }
+            for status, label, _, _ in queues
+        ],
+    }
+
+
+def get_inbox(user):
+    role = user.role
+    user_id = user.pk if has_own_queues(role) else None
+    key = _cache_key(role, user_id)
+    inbox = cache.get(key)
+    if inbox is None:
+        inbox = _compute_inbox(role, user_id)
+        cache.set(key, inbox, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    return inbox
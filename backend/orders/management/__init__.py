@@ -0,0 +1 @@
+# 空文件，用于标识Python包
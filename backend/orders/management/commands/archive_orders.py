@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.archive import archivable_orders, archive_cutoff, archive_orders, get_archive_settings
+
+
+class Command(BaseCommand):
+    help = '把出库或完成且长期未变动的订单分批移入归档表（可重复执行，每次只处理新增的可归档订单）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='归档多少天前最后变动的订单，默认读取 ORDER_ARCHIVE 配置')
+        parser.add_argument('--batch-size', type=int, help='每批移动的订单数')
+        parser.add_argument('--max-batches', type=int, help='本次最多处理的批数，默认处理完为止')
+        parser.add_argument('--sleep', type=float, default=0, help='每批之间暂停的秒数，降低对线上的影响')
+        parser.add_argument('--dry-run', action='store_true', help='只统计可归档的订单数')
+
+    def handle(self, *args, **options):
+        config = get_archive_settings()
+        days = options['days'] if options['days'] is not None else config['AFTER_DAYS']
+        batch_size = options['batch_size'] or config['BATCH_SIZE']
+        if batch_size <= 0:
+            raise CommandError('--batch-size 必须大于 0')
+        try:
+            cutoff = archive_cutoff(days)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            count = archivable_orders(cutoff).count()
+            self.stdout.write(f"{cutoff:%Y-%m-%d %H:%M} 之前最后变动的可归档订单: {count}")
+            return
+
+        start = time.perf_counter()
+
+        def on_batch(batches, moved, total):
+            self.stdout.write(f"  第 {batches} 批: {moved} 条，累计 {total} 条")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        total = archive_orders(days, batch_size, options['max_batches'], on_batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"归档 {total} 个订单，耗时 {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.attachments import backfill_attachments
+from orders.models import ArchivedOrder, Order
+
+
+class Command(BaseCommand):
+    help = '为升级前上传、还没有附件记录的订单文件补记第 1 版（可重复执行，已有记录的文件跳过）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批扫描的订单数')
+        parser.add_argument('--skip-archived', action='store_true', help='不处理归档表中的订单')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size 必须大于 0')
+
+        start = time.perf_counter()
+
+        def on_batch(label, scanned, created, total):
+            self.stdout.write(f"  {label}: 扫描 {scanned} 个订单，补记 {created} 个文件，累计 {total} 个")
+
+        total = backfill_attachments(Order, batch_size, on_batch)
+        if not options['skip_archived']:
+            total += backfill_attachments(ArchivedOrder, batch_size, on_batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"补记 {total} 个附件，耗时 {time.perf_counter() - start:.1f}s"
+        ))
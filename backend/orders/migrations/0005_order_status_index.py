@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_alter_order_review_notes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('pending', '待审核'), ('approved', '已批准'), ('rejected', '已拒绝'), ('ready_for_production', '待生产'), ('in_production', '生产中'), ('in_warehouse', '已入库'), ('out_warehouse', '已出库'), ('completed', '已完成')], default='pending', max_length=20, verbose_name='状态'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+        ),
+    ]
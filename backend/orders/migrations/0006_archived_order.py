@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import orders.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0005_order_status_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='inbound_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inbound_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='入库操作人'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='outbound_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='出库操作人'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='production_started_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='started_production_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='开始生产操作人'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='reviewed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='审核人'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('order_number', models.CharField(max_length=50, unique=True, verbose_name='订单号')),
+                ('project_name', models.CharField(max_length=200, verbose_name='项目名称')),
+                ('ordered_by', models.CharField(max_length=100, verbose_name='下单人')),
+                ('order_file', models.FileField(help_text='支持PDF、Word、Excel等格式', upload_to=orders.models.order_file_path, verbose_name='下料单文件')),
+                ('production_sheet', models.FileField(blank=True, help_text='技术员上传的生产面单文件', null=True, upload_to=orders.models.production_sheet_path, verbose_name='生产面单')),
+                ('status', models.CharField(choices=[('pending', '待审核'), ('approved', '已批准'), ('rejected', '已拒绝'), ('ready_for_production', '待生产'), ('in_production', '生产中'), ('in_warehouse', '已入库'), ('out_warehouse', '已出库'), ('completed', '已完成')], default='pending', max_length=20, verbose_name='状态')),
+                ('review_date', models.DateTimeField(blank=True, null=True, verbose_name='审核时间')),
+                ('review_notes', models.TextField(blank=True, null=True, verbose_name='审核意见')),
+                ('production_started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始生产时间')),
+                ('production_notes', models.TextField(blank=True, verbose_name='生产备注')),
+                ('inbound_at', models.DateTimeField(blank=True, null=True, verbose_name='入库时间')),
+                ('outbound_at', models.DateTimeField(blank=True, null=True, verbose_name='出库时间')),
+                ('outbound_file', models.FileField(blank=True, help_text='出入库员上传的出库单文件', null=True, upload_to=orders.models.outbound_file_path, verbose_name='出库单文件')),
+                ('outbound_notes', models.TextField(blank=True, verbose_name='出库备注')),
+                ('created_at', models.DateTimeField(verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(verbose_name='更新时间')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='归档时间')),
+                ('inbound_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inbound_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='入库操作人')),
+                ('outbound_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='出库操作人')),
+                ('production_started_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='started_production_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='开始生产操作人')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='审核人')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='创建用户')),
+            ],
+            options={
+                'verbose_name': '归档订单',
+                'verbose_name_plural': '归档订单',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='archived_order_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0007_order_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.UUIDField(verbose_name='订单ID')),
+                ('kind', models.CharField(choices=[('order_file', '下料单'), ('production_sheet', '生产面单'), ('outbound_file', '出库单')], max_length=20, verbose_name='文件类型')),
+                ('version', models.PositiveIntegerField(verbose_name='版本')),
+                ('file', models.FileField(max_length=255, upload_to='', verbose_name='文件')),
+                ('filename', models.CharField(max_length=255, verbose_name='文件名')),
+                ('size', models.BigIntegerField(verbose_name='大小')),
+                ('content_type', models.CharField(max_length=100, verbose_name='MIME类型')),
+                ('checksum', models.CharField(max_length=80, verbose_name='校验和')),
+                ('uploaded_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='上传时间')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_attachments', to=settings.AUTH_USER_MODEL, verbose_name='上传人')),
+            ],
+            options={
+                'verbose_name': '订单附件',
+                'verbose_name_plural': '订单附件',
+                'ordering': ['order_id', 'kind', '-version'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='orderattachment',
+            constraint=models.UniqueConstraint(models.F('order_id'), models.F('kind'), models.OrderBy(models.F('version'), descending=True), name='attachment_order_kind_version_uniq'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_attachment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.UUIDField(verbose_name='订单ID')),
+                ('order_number', models.CharField(max_length=50, verbose_name='订单号')),
+                ('reason', models.CharField(choices=[('deleted', '已删除'), ('archived', '已归档')], default='deleted', max_length=20, verbose_name='原因')),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='移除时间')),
+            ],
+            options={
+                'verbose_name': '订单移除记录',
+                'verbose_name_plural': '订单移除记录',
+                'ordering': ['removed_at', 'order_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at', 'id'], name='order_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordertombstone',
+            index=models.Index(fields=['removed_at', 'order_id'], name='tombstone_removed_order_idx'),
+        ),
+    ]
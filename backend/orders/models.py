@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 import uuid
 
@@ -20,7 +22,9 @@ def outbound_file_path(instance, filename):
     return f'orders/{instance.id}/outbound_files/{filename}'
 
 
-class Order(models.Model):
+class OrderBase(models.Model):
+    """订单字段，在用订单（Order）和归档订单（ArchivedOrder）共用"""
+
     STATUS_CHOICES = (
         ('pending', '待审核'),
         ('approved', '已批准'),
@@ -61,7 +65,7 @@ class Order(models.Model):
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True, 
-        related_name='reviewed_orders',
+        related_name='reviewed_%(class)ss',
         verbose_name='审核人'
     )
     review_date = models.DateTimeField(null=True, blank=True, verbose_name='审核时间')
@@ -73,7 +77,7 @@ class Order(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='started_production_orders',
+        related_name='started_production_%(class)ss',
         verbose_name='开始生产操作人'
     )
     production_started_at = models.DateTimeField(null=True, blank=True, verbose_name='开始生产时间')
@@ -85,7 +89,7 @@ class Order(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='inbound_orders',
+        related_name='inbound_%(class)ss',
         verbose_name='入库操作人'
     )
     inbound_at = models.DateTimeField(null=True, blank=True, verbose_name='入库时间')
@@ -95,7 +99,7 @@ class Order(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='outbound_orders',
+        related_name='outbound_%(class)ss',
         verbose_name='出库操作人'
     )
     outbound_at = models.DateTimeField(null=True, blank=True, verbose_name='出库时间')
@@ -113,13 +117,35 @@ class Order(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     
     class Meta:
-        verbose_name = '订单'
-        verbose_name_plural = '订单'
-        ordering = ['-created_at']
+        abstract = True
     
     def __str__(self):
         return f"{self.order_number} - {self.project_name}"
     
+    def can_start_production(self, user):
+        """检查是否可以开始生产"""
+        return (self.status == 'ready_for_production' and
+                user.has_permission('start_production'))
+    
+    def can_download_files(self, user):
+        """检查是否可以下载文件"""
+        return user.has_permission('download_order_files')
+
+
+class Order(OrderBase):
+    class Meta:
+        verbose_name = '订单'
+        verbose_name_plural = '订单'
+        ordering = ['-created_at']
+        indexes = [
+            # 按状态计数、按状态列出队列
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # 按创建时间范围导出
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            # 增量同步按 (updated_at, id) 游标翻页
+            models.Index(fields=['updated_at', 'id'], name='order_updated_id_idx'),
+        ]
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
             # 生成订单号逻辑
@@ -157,11 +183,103 @@ class Order(models.Model):
             
         super().save(*args, **kwargs)
     
-    def can_start_production(self, user):
-        """检查是否可以开始生产"""
-        return (self.status == 'approved' and 
-                user.role in ['admin', 'technician'])
+
+
+class ArchivedOrder(OrderBase):
+    """已归档订单
+
+    出库或完成且长期未变动的订单由 manage.py archive_orders 从 Order 表分批移入，
+    各队列只查询 Order 表；详情、下载和搜索会回退到这里查找，见 orders.archive。
+    """
+    # 归档时原样复制，不能在写入时重新取当前时间
+    created_at = models.DateTimeField(verbose_name='创建时间')
+    updated_at = models.DateTimeField(verbose_name='更新时间')
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name='归档时间')
     
-    def can_download_files(self, user):
-        """检查是否可以下载文件"""
-        return user.role in ['admin', 'technician', 'reviewer', 'order_clerk', 'warehouse_clerk', 'workshop_tracker']
+    class Meta:
+        verbose_name = '归档订单'
+        verbose_name_plural = '归档订单'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='archived_order_created_idx'),
+        ]
+
+
+class OrderAttachment(models.Model):
+    """订单文件的一个版本
+
+    每次上传下料单、生产面单或出库单都新增一个版本，Order 上的文件字段指向最新版本。
+    下载和版本列表只查这张表，不访问文件系统；ETag 取自校验和。
+    """
+    KIND_CHOICES = (
+        ('order_file', '下料单'),
+        ('production_sheet', '生产面单'),
+        ('outbound_file', '出库单'),
+    )
+
+    # 订单归档时会从 Order 表移到 ArchivedOrder 表，这里只记订单 id，不建外键
+    order_id = models.UUIDField(verbose_name='订单ID')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='文件类型')
+    version = models.PositiveIntegerField(verbose_name='版本')
+    file = models.FileField(max_length=255, verbose_name='文件')
+    filename = models.CharField(max_length=255, verbose_name='文件名')
+    size = models.BigIntegerField(verbose_name='大小')
+    content_type = models.CharField(max_length=100, verbose_name='MIME类型')
+    # 算法:十六进制摘要，经过 Django 的文件为 sha256，直传到对象存储的为对象存储给出的 md5
+    checksum = models.CharField(max_length=80, verbose_name='校验和')
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='order_attachments',
+        verbose_name='上传人'
+    )
+    uploaded_at = models.DateTimeField(default=timezone.now, verbose_name='上传时间')
+
+    class Meta:
+        verbose_name = '订单附件'
+        verbose_name_plural = '订单附件'
+        ordering = ['order_id', 'kind', '-version']
+        constraints = [
+            # 同时作为 (order_id, kind, -version) 索引：取最新版本和按版本倒序列出都走它
+            models.UniqueConstraint(
+                F('order_id'), F('kind'), F('version').desc(),
+                name='attachment_order_kind_version_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} {self.get_kind_display()} v{self.version}"
+
+    @property
+    def etag(self):
+        return f'"{self.checksum.split(":", 1)[-1]}"'
+
+
+class OrderTombstone(models.Model):
+    """已离开在用订单表的订单，供增量同步（orders.changes）告知客户端删除本地缓存
+
+    管理员删除订单或订单被归档时写入；超过保留期的记录在写入新记录时清理，表保持很小。
+    """
+    REASON_CHOICES = (
+        ('deleted', '已删除'),
+        ('archived', '已归档'),
+    )
+
+    order_id = models.UUIDField(verbose_name='订单ID')
+    order_number = models.CharField(max_length=50, verbose_name='订单号')
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default='deleted', verbose_name='原因')
+    removed_at = models.DateTimeField(default=timezone.now, verbose_name='移除时间')
+
+    class Meta:
+        verbose_name = '订单移除记录'
+        verbose_name_plural = '订单移除记录'
+        ordering = ['removed_at', 'order_id']
+        indexes = [
+            # 与订单的 (updated_at, id) 游标合并翻页
+            models.Index(fields=['removed_at', 'order_id'], name='tombstone_removed_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} {self.get_reason_display()}"
@@ -0,0 +1,235 @@
+import math
+import os
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
+from django.utils import timezone
+
+from .models import Order
+
+User = get_user_model()
+
+# 与 Order.save() 一致的订单号格式：YP + 年月 + 4 位序号
+MAX_SEQ_PER_MONTH = 9999
+
+PLACEHOLDER_FILES = {
+    'order_file': 'seed/cutting_list.xlsx',
+    'production_sheet': 'seed/production_sheet.xlsx',
+    'outbound_file': 'seed/outbound.pdf',
+}
+
+# 状态流转顺序，用于补齐各阶段的操作人和时间
+STATUS_FLOW = ['pending', 'approved', 'ready_for_production', 'in_production',
+               'in_warehouse', 'out_warehouse', 'completed']
+
+# 越早的订单越可能已经完结
+RECENT_STATUS_WEIGHTS = {
+    'pending': 20, 'approved': 15, 'rejected': 5, 'ready_for_production': 15,
+    'in_production': 20, 'in_warehouse': 10, 'out_warehouse': 10, 'completed': 5,
+}
+HISTORIC_STATUS_WEIGHTS = {
+    'pending': 1, 'approved': 1, 'rejected': 6, 'ready_for_production': 1,
+    'in_production': 1, 'in_warehouse': 2, 'out_warehouse': 28, 'completed': 60,
+}
+
+
+def seed_users(per_role, prefix='seed', password='seed-pass-123'):
+    """为每个角色创建 per_role 个用户（已存在则复用），返回 {角色: [用户ID]}"""
+    hashed = make_password(password)
+    existing = set(User.objects.filter(username__startswith=f"{prefix}_").values_list('username', flat=True))
+    User.objects.bulk_create([
+        User(username=username, role=role, full_name=f"{label}{i + 1}",
+             password=hashed, is_staff=(role == 'admin'))
+        for role, label in User.ROLE_CHOICES
+        for i in range(per_role)
+        for username in [f"{prefix}_{role}_{i}"]
+        if username not in existing
+    ])
+
+    user_ids = {role: [] for role, _ in User.ROLE_CHOICES}
+    for pk, role in User.objects.filter(username__startswith=f"{prefix}_").values_list('pk', 'role'):
+        user_ids[role].append(pk)
+    return user_ids
+
+
+def ensure_placeholder_media():
+    """在 MEDIA_ROOT 下生成各类文件的占位文件，所有种子订单共用"""
+    for kind, name in PLACEHOLDER_FILES.items():
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(f"placeholder {kind}\n".encode() * 256)
+
+
+@contextmanager
+def preserve_timestamps():
+    """临时关闭 auto_now/auto_now_add，使 bulk_create 写入生成的时间
+
+    改的是模型字段上的类属性，对整个进程生效，不是线程安全的：期间其他线程保存的订单
+    也不会自动更新时间。只在 seed_orders、压测这类独占进程的命令中使用；退出时恢复原值。
+    """
+    created_at = Order._meta.get_field('created_at')
+    updated_at = Order._meta.get_field('updated_at')
+    saved = created_at.auto_now_add, updated_at.auto_now
+    try:
+        created_at.auto_now_add = False
+        updated_at.auto_now = False
+        yield
+    finally:
+        created_at.auto_now_add, updated_at.auto_now = saved
+
+
+def month_starts(months, anchor):
+    """anchor 之前的 months 个月每月第一天，按时间升序
+
+    anchor 本身不包含在内：anchor 恰好是月初零点时，最后一个月是上个月。
+    """
+    last = timezone.localtime(anchor) - timedelta(microseconds=1)
+    year, month = last.year, last.month
+    starts = []
+    for _ in range(months):
+        starts.append(last.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(starts))
+
+
+def next_sequence(prefix):
+    """某个订单号前缀下已使用的最大序号"""
+    result = Order.objects.filter(order_number__startswith=prefix).annotate(
+        seq_number=Cast(Substr('order_number', 9, 4), IntegerField())
+    ).aggregate(Max('seq_number'))
+    return (result['seq_number__max'] or 0) + 1
+
+
+def plan_batches(total, months, batch_size, seed, anchor):
+    """把 total 张订单按月份切成批次，最晚的订单早于 anchor
+
+    每批只落在一个月内，订单号在该月内连续编号，并接在库中已有序号之后。
+    anchor 由调用方显式传入，相同 seed 和 anchor 在空库上总是得到相同的批次。
+    """
+    rng = random.Random(seed)
+    starts = month_starts(months, anchor)
+    # 业务量逐年增长：越近的月份权重越高
+    weights = [1 + 0.5 * i / len(starts) + rng.random() * 0.2 for i in range(len(starts))]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    counts[-1] += total - sum(counts)
+
+    batches = []
+    anchor = timezone.localtime(anchor)
+    for index, (start, count) in enumerate(zip(starts, counts)):
+        if count <= 0:
+            continue
+        prefix = f"YP{start:%Y%m}"
+        first_seq = next_sequence(prefix)
+        if first_seq + count - 1 > MAX_SEQ_PER_MONTH:
+            raise ValueError(
+                f"{start:%Y-%m} 需要 {count} 个订单号，超过每月 {MAX_SEQ_PER_MONTH} 的上限，请增大月份数"
+            )
+        end = starts[index + 1] if index + 1 < len(starts) else anchor
+        span = end - start
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            # 每批占用月内相应的时间段，保证订单号和创建时间同序
+            batches.append({
+                'prefix': prefix,
+                'first_seq': first_seq + offset,
+                'count': size,
+                'start': start + span * offset / count,
+                'end': start + span * (offset + size) / count,
+                'historic': index < len(starts) - 2,
+            })
+    return batches
+
+
+def _fill_workflow(order, rng, user_ids):
+    """按状态补齐审核、生产、出入库等阶段的字段"""
+    created = order.created_at
+    last = created
+
+    def later(hours):
+        nonlocal last
+        last = last + timedelta(hours=rng.uniform(1, hours))
+        return last
+
+    if order.status == 'rejected':
+        order.reviewed_by_id = rng.choice(user_ids['reviewer'])
+        order.review_date = later(48)
+        order.review_notes = '资料不全，请补充后重新提交'
+    elif order.status != 'pending':
+        reached = STATUS_FLOW.index(order.status)
+        order.reviewed_by_id = rng.choice(user_ids['reviewer'])
+        order.review_date = later(48)
+        order.review_notes = '同意'
+        if reached >= STATUS_FLOW.index('ready_for_production'):
+            order.production_sheet = PLACEHOLDER_FILES['production_sheet']
+            order.production_started_by_id = rng.choice(user_ids['technician'])
+            order.production_started_at = later(72)
+        if reached >= STATUS_FLOW.index('in_warehouse'):
+            order.inbound_by_id = rng.choice(user_ids['warehouse_clerk'])
+            order.inbound_at = later(240)
+        if reached >= STATUS_FLOW.index('out_warehouse'):
+            order.outbound_by_id = rng.choice(user_ids['warehouse_clerk'])
+            order.outbound_at = later(120)
+            order.outbound_file = PLACEHOLDER_FILES['outbound_file']
+            order.outbound_notes = '已发货'
+    order.updated_at = last
+
+
+def build_batch(batch, user_ids, seed):
+    """生成一批未保存的 Order；同一 seed 和起始订单号总是得到相同结果
+
+    随机数按起始订单号（而不是批次号）播种：库中已有数据时再次运行，订单号接着已有序号编排，
+    生成的订单ID也随之不同，不会与上次的主键冲突；空库上用相同 seed 运行仍得到相同数据。
+    """
+    rng = random.Random(f"{seed}:{batch['prefix']}{batch['first_seq']:04d}")
+    weights = HISTORIC_STATUS_WEIGHTS if batch['historic'] else RECENT_STATUS_WEIGHTS
+    statuses, status_weights = list(weights), list(weights.values())
+    creators = user_ids['order_clerk'] + user_ids['admin']
+    span = (batch['end'] - batch['start']).total_seconds()
+
+    # 订单号在月内递增，创建时间也应递增
+    offsets = sorted(rng.random() * span for _ in range(batch['count']))
+    orders = []
+    for i, offset in enumerate(offsets):
+        seq = batch['first_seq'] + i
+        order = Order(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            order_number=f"{batch['prefix']}{seq:04d}",
+            user_id=rng.choice(creators),
+            project_name=f"{rng.choice(['城东', '城西', '滨江', '高新', '开发区'])}项目{seq}号楼",
+            ordered_by=f"客户{rng.randint(1, 500)}",
+            order_file=PLACEHOLDER_FILES['order_file'],
+            status=rng.choices(statuses, status_weights)[0],
+            created_at=batch['start'] + timedelta(seconds=offset),
+        )
+        _fill_workflow(order, rng, user_ids)
+        orders.append(order)
+    return orders
+
+
+def insert_batch(batch, user_ids, seed):
+    """生成并写入一批订单，绕过 Order.save() 的逐条编号"""
+    orders = build_batch(batch, user_ids, seed)
+    with preserve_timestamps(), transaction.atomic():
+        Order.objects.bulk_create(orders, batch_size=len(orders))
+    return len(orders)
+
+
+def default_months(total):
+    """按每月订单号上限估算需要的月份数，至少一年
+
+    月份权重最大约为平均值的 1.26 倍，留出余量避免最近月份超过上限。
+    """
+    return max(12, math.ceil(total * 1.3 / MAX_SEQ_PER_MONTH))
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Order
+from .models import ArchivedOrder, Order, OrderAttachment
 from users.serializers import UserSerializer
 
 
@@ -44,6 +44,32 @@ class OrderSerializer(serializers.ModelSerializer):
         return data
 
 
+class ArchivedOrderSerializer(OrderSerializer):
+    """归档订单，字段与 OrderSerializer 相同，另加归档时间"""
+    
+    class Meta(OrderSerializer.Meta):
+        model = ArchivedOrder
+        fields = OrderSerializer.Meta.fields + ['archived_at']
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['archived'] = True
+        return data
+
+
+class OrderAttachmentSerializer(serializers.ModelSerializer):
+    """订单文件的一个版本"""
+    uploaded_by = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = OrderAttachment
+        fields = [
+            'id', 'kind', 'version', 'filename', 'size', 'content_type', 'checksum',
+            'uploaded_by', 'uploaded_at',
+        ]
+        read_only_fields = fields
+
+
 class OrderCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
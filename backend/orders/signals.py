@@ -0,0 +1,47 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .changes import record_removed
+from .dashboard import ORDER_GROUPS, USER_GROUPS, invalidate_dashboard
+from .inbox import invalidate_inbox
+from .models import Order, OrderAttachment
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Order, dispatch_uid='orders.invalidate_dashboard_on_order_save')
+@receiver(post_delete, sender=Order, dispatch_uid='orders.invalidate_dashboard_on_order_delete')
+def invalidate_order_dashboard(sender, instance, using, **kwargs):
+    """订单新建、流转或删除后清除控制台的订单分组和各角色的收件箱
+
+    与认证缓存一样在事务提交后清除，避免并发请求把提交前的数据重新缓存。
+    """
+    transaction.on_commit(partial(_invalidate_order_caches, instance.user_id), using=using)
+
+
+def _invalidate_order_caches(owner_id):
+    invalidate_dashboard(*ORDER_GROUPS)
+    invalidate_inbox(owner_id)
+
+
+@receiver(post_delete, sender=Order, dispatch_uid='orders.delete_attachments_on_order_delete')
+def delete_order_attachments(sender, instance, **kwargs):
+    """删除订单时一并删除其附件记录；归档用 _raw_delete，不会触发这里"""
+    OrderAttachment.objects.filter(order_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Order, dispatch_uid='orders.record_tombstone_on_order_delete')
+def record_order_tombstone(sender, instance, **kwargs):
+    """删除订单时记下移除记录，增量同步的客户端据此从本地缓存移除；归档在 archive_batch 中记录"""
+    record_removed([instance])
+
+
+@receiver(post_save, sender=User, dispatch_uid='orders.invalidate_dashboard_on_user_save')
+@receiver(post_delete, sender=User, dispatch_uid='orders.invalidate_dashboard_on_user_delete')
+def invalidate_user_dashboard(sender, instance, using, **kwargs):
+    """用户新增、删除或角色、激活状态变化后清除控制台的用户分组（事务提交后）"""
+    transaction.on_commit(partial(invalidate_dashboard, *USER_GROUPS), using=using)
@@ -0,0 +1,124 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orders import async_views
+from orders.models import Order
+from system.db import router as db_router
+from system.idempotency import REPLAYED_HEADER
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'async-view-tests'}}
+
+CONTENT = b'a,b\n1,2\n'
+
+
+async def read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+# 异步视图在线程池中访问数据库，只能用 TransactionTestCase
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsyncOrderViewTests(TransactionTestCase):
+    databases = '__all__'
+    factory = AsyncRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        # 这里不经过读写分离中间件，副本上也没有同步表结构，读写都走主库
+        patcher = mock.patch.object(db_router, 'replica_alias', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.clerk = User.objects.create_user('clerk', 'secret', role='order_clerk')
+        self.reviewer = User.objects.create_user('reviewer', 'secret', role='reviewer')
+        self.technician = User.objects.create_user('technician', 'secret', role='technician')
+
+    def auth(self, user):
+        return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def create(self, user, **headers):
+        # AsyncRequestFactory 的额外关键字参数进入 ASGI scope，请求头要通过 headers 传
+        return self.factory.post('/api/orders/new/', {
+            'project_name': '测试项目',
+            'ordered_by': '张三',
+            'order_file': SimpleUploadedFile('cutting.csv', CONTENT),
+        }, headers={**self.auth(user), **headers})
+
+    async def test_create_order(self):
+        response = await async_views.create_order(self.create(self.clerk))
+        self.assertEqual(response.status_code, 201)
+        order = json.loads(response.content)['order']
+        self.assertTrue(await Order.objects.filter(pk=order['id'], user=self.clerk).aexists())
+
+    async def test_create_retry_replays_first_response(self):
+        first = await async_views.create_order(self.create(self.clerk, **{'Idempotency-Key': 'create-1'}))
+        retry = await async_views.create_order(self.create(self.clerk, **{'Idempotency-Key': 'create-1'}))
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry[REPLAYED_HEADER], 'true')
+        self.assertEqual(await Order.objects.acount(), 1)
+
+    async def test_role_failure_matches_sync_view(self):
+        response = await async_views.create_order(self.create(self.technician))
+        self.assertEqual(response.status_code, 403)
+
+        client = APIClient()
+        client.force_authenticate(self.technician)
+        expected = await sync_to_async(client.post)('/api/orders/new/', {'project_name': '测试项目'})
+        self.assertEqual(expected.status_code, 403)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(set(expected.json()), {'error', 'detail'})
+
+    async def test_pending_orders_streams_all(self):
+        for seq in range(1, 4):
+            await Order.objects.acreate(order_number=f'YP202610{seq:04d}', user=self.clerk,
+                                        project_name='测试项目', ordered_by='张三')
+        request = self.factory.get('/api/orders/pending/', {'page_size': 'all'}, headers=self.auth(self.reviewer))
+        response = await async_views.pending_orders(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        data = json.loads(await read_stream(response))
+        self.assertEqual(data['count'], 3)
+        self.assertEqual([order['order_number'] for order in data['results']],
+                         ['YP2026100003', 'YP2026100002', 'YP2026100001'])
+
+    async def test_pending_orders_requires_reviewer(self):
+        request = self.factory.get('/api/orders/pending/', {'page_size': 'all'}, headers=self.auth(self.clerk))
+        response = await async_views.pending_orders(request)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content), {'detail': '需要管理员或审核员权限'})
+
+    async def test_download_order_file(self):
+        created = await async_views.create_order(self.create(self.clerk))
+        order_id = json.loads(created.content)['order']['id']
+
+        request = self.factory.get(f'/api/orders/{order_id}/download/order_file/', headers=self.auth(self.reviewer))
+        response = await async_views.download_order_file(request, order_id, 'order_file')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await read_stream(response), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertIn('cutting.csv', response['Content-Disposition'])
+
+        request = self.factory.get(f'/api/orders/{order_id}/download/order_file/',
+                                   headers={**self.auth(self.reviewer), 'If-None-Match': response['ETag']})
+        response = await async_views.download_order_file(request, order_id, 'order_file')
+        self.assertEqual(response.status_code, 304)
+
+    async def test_unauthenticated_is_401(self):
+        request = self.factory.get('/api/orders/pending/')
+        response = await async_views.pending_orders(request)
+        self.assertEqual(response.status_code, 401)
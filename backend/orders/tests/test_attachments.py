@@ -0,0 +1,15 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from orders.attachments import describe_upload
+
+
+class DescribeUploadTests(SimpleTestCase):
+
+    def test_content_type_from_extension_not_client(self):
+        upload = SimpleUploadedFile('cutting.csv', b'a,b\n1,2\n', content_type='text/html')
+        self.assertEqual(describe_upload('order_file', upload)['content_type'], 'text/csv')
+
+    def test_unknown_extension_is_octet_stream(self):
+        upload = SimpleUploadedFile('cutting', b'a,b\n', content_type='text/html')
+        self.assertEqual(describe_upload('order_file', upload)['content_type'], 'application/octet-stream')
@@ -0,0 +1,55 @@
+import io
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from orders.attachments import describe_upload, record_attachment
+from orders.bundles import bundle_stream
+from orders.models import Order
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bundle-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BundleStreamTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        user = User.objects.create_user('clerk', 'secret')
+        self.order = Order(order_number='YP2026100001', user=user, project_name='测试项目', ordered_by='张三')
+        self.order.order_file.save('cutting.csv', ContentFile(b'a,b\n1,2\n'), save=False)
+        self.order.outbound_file.save('outbound.pdf', ContentFile(b'%PDF-1.4 test'), save=False)
+        self.order.save()
+        for kind in ('order_file', 'outbound_file'):
+            field = getattr(self.order, kind)
+            with field.open('rb'):
+                record_attachment(self.order, kind, describe_upload(kind, field))
+
+    def read_bundle(self):
+        content = b''.join(bundle_stream([self.order]))
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_bundles_all_files(self):
+        files = self.read_bundle()
+        self.assertEqual(files, {
+            '下料单_YP2026100001.csv': b'a,b\n1,2\n',
+            '出库单_YP2026100001.pdf': b'%PDF-1.4 test',
+        })
+
+    def test_skips_file_missing_behind_attachment_record(self):
+        # 附件记录还在，文件已丢失：跳过该文件，ZIP 仍然完整
+        self.order.outbound_file.storage.delete(self.order.outbound_file.name)
+        with self.assertLogs('orders.bundles', 'WARNING'):
+            files = self.read_bundle()
+        self.assertEqual(list(files), ['下料单_YP2026100001.csv'])
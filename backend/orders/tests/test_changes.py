@@ -0,0 +1,111 @@
+import unittest
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.changes import CursorError, changes_since, encode_cursor
+from orders.models import Order, OrderTombstone
+from system.db import router as db_router
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'changes-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ORDER_CHANGES={'SETTLE_SECONDS': 0})
+class ChangesSinceTests(TestCase):
+    databases = '__all__'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', 'secret', role='order_clerk')
+        cls.base = timezone.now() - timedelta(hours=1)
+
+    def make_order(self, seq, minutes):
+        order = Order.objects.create(
+            order_number=f'YP202610{seq:04d}', user=self.user, project_name='测试项目', ordered_by='张三',
+        )
+        # updated_at 是 auto_now，直接改库里的值
+        Order.objects.filter(pk=order.pk).update(updated_at=self.base + timedelta(minutes=minutes))
+        return order.pk
+
+    def make_tombstone(self, seq, minutes):
+        return OrderTombstone.objects.create(
+            order_id=uuid.uuid4(), order_number=f'YP202609{seq:04d}',
+            removed_at=self.base + timedelta(minutes=minutes),
+        ).order_id
+
+    def sync(self, since=None, limit=None):
+        changed, removed, cursor, has_more = changes_since(Order.objects.all(), since, limit)
+        return [order.pk for order in changed], [tombstone.order_id for tombstone in removed], cursor, has_more
+
+    def test_ties_on_updated_at_across_page_boundary(self):
+        ids = sorted(self.make_order(seq, 0) for seq in range(1, 4))
+
+        first, _, cursor, has_more = self.sync(limit=2)
+        self.assertEqual((first, has_more), (ids[:2], True))
+        second, _, cursor, has_more = self.sync(cursor, limit=2)
+        self.assertEqual((second, has_more), (ids[2:], False))
+        self.assertEqual(self.sync(cursor)[:2], ([], []))
+
+    def test_orders_and_tombstones_merged_by_position(self):
+        first = self.make_order(1, 0)
+        removed = self.make_tombstone(1, 1)
+        last = self.make_order(2, 2)
+
+        pages, cursor = [], None
+        for _ in range(3):
+            changed, gone, cursor, has_more = self.sync(cursor, limit=1)
+            pages.append((changed, gone, has_more))
+        self.assertEqual(pages, [([first], [], True), ([], [removed], True), ([last], [], False)])
+
+        changed, gone, _, has_more = self.sync(limit=10)
+        self.assertEqual((changed, gone, has_more), ([first, last], [removed], False))
+
+    def test_later_changes_after_cursor(self):
+        self.make_order(1, 0)
+        _, _, cursor, has_more = self.sync()
+        self.assertFalse(has_more)
+        self.assertEqual(self.sync(cursor)[:2], ([], []))
+
+        updated = self.make_order(2, 5)
+        self.assertEqual(self.sync(cursor)[:2], ([updated], []))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(CursorError):
+            self.sync('not-a-cursor')
+
+    @unittest.skipUnless(db_router.replica_alias(), '需要 fire_door_oa.test_settings 中的副本数据库')
+    def test_queries_primary_even_when_reads_go_to_replica(self):
+        order_id = self.make_order(1, 0)
+        # 副本上没有这些表，查询落到副本会直接报错
+        with mock.patch.object(db_router.ReplicaRouter, 'db_for_read', return_value=db_router.replica_alias()):
+            self.assertEqual(self.sync()[0], [order_id])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class OrderChangesViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('tracker', 'secret', role='workshop_tracker'))
+
+    def test_invalid_cursor_is_400(self):
+        response = self.client.get('/api/orders/changes/', {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': '无效的同步游标'})
+
+    def test_expired_cursor_is_410(self):
+        synced_at = timezone.now() - timedelta(days=31)
+        cursor = encode_cursor((synced_at, uuid.uuid4()), synced_at)
+        response = self.client.get('/api/orders/changes/', {'since': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertIn('error', response.json())
+
+    def test_full_sync_page(self):
+        response = self.client.get('/api/orders/changes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'orders', 'deleted', 'cursor', 'has_more'})
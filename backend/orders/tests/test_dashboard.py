@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from orders.dashboard import _compute_throughput
+from orders.models import Order
+from users.models import User
+
+
+class ThroughputTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', 'secret', role='order_clerk')
+
+    def make_order(self, seq, **fields):
+        order = Order.objects.create(order_number=f'YP202610{seq:04d}', user=self.user,
+                                     project_name='测试项目', ordered_by='张三')
+        Order.objects.filter(pk=order.pk).update(**fields)
+
+    def test_counts_today_events_only(self):
+        now = timezone.now()
+        yesterday = now - timedelta(days=1)
+        self.make_order(1)
+        self.make_order(2, created_at=yesterday, review_date=now, updated_at=now)
+        self.make_order(3, created_at=yesterday, review_date=yesterday, updated_at=yesterday)
+
+        throughput = _compute_throughput()
+        self.assertEqual(throughput['created'], 1)
+        self.assertEqual(throughput['reviewed'], 1)
+        self.assertEqual(throughput['outbound'], 0)
+
+    def test_prefilters_on_updated_at(self):
+        with CaptureQueriesContext(connection) as queries:
+            _compute_throughput()
+        self.assertIn('"updated_at" >=', queries.captured_queries[-1]['sql'])
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'inbox-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class InboxTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'secret', role='order_clerk')
+        self.bob = User.objects.create_user('bob', 'secret', role='order_clerk')
+        self.reviewer = User.objects.create_user('reviewer', 'secret', role='reviewer')
+        self.seq = 0
+
+    def make_order(self, user, status):
+        self.seq += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            return Order.objects.create(order_number=f'YP202610{self.seq:04d}', user=user, status=status,
+                                        project_name='测试项目', ordered_by='张三')
+
+    def inbox(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/orders/inbox/')
+        self.assertEqual(response.status_code, 200)
+        return {queue['status']: queue for queue in response.json()['queues']}
+
+    def test_rejected_queue_lists_only_own_orders(self):
+        own = self.make_order(self.alice, 'rejected')
+        self.make_order(self.bob, 'rejected')
+
+        rejected = self.inbox(self.alice)['rejected']
+        self.assertEqual(rejected['count'], 1)
+        self.assertEqual([order['id'] for order in rejected['results']], [str(own.pk)])
+        self.assertEqual(self.inbox(self.bob)['rejected']['count'], 1)
+
+    def test_shared_queues_list_everyones_orders(self):
+        self.make_order(self.alice, 'pending')
+        self.make_order(self.bob, 'pending')
+        self.assertEqual(self.inbox(self.reviewer)['pending']['count'], 2)
+
+    def test_owner_inbox_invalidated_on_change(self):
+        order = self.make_order(self.alice, 'rejected')
+        self.assertEqual(self.inbox(self.alice)['rejected']['count'], 1)
+        self.assertEqual(self.inbox(self.bob)['rejected']['count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'pending'
+            order.save()
+        self.assertEqual(self.inbox(self.alice)['rejected']['count'], 0)
+
+        self.make_order(self.bob, 'rejected')
+        self.assertEqual(self.inbox(self.bob)['rejected']['count'], 1)
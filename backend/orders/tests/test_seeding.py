@@ -0,0 +1,58 @@
+import io
+from datetime import datetime
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from orders.models import Order
+from orders.seeding import month_starts, preserve_timestamps
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'seeding-tests'}}
+
+OPTIONS = {'orders': 60, 'months': 12, 'users_per_role': 1, 'batch_size': 20, 'no_media': True}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SeedOrdersTests(TestCase):
+
+    def seed(self, **options):
+        call_command('seed_orders', stdout=io.StringIO(), **{**OPTIONS, **options})
+
+    def test_rerun_with_same_seed_appends_orders(self):
+        self.seed()
+        first = set(Order.objects.values_list('order_number', flat=True))
+        self.seed()
+        self.assertEqual(Order.objects.count(), 120)
+        self.assertTrue(first < set(Order.objects.values_list('order_number', flat=True)))
+
+    def test_same_seed_on_empty_database_is_reproducible(self):
+        self.seed()
+        first = list(Order.objects.order_by('order_number').values_list('id', 'order_number', 'status'))
+        Order.objects.all().delete()
+        self.seed()
+        second = list(Order.objects.order_by('order_number').values_list('id', 'order_number', 'status'))
+        self.assertEqual(first, second)
+
+    def test_until_anchors_generated_months(self):
+        self.seed(until='2025-03-01')
+        anchor = timezone.make_aware(datetime(2025, 3, 1))
+        self.assertLess(Order.objects.latest('created_at').created_at, anchor)
+        prefixes = {number[:8] for number in Order.objects.values_list('order_number', flat=True)}
+        self.assertEqual(min(prefixes), 'YP202403')
+        self.assertEqual(max(prefixes), 'YP202502')
+
+    def test_invalid_until(self):
+        with self.assertRaises(CommandError):
+            self.seed(until='2025/03/01')
+
+    def test_month_starts_excludes_anchor_month_at_midnight(self):
+        starts = month_starts(2, timezone.make_aware(datetime(2025, 1, 1)))
+        self.assertEqual([f'{start:%Y-%m-%d}' for start in starts], ['2024-11-01', '2024-12-01'])
+
+    def test_preserve_timestamps_restores_flags_on_error(self):
+        with self.assertRaises(RuntimeError), preserve_timestamps():
+            self.assertFalse(Order._meta.get_field('updated_at').auto_now)
+            raise RuntimeError
+        self.assertTrue(Order._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(Order._meta.get_field('updated_at').auto_now)
@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from orders.dashboard import order_counts
+from orders.inbox import get_inbox
+from orders.models import Order
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'signal-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class OrderCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('clerk', 'secret', role='order_clerk')
+        self.reviewer = User.objects.create_user('reviewer', 'secret', role='reviewer')
+
+    def test_dashboard_and_inbox_invalidated_after_commit(self):
+        self.assertEqual(order_counts()['total'], 0)
+        self.assertEqual(get_inbox(self.reviewer)['queues'][0]['count'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(order_number='YP2026100001', user=self.user, project_name='测试项目', ordered_by='张三')
+            # 提交前仍是缓存中的旧值
+            self.assertEqual(order_counts()['total'], 0)
+        self.assertEqual(order_counts()['total'], 1)
+        self.assertEqual(get_inbox(self.reviewer)['queues'][0]['count'], 1)
@@ -0,0 +1,145 @@
+"""订单文件直传
+
+文件存储支持预签名 URL（system.storage.S3Storage）时，客户端先向 uploads/ 申请上传地址，
+用 PUT 把文件直接传到对象存储，再在创建订单、上传生产面单、出库等接口中提交
+<字段名>_upload 令牌代替文件本身。Django 只负责鉴权、签发令牌、核对对象大小和记录文件名；
+下载时重定向到预签名的 GET 地址。使用本地磁盘存储时这些接口返回 400，原有的表单上传不变。
+
+令牌用 SECRET_KEY 签名，绑定用户、字段、订单和对象键，客户端不能改成别的路径。
+"""
+import logging
+import mimetypes
+import os
+import uuid
+from types import SimpleNamespace
+
+from django.core import signing
+
+from users.roles import permission_mask, role_has_permission
+
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+# 字段 -> 申请直传地址需要的权限（任一即可）
+UPLOAD_PERMISSIONS = {
+    'order_file': permission_mask('create_order', 'edit_rejected_orders'),
+    'production_sheet': permission_mask('upload_production_sheets'),
+    'outbound_file': permission_mask('manage_inventory'),
+}
+
+TOKEN_SALT = 'orders.direct-upload'
+# 令牌有效期：上传完成后还要填写表单再提交
+TOKEN_MAX_AGE = 24 * 3600
+
+
+class UploadError(Exception):
+    """直传令牌无效或对象不符合要求，消息直接返回给客户端"""
+
+
+def field_storage(field_name):
+    return Order._meta.get_field(field_name).storage
+
+
+def supports_direct_transfer(storage):
+    return hasattr(storage, 'presigned_put') and hasattr(storage, 'presigned_get')
+
+
+def issue_upload(user, field_name, filename, order_id=None):
+    """签发直传地址和令牌
+
+    order_id 为空表示新建订单：预先分配订单 id，创建订单时沿用，文件路径与表单上传一致。
+    """
+    if field_name not in UPLOAD_PERMISSIONS:
+        raise UploadError('不支持的文件类型')
+    if not role_has_permission(user.role, UPLOAD_PERMISSIONS[field_name]):
+        raise UploadError('您没有权限上传该文件')
+    storage = field_storage(field_name)
+    if not supports_direct_transfer(storage):
+        raise UploadError('当前文件存储不支持直传，请直接上传文件')
+
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise UploadError('缺少文件名')
+
+    new_order = order_id is None
+    order_id = uuid.uuid4() if new_order else order_id
+    field = Order._meta.get_field(field_name)
+    key = storage.get_available_name(
+        field.generate_filename(SimpleNamespace(id=order_id), filename), max_length=field.max_length
+    )
+    token = signing.dumps({
+        'key': key,
+        'field': field_name,
+        'order': str(order_id),
+        'new': new_order,
+        'user': str(user.pk),
+    }, salt=TOKEN_SALT)
+    config = storage.config
+    return {
+        'upload': token,
+        'order_id': str(order_id),
+        'url': storage.presigned_put(key),
+        'method': 'PUT',
+        'headers': {'Content-Type': mimetypes.guess_type(filename)[0] or 'application/octet-stream'},
+        'expires_in': config['PRESIGN_EXPIRES'],
+        'max_size': config['MAX_UPLOAD_SIZE'],
+    }
+
+
+def claim_upload(token, user, field_name, order_id=None):
+    """核对直传令牌和已上传的对象，返回 (对象键, 订单 id)
+
+    order_id 为空时令牌必须是为新建订单签发的，返回预先分配的订单 id。
+    """
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)
+    except signing.SignatureExpired:
+        raise UploadError('上传令牌已过期，请重新上传文件')
+    except signing.BadSignature:
+        raise UploadError('上传令牌无效')
+
+    if data['field'] != field_name or data['user'] != str(user.pk):
+        raise UploadError('上传令牌与当前操作不匹配')
+    if order_id is None:
+        if not data['new']:
+            raise UploadError('上传令牌与当前操作不匹配')
+    elif data['new'] or data['order'] != str(order_id):
+        raise UploadError('上传令牌与当前订单不匹配')
+
+    storage = field_storage(field_name)
+    key = data['key']
+    try:
+        size = storage.size(key)
+    except FileNotFoundError:
+        raise UploadError('文件尚未上传完成')
+    max_size = storage.config['MAX_UPLOAD_SIZE']
+    if size > max_size:
+        storage.delete(key)
+        raise UploadError(f'文件超过 {max_size // (1024 * 1024)}MB 上限')
+
+    logger.info(f"直传文件已确认: {field_name} {key} ({size} bytes), 用户 {user.username}")
+    return key, uuid.UUID(data['order'])
+
+
+def received_file(data, files, field_name, user, order_id=None):
+    """取请求中的文件：表单上传的文件，或 <字段名>_upload 直传令牌对应的对象键
+
+    返回 (文件或对象键, 订单 id)；订单 id 只有新建订单的直传才有值。都没有时返回 (None, None)，
+    令牌无效时抛出 UploadError。
+    """
+    upload = files.get(field_name)
+    if upload:
+        return upload, None
+    token = data.get(f'{field_name}_upload')
+    if not token:
+        return None, None
+    key, token_order_id = claim_upload(token, user, field_name, order_id)
+    return key, (token_order_id if order_id is None else None)
+
+
+def download_url(file_field, filename):
+    """存储支持直传时返回预签名下载地址，否则返回 None"""
+    if not supports_direct_transfer(file_field.storage):
+        return None
+    return file_field.storage.presigned_get(file_field.name, filename=filename)
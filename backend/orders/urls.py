@@ -1,42 +1,63 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+
+def io_view(sync_view, async_name):
+    """ASGI 部署（ASYNC_VIEWS 开启）时，列表、上传、下载换成 async_views 中的异步版本"""
+    if not settings.ASYNC_VIEWS:
+        # WSGI 部署不导入异步视图模块
+        return sync_view
+    from . import async_views
+    return getattr(async_views, async_name)
+
+
 urlpatterns = [
     # 订单创建和列表
-    path('new/', views.OrderCreateView.as_view(), name='order-create'),
-    path('my/', views.MyOrdersView.as_view(), name='my-orders'),
-    path('paginated/', views.OrderListPaginated.as_view(), name='order-list-paginated'),
+    path('new/', io_view(views.OrderCreateView.as_view(), 'create_order'), name='order-create'),
+    path('my/', io_view(views.MyOrdersView.as_view(), 'my_orders'), name='my-orders'),
+    path('paginated/', io_view(views.OrderListPaginated.as_view(), 'my_orders'), name='order-list-paginated'),
+    path('inbox/', views.my_inbox, name='order-inbox'),
+    path('search/', views.order_search, name='order-search'),
+    path('changes/', views.order_changes, name='order-changes'),
+    path('export/', views.order_export, name='order-export'),
+    path('bundle/', views.order_bundle, name='order-bundle'),
+    path('uploads/', views.order_upload_url, name='order-upload-url'),
     
     # 订单详情和操作
     path('<uuid:pk>/', views.OrderDetailView.as_view(), name='order-detail'),
     path('<uuid:pk>/resubmit/', views.OrderResubmitView.as_view(), name='order-resubmit'),
     
     # 审核相关
-    path('pending/', views.PendingOrdersView.as_view(), name='pending-orders'),
+    path('pending/', io_view(views.PendingOrdersView.as_view(), 'pending_orders'), name='pending-orders'),
     # 修复：审核URL也使用UUID
     path('<uuid:pk>/review/', views.OrderReviewView.as_view(), name='order-review'),
     
     # 技术员相关
-    path('approved/', views.ApprovedOrdersView.as_view(), name='approved-orders'),
-    path('<uuid:pk>/upload-production-sheet/', views.UploadProductionSheetView.as_view(), name='upload-production-sheet'),
-    path('ready-for-production/', views.ReadyProductionOrdersView.as_view(), name='ready-production-orders'),
+    path('approved/', io_view(views.ApprovedOrdersView.as_view(), 'approved_orders'), name='approved-orders'),
+    path('<uuid:pk>/upload-production-sheet/', io_view(views.UploadProductionSheetView.as_view(), 'upload_production_sheet'), name='upload-production-sheet'),
+    path('ready-for-production/', io_view(views.ReadyProductionOrdersView.as_view(), 'ready_production_orders'), name='ready-production-orders'),
     path('<uuid:order_id>/start-production/', views.ReadyProductionOrdersView.order_start_production, name='start-production'),
     
-    path('in-production/', views.InProductionOrdersView.as_view(), name='in_production_orders'),
+    path('in-production/', io_view(views.InProductionOrdersView.as_view(), 'in_production_orders'), name='in_production_orders'),
     
     # 下载
-    path('<uuid:pk>/download/<str:file_type>/', views.DownloadOrderFileView.as_view(), name='download-order-file'),
+    path('<uuid:pk>/download/<str:file_type>/', io_view(views.DownloadOrderFileView.as_view(), 'download_order_file'), name='download-order-file'),
+    path('<uuid:pk>/download-url/<str:file_type>/', views.order_download_url, name='order-download-url'),
+    path('<uuid:pk>/attachments/', views.order_attachments, name='order-attachments'),
+    path('<uuid:pk>/bundle/', views.order_bundle, name='order-file-bundle'),
 
     # 出入库相关路由
-    path('warehouse-orders/', views.warehouse_orders, name='warehouse-orders'),
+    path('warehouse-orders/', io_view(views.warehouse_orders, 'warehouse_orders'), name='warehouse-orders'),
     path('<uuid:order_id>/inbound/', views.order_inbound, name='order-inbound'),
-    path('<uuid:order_id>/outbound/', views.order_outbound, name='order-outbound'),
+    path('<uuid:order_id>/outbound/', io_view(views.order_outbound, 'order_outbound'), name='order-outbound'),
     # 兼容性路由
     # path('<uuid:order_id>/download-outbound-file/', views.download_outbound_file, name='download-outbound-file'),
     
     # 统计
     path('admin/stats/', views.order_stats, name='order-stats'),
     path('stats/', views.order_stats, name='orders-stats'),
+    path('admin/summary/', views.dashboard_summary_view, name='dashboard-summary'),
     # 管理员删除订单路由
     path('<uuid:pk>/delete/', views.OrderDeleteView.as_view(), name='order-delete'),
 ]
@@ -5,19 +5,38 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import api_view, permission_classes
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.core.paginator import InvalidPage
+from datetime import datetime, timedelta
 from django.db.models import Q, Count
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse, FileResponse, Http404
+from django.http import HttpResponse, HttpResponseNotModified, HttpResponseRedirect, FileResponse, Http404
 from django.utils.cache import add_never_cache_headers  # 导入 add_never_cache_headers
-from django.core.cache import cache
 import mimetypes
 import os
 import logging
-from users.permissions import IsAdminUser
+import uuid
+from itertools import islice
 
-from .models import Order
-from .serializers import OrderSerializer, OrderCreateSerializer, OrderReviewSerializer, ProductionSheetSerializer
-from users.permissions import IsAdminOrReviewer, IsOrderClerk, CanViewOwnOrders, IsTechnician, CanDownloadOrderFiles, IsWarehouseClerk
+from .archive import ORDER_RELATED, SEARCH_LIMIT, find_order, search_orders
+from .attachments import describe_upload, etag_matches, find_attachment, record_attachment
+from .bundles import FILE_LABELS, MAX_BUNDLE_ORDERS, bundle_orders, bundle_stream
+from .changes import CursorError, CursorExpired, changes_since
+from .dashboard import dashboard_summary, order_counts, user_counts
+from .exports import EXPORT_FORMATS
+from .inbox import get_inbox
+from .models import ArchivedOrder, Order, OrderAttachment
+from .transfers import UploadError, download_url, issue_upload, received_file
+from .serializers import (
+    ArchivedOrderSerializer, OrderAttachmentSerializer, OrderSerializer, OrderCreateSerializer,
+    OrderReviewSerializer, ProductionSheetSerializer,
+)
+from system.idempotency import idempotent
+from system.streaming import stream_json_array, streaming_response
+from users.permissions import (
+    IsAdminUser, IsAdminOrReviewer, IsOrderClerk, CanViewOwnOrders, IsTechnician,
+    CanDownloadOrderFiles, IsWarehouseClerk, permission_required, role_required,
+)
 
 User = get_user_model()
 
@@ -28,21 +47,69 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+
+class StreamingListMixin:
+    """订单列表的大结果模式流式输出
+
+    - page_size=all：不分页，返回 {"results": [...], "count": N}，count 在输出的同一次遍历中统计
+    - 每页达到 stream_page_size 行：分页字段不变，本页结果分批输出
+
+    结果用服务端游标读取，每 stream_batch_size 行序列化、编码后立即发送，
+    内存占用只与批大小有关。其余情况按普通分页返回。
+    """
+    all_page_size = 'all'
+    stream_page_size = 50
+    stream_batch_size = 50
+
+    def serialized_batches(self, queryset):
+        rows = queryset.iterator(chunk_size=self.stream_batch_size)
+        while True:
+            batch = list(islice(rows, self.stream_batch_size))
+            if not batch:
+                break
+            yield self.get_serializer(batch, many=True).data
+
+    def streaming_list(self, request, queryset):
+        """需要流式输出时返回响应，否则返回 None"""
+        paginator = self.paginator
+        if request.query_params.get(paginator.page_size_query_param) == self.all_page_size:
+            chunks = stream_json_array(self.serialized_batches(queryset), count_key='count')
+            return streaming_response(request, chunks, content_type='application/json')
+
+        page_size = paginator.get_page_size(request)
+        if page_size < self.stream_page_size:
+            return None
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        try:
+            page = django_paginator.page(paginator.get_page_number(request, django_paginator))
+        except InvalidPage:
+            # 页码无效时交给普通分页返回 404
+            return None
+        paginator.request, paginator.page = request, page
+        head = {
+            'count': django_paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+        }
+        chunks = stream_json_array(self.serialized_batches(page.object_list), head)
+        return streaming_response(request, chunks, content_type='application/json')
+
+
 class OrderCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = OrderCreateSerializer
     
+    @role_required('create_order', message='您没有权限创建订单')
+    @idempotent
     def create(self, request, *args, **kwargs):
         try:
-            # 检查用户权限
-            if request.user.role not in ['admin', 'order_clerk']:
+            # 检查文件（表单上传或直传令牌）
+            try:
+                order_file, order_id = received_file(request.data, request.FILES, 'order_file', request.user)
+            except UploadError as e:
                 return Response({
-                    'error': '您没有权限创建订单',
-                    'detail': f'当前角色: {request.user.role}, 需要角色: admin 或 order_clerk'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # 检查文件
-            order_file = request.FILES.get('order_file')
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             if not order_file:
                 return Response({
                     'error': '请上传下料单文件'
@@ -58,10 +125,15 @@ class OrderCreateView(generics.CreateAPIView):
             
             
             # 创建订单
+            # 直传的文件路径中已包含预先分配的订单 id
+            extra = {'id': order_id} if order_id else {}
+            metadata = describe_upload('order_file', order_file)
             order = serializer.save(
                 user=request.user,
-                order_file=order_file
+                order_file=order_file,
+                **extra
             )
+            record_attachment(order, 'order_file', metadata, request.user)
             
             return Response({
                 'message': '订单创建成功',
@@ -110,14 +182,21 @@ class MyOrdersView(generics.ListAPIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class OrderDetailView(generics.RetrieveAPIView):
-    """查看订单详情 - 所有登录用户都可以查看"""
+    """查看订单详情 - 所有登录用户都可以查看，已归档的订单同样可以查看"""
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_serializer_class(self):
+        if isinstance(getattr(self, 'object', None), ArchivedOrder):
+            return ArchivedOrderSerializer
+        return super().get_serializer_class()
+    
     def get_object(self):
         try:
-            obj = super().get_object()
+            obj = find_order(self.kwargs['pk'])
+            self.check_object_permissions(self.request, obj)
+            self.object = obj
             user = self.request.user
             
             if not user.is_authenticated:
@@ -129,47 +208,25 @@ class OrderDetailView(generics.RetrieveAPIView):
             from django.http import Http404
             raise Http404(f"订单不存在: {str(e)}")
 
-class PendingOrdersView(generics.ListAPIView):
+class PendingOrdersView(StreamingListMixin, generics.ListAPIView):
     """待审核订单 - 仅管理员和审核员"""
     serializer_class = OrderSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = [IsAdminOrReviewer]
     
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Order.objects.none()
-        
-        if self.request.user.role not in ['admin', 'reviewer']:
-            return Order.objects.none()
-        
-        return Order.objects.filter(status='pending').order_by('-created_at')
+        return Order.objects.filter(status='pending').select_related(*ORDER_RELATED).order_by('-created_at')
     
     def list(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if request.user.role not in ['admin', 'reviewer']:
-                return Response({
-                    'error': '您没有权限查看待审核订单',
-                    'detail': f'当前角色: {request.user.role}, 需要角色: admin 或 reviewer'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
             queryset = self.get_queryset()
+            response = self.streaming_list(request, queryset)
+            if response is not None:
+                return response
+
             page = self.paginate_queryset(queryset)
-            
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            
-            serializer = self.get_serializer(queryset, many=True)
-            return Response({
-                'results': serializer.data,
-                'count': queryset.count()
-            })
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             import traceback
@@ -193,20 +250,9 @@ class OrderReviewView(generics.UpdateAPIView):
             review_date=timezone.now()
         )
     
+    @idempotent
     def update(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if request.user.role not in ['admin', 'reviewer']:
-                return Response({
-                    'error': '您没有权限审核订单',
-                    'detail': f'当前角色: {request.user.role}, 需要角色: admin 或 reviewer'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
             instance = self.get_object()
             
             # 检查订单状态
@@ -260,6 +306,7 @@ class OrderResubmitView(generics.UpdateAPIView):
     serializer_class = OrderSerializer  # 使用合适的序列化器
     permission_classes = [permissions.IsAuthenticated]  # 根据需要调整权限
     
+    @idempotent
     def update(self, request, *args, **kwargs):
         try:
             order = self.get_object()
@@ -279,8 +326,13 @@ class OrderResubmitView(generics.UpdateAPIView):
             serializer = self.get_serializer(order, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             
-            # 处理文件上传
-            order_file = request.FILES.get('order_file')
+            # 处理文件上传（表单上传或直传令牌）
+            try:
+                order_file, _ = received_file(request.data, request.FILES, 'order_file', request.user, order.pk)
+            except UploadError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             
             # 修改这一行，将 review_notes 设置为空字符串而不是 None
             order = serializer.save(
@@ -290,10 +342,12 @@ class OrderResubmitView(generics.UpdateAPIView):
                 review_notes=''  # 改为空字符串，而不是 None
             )
             
-            # 如果上传了新文件，保存它
+            # 如果上传了新文件，保存为新版本，旧版本保留
             if order_file:
+                metadata = describe_upload('order_file', order_file)
                 order.order_file = order_file
                 order.save()
+                record_attachment(order, 'order_file', metadata, request.user)
             
             logger.info(f"订单 {order.order_number} (ID: {order.id}) 已被用户 {request.user.username} 重新提交")
             
@@ -310,15 +364,62 @@ class OrderResubmitView(generics.UpdateAPIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def parse_version(value):
+    """?version= 参数，未指定时返回 None，格式错误抛出 ValueError"""
+    if value in (None, ''):
+        return None
+    version = int(value)
+    if version < 1:
+        raise ValueError(value)
+    return version
+
+
+def attachment_response(request, attachment):
+    """按附件记录返回文件：文件名、大小、类型和 ETag 都来自记录，不先检查文件系统"""
+    if etag_matches(request, attachment):
+        response = HttpResponseNotModified()
+        response['ETag'] = attachment.etag
+        return response
+    
+    # 对象存储：重定向到预签名地址，文件内容不经过 Django
+    url = download_url(attachment.file, attachment.filename)
+    if url:
+        return HttpResponseRedirect(url)
+    
+    try:
+        file = attachment.file.open('rb')
+    except FileNotFoundError:
+        logger.error(f"附件文件不存在: {attachment.file.name}（订单 {attachment.order_id}，"
+                     f"{attachment.kind} 第 {attachment.version} 版）")
+        return HttpResponse("文件在服务器上不存在。", status=status.HTTP_404_NOT_FOUND)
+    response = FileResponse(file, as_attachment=True, filename=attachment.filename,
+                            content_type=attachment.content_type)
+    response['ETag'] = attachment.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 class DownloadOrderFileView(APIView):
-    """下载订单文件 - 统一下载接口"""
+    """下载订单文件 - 统一下载接口，?version= 下载历史版本"""
     permission_classes = [permissions.IsAuthenticated, CanDownloadOrderFiles]
     
     def get(self, request, pk, file_type):
         logger.info(f"Download request received for order PK: {pk}, file_type: {file_type}, user: {request.user.username}")
         
+        if file_type in FILE_LABELS:
+            try:
+                version = parse_version(request.query_params.get('version'))
+            except ValueError:
+                return HttpResponse("版本号格式错误", status=status.HTTP_400_BAD_REQUEST)
+            attachment = find_attachment(pk, file_type, version)
+            if attachment is not None:
+                return attachment_response(request, attachment)
+            if version is not None:
+                return HttpResponse("该版本不存在。", status=status.HTTP_404_NOT_FOUND)
+        
+        # 没有附件记录的旧订单按文件字段下载
         try:
-            order = Order.objects.get(pk=pk)
+            order = find_order(pk)
             logger.debug(f"Order found: {order.order_number}")
         except Order.DoesNotExist:
             logger.error(f"Order not found for PK: {pk}")
@@ -343,6 +444,12 @@ class DownloadOrderFileView(APIView):
             logger.error(f"File field is empty or has no name for file_type: {file_type}, order PK: {pk}")
             return HttpResponse("文件未找到或未正确关联。", status=status.HTTP_404_NOT_FOUND)
         
+        # 对象存储：重定向到预签名地址，文件内容不经过 Django
+        url = download_url(file_field, os.path.basename(file_field.name))
+        if url:
+            logger.info(f"File download redirected for order PK: {pk}, file_type: {file_type}")
+            return HttpResponseRedirect(url)
+        
         file_path = file_field.path
         logger.debug(f"Resolved file path: {file_path}")
 
@@ -369,6 +476,259 @@ class DownloadOrderFileView(APIView):
             logger.error(f"Error creating file response for order PK: {pk}, file_type: {file_type}: {str(e)}")
             return HttpResponse("文件读取失败。", status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, CanDownloadOrderFiles])
+def order_bundle(request, pk=None):
+    """把一个或多个订单的全部文件打包成 ZIP 下载
+
+    单个订单：/api/orders/<id>/bundle/；多个订单：/api/orders/bundle/?ids=<id>,<id>,...
+    """
+    if pk is not None:
+        ids = [pk]
+    else:
+        raw_ids = [value for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        if not raw_ids:
+            return Response({
+                'error': '请指定要打包的订单'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > MAX_BUNDLE_ORDERS:
+            return Response({
+                'error': f'一次最多打包 {MAX_BUNDLE_ORDERS} 个订单'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = list(dict.fromkeys(uuid.UUID(value.strip()) for value in raw_ids))
+        except ValueError:
+            return Response({
+                'error': '订单ID格式错误'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    orders = bundle_orders(ids)
+    if not orders:
+        return Response({
+            'error': '订单不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if len(orders) == 1:
+        filename = f"订单文件_{orders[0].order_number}.zip"
+    else:
+        filename = f"订单文件_{len(orders)}个订单_{timezone.localdate():%Y%m%d}.zip"
+    logger.info(f"用户 {request.user.username} 打包下载 {len(orders)} 个订单的文件")
+    return streaming_response(request, bundle_stream(orders), filename, 'application/zip')
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def order_upload_url(request):
+    """申请直传地址：返回预签名 PUT 地址和上传令牌，文件直接传到对象存储
+
+    参数：field（order_file / production_sheet / outbound_file）、filename，
+    上传生产面单和出库单时还需要 order_id。上传完成后在对应接口中提交 <field>_upload=令牌。
+    """
+    order_id = request.data.get('order_id')
+    if order_id:
+        try:
+            order_id = uuid.UUID(str(order_id))
+        except ValueError:
+            return Response({
+                'error': '订单ID格式错误'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not Order.objects.filter(pk=order_id).exists():
+            return Response({
+                'error': '订单不存在'
+            }, status=status.HTTP_404_NOT_FOUND)
+    elif request.data.get('field') != 'order_file':
+        return Response({
+            'error': '请指定订单'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        upload = issue_upload(request.user, request.data.get('field'), request.data.get('filename'),
+                              order_id or None)
+    except UploadError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return Response(upload, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, CanDownloadOrderFiles])
+def order_download_url(request, pk, file_type):
+    """返回预签名下载地址，前端用它直接从对象存储下载；?version= 取历史版本"""
+    if file_type not in FILE_LABELS:
+        return Response({
+            'error': '不支持的文件类型'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        version = parse_version(request.query_params.get('version'))
+    except ValueError:
+        return Response({
+            'error': '版本号格式错误'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    attachment = find_attachment(pk, file_type, version)
+    if attachment is not None:
+        file_field, filename = attachment.file, attachment.filename
+    elif version is not None:
+        return Response({
+            'error': '该版本不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+    else:
+        # 没有附件记录的旧订单
+        try:
+            order = find_order(pk, only=('id', 'order_number', file_type))
+        except Order.DoesNotExist:
+            return Response({
+                'error': '订单不存在'
+            }, status=status.HTTP_404_NOT_FOUND)
+        file_field = getattr(order, file_type)
+        if not file_field or not file_field.name:
+            return Response({
+                'error': '文件未找到或未正确关联'
+            }, status=status.HTTP_404_NOT_FOUND)
+        filename = os.path.basename(file_field.name)
+
+    url = download_url(file_field, filename)
+    if url is None:
+        return Response({
+            'error': '当前文件存储不支持直接下载，请使用下载接口'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'url': url,
+        'filename': filename,
+        'expires_in': file_field.storage.config['PRESIGN_EXPIRES'],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, CanDownloadOrderFiles])
+def order_attachments(request, pk):
+    """订单各类文件的全部版本（新版本在前），只查附件索引"""
+    attachments = (
+        OrderAttachment.objects.filter(order_id=pk)
+        .select_related('uploaded_by')
+        .order_by('kind', '-version')
+    )
+    grouped = {kind: [] for kind in FILE_LABELS}
+    for item in OrderAttachmentSerializer(attachments, many=True).data:
+        grouped[item['kind']].append(item)
+    return Response({
+        'order_id': str(pk),
+        'attachments': [
+            {'kind': kind, 'label': label, 'versions': grouped[kind]}
+            for kind, label in FILE_LABELS.items()
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def order_search(request):
+    """按订单号、项目名称或下单人搜索订单，包括已归档的订单"""
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response({
+            'error': '请输入搜索内容'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    hot, archived = search_orders(term, request.query_params.get('field'))
+    results = OrderSerializer(hot, many=True).data + ArchivedOrderSerializer(archived, many=True).data
+    results.sort(key=lambda order: order['created_at'], reverse=True)
+    return Response({
+        'results': results[:SEARCH_LIMIT],
+        'count': min(len(results), SEARCH_LIMIT),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def order_changes(request):
+    """订单增量同步：返回 since 游标之后新建、修改的订单和已删除、归档的订单
+
+    参数：since 为上次返回的 cursor（首次不带，从头全量同步），limit 为每页条数。
+    has_more 为 true 时用新的 cursor 接着取。
+    """
+    try:
+        limit = int(request.query_params.get('limit', 0)) or None
+    except ValueError:
+        limit = None
+    if limit is not None and limit < 1:
+        limit = None
+    
+    try:
+        changed, removed, cursor, has_more = changes_since(
+            Order.objects.select_related(*ORDER_RELATED),
+            request.query_params.get('since'),
+            limit,
+        )
+    except CursorError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except CursorExpired as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_410_GONE)
+    
+    return Response({
+        'orders': OrderSerializer(changed, many=True).data,
+        'deleted': [
+            {
+                'id': tombstone.order_id,
+                'order_number': tombstone.order_number,
+                'reason': tombstone.reason,
+                'deleted_at': tombstone.removed_at,
+            }
+            for tombstone in removed
+        ],
+        'cursor': cursor,
+        'has_more': has_more,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permission_required('export_orders', message='只有管理员或审核员可以导出订单')])
+def order_export(request):
+    """按创建日期范围导出订单（含已归档订单），流式返回 CSV 或 XLSX
+
+    参数：type=csv|xlsx，start、end 为 YYYY-MM-DD（含当天），status 可选。
+    不用 format 参数名，它被 DRF 用于选择渲染器。
+    """
+    export_format = request.query_params.get('type', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({
+            'error': f'不支持的导出格式: {export_format}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    filters = {}
+    dates = {}
+    for param in ('start', 'end'):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                dates[param] = parse_date(value)
+            except ValueError:
+                dates[param] = None
+            if dates[param] is None:
+                return Response({
+                    'error': f'{param} 日期格式应为 YYYY-MM-DD'
+                }, status=status.HTTP_400_BAD_REQUEST)
+    # 换算成本地时区的时间范围，条件直接落在 created_at 上，可以走索引
+    if 'start' in dates:
+        filters['created_at__gte'] = timezone.make_aware(datetime.combine(dates['start'], datetime.min.time()))
+    if 'end' in dates:
+        filters['created_at__lt'] = timezone.make_aware(
+            datetime.combine(dates['end'] + timedelta(days=1), datetime.min.time())
+        )
+    if request.query_params.get('status'):
+        filters['status'] = request.query_params['status']
+    
+    stream, content_type = EXPORT_FORMATS[export_format]
+    period = '-'.join(f"{dates[param]:%Y%m%d}" for param in ('start', 'end') if param in dates)
+    filename = f"订单导出_{period or '全部'}.{export_format}"
+    return streaming_response(request, stream(filters), filename, content_type)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def order_stats(request):
@@ -379,42 +739,22 @@ def order_stats(request):
                 'error': '请先登录'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        # 尝试从缓存获取统计数据
-        cache_key = 'order_stats'
-        cached_stats = cache.get(cache_key)
-        
-        if cached_stats:
-            logger.debug("返回缓存的统计数据")
-            return Response(cached_stats, status=status.HTTP_200_OK)
-        
-        # 缓存未命中，重新计算
-        total_orders = Order.objects.count()
-        pending_orders = Order.objects.filter(status='pending').count()
-        approved_orders = Order.objects.filter(status='approved').count()
-        rejected_orders = Order.objects.filter(status='rejected').count()
-        ready_for_production_orders = Order.objects.filter(status='ready_for_production').count()
-        in_production_orders = Order.objects.filter(status='in_production').count()
-        completed_orders = Order.objects.filter(status='completed').count()
-        total_users = User.objects.count()
-        
-        status_stats = Order.objects.values('status').annotate(count=Count('id'))
-        
+        # 状态分布和用户数各一条聚合查询，写入订单或用户时缓存失效
+        orders = order_counts()
+        by_status = orders['by_status']
         stats = {
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'approved_orders': approved_orders,
-            'rejected_orders': rejected_orders,
-            'ready_for_production_orders': ready_for_production_orders,
-            'in_production_orders': in_production_orders,
-            'completed_orders': completed_orders,
-            'total_users': total_users,
-            'status_breakdown': list(status_stats),
+            'total_orders': orders['total'],
+            'pending_orders': by_status['pending'],
+            'approved_orders': by_status['approved'],
+            'rejected_orders': by_status['rejected'],
+            'ready_for_production_orders': by_status['ready_for_production'],
+            'in_production_orders': by_status['in_production'],
+            'completed_orders': by_status['completed'],
+            'total_users': user_counts()['total'],
+            'status_breakdown': [{'status': key, 'count': count} for key, count in by_status.items() if count],
             'last_updated': timezone.now().isoformat(),
         }
         
-        # 设置缓存，有效期5分钟
-        cache.set(cache_key, stats, 300)
-        
         return Response(stats, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -423,38 +763,39 @@ def order_stats(request):
             'error': f'获取统计数据失败: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class ApprovedOrdersView(generics.ListAPIView):
+
+@api_view(['GET'])
+@permission_classes([permission_required('access_admin', message='只有管理员或审核员可以查看控制台')])
+def dashboard_summary_view(request):
+    """管理控制台汇总：状态分布、用户分布、各队列最新订单和今日吞吐量，一次请求返回"""
+    return Response(dashboard_summary(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def my_inbox(request):
+    """当前角色的待办收件箱：每个需要处理的队列返回数量和第一页订单"""
+    return Response(get_inbox(request.user), status=status.HTTP_200_OK)
+
+class ApprovedOrdersView(StreamingListMixin, generics.ListAPIView):
     """已批准订单列表 - 技术员使用"""
     serializer_class = OrderSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = [IsTechnician]
     
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Order.objects.none()
-        
-        return Order.objects.filter(status='approved').order_by('-review_date')
+        return Order.objects.filter(status='approved').select_related(*ORDER_RELATED).order_by('-review_date')
     
     def list(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
             queryset = self.get_queryset()
+            response = self.streaming_list(request, queryset)
+            if response is not None:
+                return response
+
             page = self.paginate_queryset(queryset)
-            
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            
-            serializer = self.get_serializer(queryset, many=True)
-            return Response({
-                'results': serializer.data,
-                'count': queryset.count()
-            })
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             import traceback
@@ -471,20 +812,9 @@ class UploadProductionSheetView(generics.UpdateAPIView):
     serializer_class = ProductionSheetSerializer
     permission_classes = [IsTechnician]
     
+    @idempotent
     def update(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if request.user.role not in ['admin', 'technician']:
-                return Response({
-                    'error': '您没有权限上传生产面单',
-                    'detail': f'当前角色: {request.user.role}, 需要角色: admin 或 technician'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
             instance = self.get_object()
             
             # 检查订单状态
@@ -493,8 +823,14 @@ class UploadProductionSheetView(generics.UpdateAPIView):
                     'error': f'只有已批准的订单才能开始生产，当前状态: {instance.get_status_display()}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # 检查是否上传了文件
-            production_sheet = request.FILES.get('production_sheet')
+            # 检查是否上传了文件（表单上传或直传令牌）
+            try:
+                production_sheet, _ = received_file(request.data, request.FILES, 'production_sheet',
+                                                    request.user, instance.pk)
+            except UploadError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             if not production_sheet:
                 return Response({
                     'error': '请上传生产面单文件'
@@ -509,12 +845,14 @@ class UploadProductionSheetView(generics.UpdateAPIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # 更新订单状态并保存文件
+            metadata = describe_upload('production_sheet', production_sheet)
             serializer.save(
                 status='ready_for_production',
                 production_started_by=request.user,
                 production_started_at=timezone.now(),
                 production_sheet=production_sheet
             )
+            record_attachment(instance, 'production_sheet', metadata, request.user)
             
             return Response({
                 'message': '生产面单上传成功，订单已转为待生产状态',
@@ -533,26 +871,16 @@ class ReadyProductionOrdersView(generics.ListAPIView):
     """待生产订单列表 - 技术员使用"""
     serializer_class = OrderSerializer
     pagination_class = StandardResultsSetPagination
-    permission_classes = [IsWarehouseClerk, IsTechnician]
-    
+    permission_classes = [permission_required('view_ready_for_production', message='需要技术员或出入库员权限')]
     
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Order.objects.none()
-        
-        if self.request.user.role not in ['admin', 'technician', 'warehouse_clerk']:
-            return Order.objects.none()
-        
         return Order.objects.filter(status='ready_for_production').order_by('-production_started_at')
     
     @api_view(['POST'])
+    @role_required('start_production', message='您没有权限进行开始生产操作')
+    @idempotent
     def order_start_production(request, order_id):
         """订单开始生产操作"""
-        if request.user.role not in ['admin', 'warehouse_clerk']:
-            return Response({
-                'error': '您没有权限进行开始生产操作'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         try:
             order = Order.objects.get(id=order_id)
         except Order.DoesNotExist:
@@ -583,24 +911,14 @@ class InProductionOrdersView(generics.ListAPIView):
     permission_classes = [IsWarehouseClerk]
     
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
-            return Order.objects.none()
-        
-        if self.request.user.role not in ['admin', 'warehouse_clerk']:
-            return Order.objects.none()
-        
         return Order.objects.filter(status='in_production').order_by('-production_started_at')
     
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@role_required('manage_inventory', message='您没有权限访问此功能')
 def warehouse_orders(request):
     """获取出入库员可操作的订单列表"""
-    if request.user.role not in ['admin', 'warehouse_clerk']:
-        return Response({
-            'error': '您没有权限访问此功能'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     # 获取生产中、已入库的订单
     orders = Order.objects.filter(
         status__in=['ready_for_production','in_production', 'in_warehouse', 'out_warehouse']
@@ -614,13 +932,10 @@ def warehouse_orders(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@role_required('manage_inventory', message='您没有权限进行入库操作')
+@idempotent
 def order_inbound(request, order_id):
     """订单入库操作"""
-    if request.user.role not in ['admin', 'warehouse_clerk']:
-        return Response({
-            'error': '您没有权限进行入库操作'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         order = Order.objects.get(id=order_id)
     except Order.DoesNotExist:
@@ -647,15 +962,12 @@ def order_inbound(request, order_id):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@role_required('manage_inventory', message='您没有权限进行出库操作')
+@idempotent
 def order_outbound(request, order_id):
     """订单出库操作"""
     print(f"出库请求: 订单ID={order_id}, 用户={request.user.username}")
     
-    if request.user.role not in ['admin', 'warehouse_clerk']:
-        return Response({
-            'error': '您没有权限进行出库操作'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         order = Order.objects.get(id=order_id)
         print(f"找到订单: {order.order_number}, 状态: {order.status}")
@@ -669,8 +981,13 @@ def order_outbound(request, order_id):
             'error': f'订单状态错误，当前状态：{order.get_status_display()}，只有已入库的订单才能出库'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # 检查出库单文件
-    outbound_file = request.FILES.get('outbound_file')
+    # 检查出库单文件（表单上传或直传令牌）
+    try:
+        outbound_file, _ = received_file(request.data, request.FILES, 'outbound_file', request.user, order.pk)
+    except UploadError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     print(f"上传的文件: {outbound_file}")
     
     if not outbound_file:
@@ -680,6 +997,7 @@ def order_outbound(request, order_id):
     
     try:
         # 先保存文件
+        metadata = describe_upload('outbound_file', outbound_file)
         old_outbound_file = order.outbound_file
         order.outbound_file = outbound_file
         order.save(update_fields=['outbound_file'])
@@ -698,11 +1016,11 @@ def order_outbound(request, order_id):
         order.outbound_at = timezone.now()
         order.outbound_notes = request.data.get('outbound_notes', '')
         order.save()
+        record_attachment(order, 'outbound_file', metadata, request.user)
         
         # 打印调试信息
         print(f"出库成功: {order.order_number}")
         print(f"文件名: {order.outbound_file.name}")
-        print(f"文件路径: {order.outbound_file.path}")
         print(f"文件URL: {order.outbound_file.url}")
         print(f"文件大小: {order.outbound_file.size} bytes")
         
@@ -722,7 +1040,7 @@ def order_outbound(request, order_id):
 class OrderDeleteView(generics.DestroyAPIView):
     """订单删除视图 - 只有管理员可以删除订单"""
     queryset = Order.objects.all()
-    permission_classes = [IsAdminUser]
+    permission_classes = [permission_required('delete_orders', message='只有管理员可以删除订单')]
     
     def destroy(self, request, *args, **kwargs):
         try:
@@ -0,0 +1,72 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .models import SystemLog
+
+# 未筛选的表超过该行数时，变更列表的总数改用数据库统计信息估计
+ESTIMATE_COUNT_THRESHOLD = 100000
+
+
+def estimated_row_count(model, using):
+    """PostgreSQL 由 VACUUM/ANALYZE 维护的行数估计，一次主键查找即可取得；其他数据库返回 None"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # 从未 ANALYZE 过的表为 -1（PostgreSQL 14+）或 0
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """大表不带筛选条件时用估计行数分页，避免每次打开变更列表都 COUNT(*) 全表
+
+    有筛选或搜索条件时照常精确计数（走筛选字段上的索引）。
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """大表的后台基类
+
+    总数用估计值，筛选后不再额外统计全表行数；外键统一用 autocomplete_fields，
+    编辑页不会把整张用户表渲染进下拉框。
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(SystemLog)
+class SystemLogAdmin(LargeTableAdmin):
+    list_display = ('created_at', 'type', 'module', 'short_message', 'user', 'ip_address')
+    list_filter = ('type', 'module')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    # 只用于显示搜索框，实际查询见 get_search_results
+    search_fields = ('user__username',)
+    search_help_text = '按操作用户名精确搜索'
+    readonly_fields = ('created_at',)
+
+    @admin.display(description='日志内容')
+    def short_message(self, obj):
+        return obj.message[:80]
+
+    def get_search_results(self, request, queryset, search_term):
+        # 日志内容没有索引，只按用户名（唯一索引）查找，再用日志表的 user_id 索引取日志
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(user__username=term), False
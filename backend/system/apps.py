@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class SystemConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'system'
+    verbose_name = '系统'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks  # noqa: F401  注册系统检查
+        from .profiling import install_request_profiler
+        from .slow_queries import install_slow_query_log
+
+        connection_created.connect(install_slow_query_log, dispatch_uid='system.slow_query_log')
+        connection_created.connect(install_request_profiler, dispatch_uid='system.request_profiler')
@@ -0,0 +1,447 @@
+import asyncio
+import platform
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from importlib import import_module
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orders.models import Order
+from orders.seeding import ensure_placeholder_media, insert_batch, plan_batches, seed_users
+from orders.transfers import field_storage, supports_direct_transfer
+from users.models import User
+
+BENCHMARK_PASSWORD = 'bench-pass-123'
+UPLOAD_SIZE = 16 * 1024
+# 这些模块中的每个具名路由都要有压测场景，没有覆盖到的路由让压测命令失败
+BENCHMARK_URLCONFS = ('orders.urls', 'users.urls')
+
+
+def percentile(sorted_values, pct):
+    """最近秩法百分位数，sorted_values 需已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def route_names(urlconfs=BENCHMARK_URLCONFS):
+    """urlconfs 中全部具名路由的名称"""
+    return {
+        pattern.name
+        for urlconf in urlconfs
+        for pattern in import_module(urlconf).urlpatterns
+        if pattern.name
+    }
+
+
+def consume(response):
+    """读完流式响应的内容，计入完整的下载耗时；读完后测试客户端自行关闭响应"""
+    if response.streaming:
+        for _ in response:
+            pass
+    return response
+
+
+class EndpointStats:
+    """单个接口的耗时样本"""
+
+    def __init__(self):
+        self.durations = []
+        self.errors = 0
+        self.status_codes = defaultdict(int)
+
+    def add(self, duration_ms, status_code):
+        self.durations.append(duration_ms)
+        self.status_codes[status_code] += 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self):
+        """耗时分布；请求是逐个串行发出的，serial_rps 即 1000 / mean_ms，
+        是单个 worker 只处理该接口时的上限，不是并发吞吐（并发见 concurrent_downloads）
+        """
+        values = sorted(self.durations)
+        total_ms = sum(values)
+        return {
+            'count': len(values),
+            'errors': self.errors,
+            'status_codes': {str(code): count for code, count in sorted(self.status_codes.items())},
+            'serial_rps': round(len(values) / (total_ms / 1000), 2) if total_ms else 0.0,
+            'mean_ms': round(total_ms / len(values), 3) if values else 0.0,
+            'p50_ms': round(percentile(values, 50), 3),
+            'p95_ms': round(percentile(values, 95), 3),
+            'p99_ms': round(percentile(values, 99), 3),
+            'max_ms': round(values[-1], 3) if values else 0.0,
+        }
+
+
+class BenchmarkRunner:
+    """在进程内用 Django 测试客户端按真实角色组合驱动全部 API
+
+    每一轮模拟一张订单走完整流程（下单、审核/驳回、重新提交、生产面单、
+    开始生产、入库、出库、下载），同时穿插各角色的列表、搜索、增量同步、统计、
+    附件、打包、导出和用户管理请求。记录每个请求命中的路由，
+    BENCHMARK_URLCONFS 中没有请求过、也没有说明跳过原因的路由列在结果的 coverage 中。
+    调用方负责提供隔离的数据库和 MEDIA_ROOT。
+    """
+
+    ROLES = [role for role, _ in User.ROLE_CHOICES]
+
+    def __init__(self, iterations=20, orders=500, users_per_role=2, seed=42, concurrency=0):
+        self.iterations = iterations
+        self.concurrency = concurrency
+        self.orders = orders
+        self.users_per_role = users_per_role
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.stats = defaultdict(EndpointStats)
+        self.users = {}
+        self.clients = {}
+        self.order_ids = []
+        self.order_numbers = []
+        # 请求过的路由名，以及当前环境下无法压测的路由 -> 原因
+        self.covered = set()
+        self.skipped = {}
+
+    # ---- 数据准备 ----
+
+    def seed_data(self):
+        """创建各角色用户和分布在各状态、各月份的历史订单"""
+        user_ids = seed_users(self.users_per_role, prefix='bench', password=BENCHMARK_PASSWORD)
+        users = User.objects.in_bulk([pk for ids in user_ids.values() for pk in ids])
+        self.users = {role: [users[pk] for pk in ids] for role, ids in user_ids.items()}
+
+        if self.orders:
+            ensure_placeholder_media()
+            for batch in plan_batches(self.orders, 12, 5000, self.seed, timezone.now()):
+                insert_batch(batch, user_ids, self.seed)
+        self.order_ids, self.order_numbers = [], []
+        for order_id, order_number in Order.objects.values_list('id', 'order_number'):
+            self.order_ids.append(order_id)
+            self.order_numbers.append(order_number)
+
+    def client_for(self, user):
+        """每个用户一个带 JWT 的客户端，与前端的 Bearer 认证方式一致"""
+        client = self.clients.get(user.pk)
+        if client is None:
+            token = RefreshToken.for_user(user).access_token
+            client = self.clients[user.pk] = Client(
+                raise_request_exception=False, HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+        return client
+
+    def pick(self, role):
+        return self.random.choice(self.users[role])
+
+    # ---- 请求计时 ----
+
+    def request(self, name, method, path, user=None, client=None, **kwargs):
+        client = client or self.client_for(user)
+        start = time.perf_counter()
+        response = getattr(client, method.lower())(path, **kwargs)
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.stats[f"{method} {name}"].add(duration_ms, response.status_code)
+        self.covered.add(resolve(urlsplit(path).path).url_name)
+        return response
+
+    def upload(self, filename):
+        return SimpleUploadedFile(filename, self.random.randbytes(UPLOAD_SIZE),
+                                  content_type='application/vnd.ms-excel')
+
+    # ---- 场景 ----
+
+    def create_order(self, clerk):
+        response = self.request('order-create', 'POST', reverse('order-create'), clerk, data={
+            'project_name': f"压测项目 {self.random.randint(1, 10 ** 6)}",
+            'ordered_by': '压测客户',
+            'order_file': self.upload('cutting_list.xlsx'),
+        })
+        if response.status_code != 201:
+            return None
+        return response.json()['order']['id']
+
+    def browse(self):
+        """各角色的只读请求"""
+        clerk = self.pick('order_clerk')
+        self.request('my-orders', 'GET', reverse('my-orders'), clerk)
+        self.request('order-list-paginated', 'GET', reverse('order-list-paginated') + '?page=2', clerk)
+
+        order_id = self.random.choice(self.order_ids)
+        self.request('order-detail', 'GET', reverse('order-detail', args=[order_id]), self.pick('workshop_tracker'))
+
+        for role in self.ROLES:
+            self.request('orders-stats', 'GET', reverse('orders-stats'), self.pick(role))
+            self.request('me', 'GET', reverse('me'), self.pick(role))
+            self.request('order-inbox', 'GET', reverse('order-inbox'), self.pick(role))
+        self.request('order-stats', 'GET', reverse('order-stats'), self.pick('admin'))
+        self.request('dashboard-summary', 'GET', reverse('dashboard-summary'), self.pick('reviewer'))
+
+        # 按订单号前缀（年月）和项目名称搜索，含归档订单
+        order_number = self.random.choice(self.order_numbers)
+        self.request('order-search', 'GET', reverse('order-search') + '?' + urlencode({'q': order_number[:8]}),
+                     self.pick('reviewer'))
+        self.request('order-search', 'GET', reverse('order-search') + '?' + urlencode({
+            'q': self.random.choice(['城东', '城西', '滨江', '高新', '开发区']), 'field': 'project_name',
+        }), clerk)
+
+        # 客户端增量同步：首页全量，再用游标取下一页
+        tracker = self.pick('workshop_tracker')
+        response = self.request('order-changes', 'GET', reverse('order-changes'), tracker)
+        if response.status_code == 200 and response.json()['has_more']:
+            self.request('order-changes', 'GET', reverse('order-changes') + '?' + urlencode({
+                'since': response.json()['cursor'],
+            }), tracker)
+
+    def order_workflow(self):
+        """一张订单的完整生命周期，以及一张被驳回后重新提交再删除的订单"""
+        clerk = self.pick('order_clerk')
+        reviewer = self.pick('reviewer')
+        technician = self.pick('technician')
+        warehouse = self.pick('warehouse_clerk')
+        admin = self.pick('admin')
+
+        order_id = self.create_order(clerk)
+        rejected_id = self.create_order(clerk)
+        if not order_id or not rejected_id:
+            return
+
+        self.request('pending-orders', 'GET', reverse('pending-orders'), reviewer)
+        self.request('order-review', 'PATCH', reverse('order-review', args=[order_id]), reviewer,
+                     data={'status': 'approved', 'review_notes': '同意'}, content_type='application/json')
+        self.request('order-review', 'PATCH', reverse('order-review', args=[rejected_id]), reviewer,
+                     data={'status': 'rejected', 'review_notes': '尺寸有误'}, content_type='application/json')
+        self.request('order-resubmit', 'PUT', reverse('order-resubmit', args=[rejected_id]), clerk,
+                     data={'project_name': '修改后的项目'}, content_type='application/json')
+        self.request('order-delete', 'DELETE', reverse('order-delete', args=[rejected_id]), admin)
+
+        self.request('approved-orders', 'GET', reverse('approved-orders'), technician)
+        self.request('upload-production-sheet', 'PUT', reverse('upload-production-sheet', args=[order_id]),
+                     technician, data=encode_multipart(BOUNDARY, {'production_sheet': self.upload('sheet.xlsx')}),
+                     content_type=MULTIPART_CONTENT)
+
+        self.request('ready-production-orders', 'GET', reverse('ready-production-orders'), warehouse)
+        self.request('start-production', 'POST', reverse('start-production', args=[order_id]), warehouse)
+        self.request('in_production_orders', 'GET', reverse('in_production_orders'), warehouse)
+        self.request('warehouse-orders', 'GET', reverse('warehouse-orders'), warehouse)
+        self.request('order-inbound', 'POST', reverse('order-inbound', args=[order_id]), warehouse)
+        self.request('order-outbound', 'POST', reverse('order-outbound', args=[order_id]), warehouse, data={
+            'outbound_file': self.upload('outbound.xlsx'),
+            'outbound_notes': '已发货',
+        })
+
+        for file_type in ('order_file', 'production_sheet', 'outbound_file'):
+            consume(self.request('download-order-file', 'GET',
+                                 reverse('download-order-file', args=[order_id, file_type]), warehouse))
+        self.request('order-attachments', 'GET', reverse('order-attachments', args=[order_id]), warehouse)
+        consume(self.request('order-file-bundle', 'GET', reverse('order-file-bundle', args=[order_id]), warehouse))
+
+    def file_access(self):
+        """批量打包下载、导出报表，以及对象存储的直传和下载地址"""
+        warehouse = self.pick('warehouse_clerk')
+        ids = self.random.sample(self.order_ids, min(10, len(self.order_ids)))
+        consume(self.request('order-bundle', 'GET', reverse('order-bundle') + '?' + urlencode({
+            'ids': ','.join(str(pk) for pk in ids),
+        }), warehouse))
+
+        # 最近 30 天的订单导出，CSV 和 XLSX 分开统计
+        today = timezone.localdate()
+        for export_format in ('csv', 'xlsx'):
+            consume(self.request(f'order-export-{export_format}', 'GET', reverse('order-export') + '?' + urlencode({
+                'type': export_format, 'start': f"{today - timedelta(days=30):%Y-%m-%d}", 'end': f"{today:%Y-%m-%d}",
+            }), self.pick('admin')))
+
+        if not supports_direct_transfer(field_storage('order_file')):
+            # 本地磁盘存储时这两个接口只返回 400，压测没有意义
+            for name in ('order-upload-url', 'order-download-url'):
+                self.skipped[name] = '当前文件存储不支持直传'
+            return
+        self.request('order-upload-url', 'POST', reverse('order-upload-url'), self.pick('order_clerk'),
+                     data={'field': 'order_file', 'filename': 'cutting_list.xlsx'}, content_type='application/json')
+        self.request('order-download-url', 'GET',
+                     reverse('order-download-url', args=[self.random.choice(ids), 'order_file']), warehouse)
+
+    def user_management(self):
+        """管理员用户管理和登录相关请求"""
+        admin = self.pick('admin')
+        self.request('admin_users', 'GET', reverse('admin_users'), admin)
+        self.request('user_stats', 'GET', reverse('user_stats'), admin)
+
+        username = f"bench_tmp_{self.random.randint(1, 10 ** 9)}"
+        response = self.request('admin_users', 'POST', reverse('admin_users'), admin, data={
+            'username': username, 'password': BENCHMARK_PASSWORD, 'confirm_password': BENCHMARK_PASSWORD,
+            'role': 'workshop_tracker', 'full_name': '临时工',
+        }, content_type='application/json')
+        if response.status_code == 201:
+            user_id = response.json()['user']['id']
+            detail = reverse('admin_user_detail', args=[user_id])
+            self.request('admin_user_detail', 'GET', detail, admin)
+            self.request('admin_user_detail', 'PATCH', detail, admin,
+                         data={'department': '车间'}, content_type='application/json')
+            self.request('reset_password', 'POST', reverse('reset_password', args=[user_id]), admin,
+                         data={'new_password': BENCHMARK_PASSWORD}, content_type='application/json')
+            self.request('admin_user_detail', 'DELETE', detail, admin)
+
+        user = self.pick(self.random.choice(self.ROLES))
+        anonymous = Client(raise_request_exception=False)
+        response = self.request('login', 'POST', reverse('login'), client=anonymous, data={
+            'username': user.username, 'password': BENCHMARK_PASSWORD,
+        }, content_type='application/json')
+        if response.status_code == 200:
+            self.request('token_refresh', 'POST', reverse('token_refresh'), client=anonymous,
+                         data={'refresh': response.json()['refresh']}, content_type='application/json')
+
+        # 改密码后再改回原密码
+        tracker = self.pick('workshop_tracker')
+        for old, new in ((BENCHMARK_PASSWORD, BENCHMARK_PASSWORD + 'x'), (BENCHMARK_PASSWORD + 'x', BENCHMARK_PASSWORD)):
+            self.request('change_password', 'POST', reverse('change_password'), tracker,
+                         data={'old_password': old, 'new_password': new}, content_type='application/json')
+
+    def concurrent_downloads(self):
+        """在一个进程内经 ASGI 处理器同时发起 concurrency 个下载，衡量单个 worker 的并发能力
+
+        结果取决于 ASYNC_VIEWS：同步视图在 ASGI 下共用一个线程，异步视图只占用协程。
+        """
+        token = RefreshToken.for_user(self.pick('warehouse_clerk')).access_token
+        order_ids = list(Order.objects.exclude(order_file='').values_list('id', flat=True)[:self.concurrency])
+        paths = [reverse('download-order-file', args=[order_ids[i % len(order_ids)], 'order_file'])
+                 for i in range(self.concurrency)]
+        stats = EndpointStats()
+
+        headers = {'Authorization': f"Bearer {token}"}
+
+        async def fetch(client, path):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            if response.streaming:
+                if response.is_async:
+                    async for _ in response.streaming_content:
+                        pass
+                else:
+                    for _ in response.streaming_content:
+                        pass
+            stats.add((time.perf_counter() - start) * 1000, response.status_code)
+
+        async def run_all():
+            client = AsyncClient(raise_request_exception=False)
+            await asyncio.gather(*(fetch(client, path) for path in paths))
+
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        wall_time = time.perf_counter() - start
+        return {
+            **stats.summary(),
+            'async_views': settings.ASYNC_VIEWS,
+            'concurrency': self.concurrency,
+            'wall_time_s': round(wall_time, 3),
+            'throughput_rps': round(self.concurrency / wall_time, 2) if wall_time else 0.0,
+        }
+
+    # ---- 执行 ----
+
+    def run(self):
+        self.seed_data()
+        # 预热：URL 解析、序列化器字段和数据库连接
+        self.browse()
+        self.stats.clear()
+        self.covered.clear()
+
+        start = time.perf_counter()
+        for _ in range(self.iterations):
+            self.order_workflow()
+            self.browse()
+            self.file_access()
+            self.user_management()
+        wall_time = time.perf_counter() - start
+        routes = route_names()
+
+        endpoints = {name: stats.summary() for name, stats in sorted(self.stats.items())}
+        total_requests = sum(item['count'] for item in endpoints.values())
+        results = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'iterations': self.iterations,
+                'orders': self.orders,
+                'seed': self.seed,
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+            },
+            'total': {
+                'requests': total_requests,
+                'errors': sum(item['errors'] for item in endpoints.values()),
+                'wall_time_s': round(wall_time, 3),
+                'throughput_rps': round(total_requests / wall_time, 2) if wall_time else 0.0,
+            },
+            'endpoints': endpoints,
+            'coverage': {
+                'routes': len(routes),
+                'skipped': dict(sorted(self.skipped.items())),
+                'uncovered': sorted(routes - self.covered - set(self.skipped)),
+            },
+        }
+        if self.concurrency and self.order_ids:
+            results['concurrent_downloads'] = self.concurrent_downloads()
+        return results
+
+
+def compare_with_baseline(results, baseline, tolerance=0.2, metric='p95_ms'):
+    """与基线比较，返回超出容差的接口列表"""
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not previous.get(metric):
+            continue
+        ratio = current[metric] / previous[metric]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'endpoint': name,
+                'metric': metric,
+                'baseline': previous[metric],
+                'current': current[metric],
+                'ratio': round(ratio, 2),
+            })
+    return sorted(regressions, key=lambda item: item['ratio'], reverse=True)
+
+
+def time_render(renderer, data, repeat):
+    """重复渲染 repeat 次，返回 (每次耗时 ms 的中位数, 最短耗时 ms, 输出)"""
+    durations, content = [], b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = renderer.render(data)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2], durations[0], content
+
+
+def compare_renderers(data, renderers, repeat=50):
+    """用同一份数据比较多个渲染器的编码耗时，并检查输出是否逐字节一致
+
+    renderers 为 {名称: 渲染器实例}，第一个作为基准。
+    """
+    results, reference = {}, None
+    for name, renderer in renderers.items():
+        renderer.render(data)  # 预热
+        median_ms, min_ms, content = time_render(renderer, data, repeat)
+        if reference is None:
+            reference = (median_ms, content)
+        results[name] = {
+            'median_ms': round(median_ms, 3),
+            'min_ms': round(min_ms, 3),
+            'bytes': len(content),
+            'speedup': round(reference[0] / median_ms, 2) if median_ms else 0.0,
+            'identical': content == reference[1],
+        }
+    return results
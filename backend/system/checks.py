@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# add 在多个进程之间原子的缓存后端：登录限流和幂等键用 cache.add 做跨 worker 的锁
+ATOMIC_ADD_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_is_atomic(app_configs, **kwargs):
+    """多个 worker 时默认缓存必须支持跨进程原子的 add，否则限流可以被并发绕过、幂等键挡不住重复提交"""
+    workers = getattr(settings, 'WEB_CONCURRENCY', 1)
+    backend = settings.CACHES['default']['BACKEND']
+    if workers <= 1 or backend in ATOMIC_ADD_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f"WEB_CONCURRENCY={workers}，但默认缓存 {backend} 的 add 不能在多个进程之间互斥",
+        hint='设置 REDIS_URL 使用 Redis 缓存，或把 WEB_CONCURRENCY 设为 1',
+        id='system.E001',
+    )]
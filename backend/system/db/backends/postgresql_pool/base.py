@@ -0,0 +1,51 @@
+"""带进程内连接池的 PostgreSQL 后端
+
+与 django.db.backends.postgresql 相同，只是建立和关闭连接改为向连接池借出和归还。
+配置见 system.db.pool.database_from_url。
+"""
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+
+from system.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+
+    def _create_pool(self):
+        Database = self.Database
+
+        def reset(connection):
+            if connection.closed:
+                raise Database.InterfaceError('连接已关闭')
+            # 请求中途出错或在事务里被关闭时，归还前回滚残留的事务
+            if connection.info.transaction_status != Database.extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+
+        def check(connection):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        return ConnectionPool(
+            reset=reset,
+            check=check,
+            name=self.alias,
+            **self.settings_dict.get('POOL', {}),
+        )
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self._create_pool)
+
+    def get_new_connection(self, conn_params):
+        # 池由所有线程的 DatabaseWrapper 共享，新建连接时用当前实例的父类实现
+        factory = lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)  # noqa: E731
+        try:
+            return self.pool.acquire(factory)
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # 出过错且已不可用的连接不再放回池中
+                discard = self.errors_occurred and not self.is_usable()
+                self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,145 @@
+"""读写分离路由
+
+写操作一律走主库，读操作默认走只读副本。以下情况读操作改走主库：
+
+- 非只读请求（POST/PUT/PATCH/DELETE）整个请求期间；
+- 同一请求内已经发生过写操作（之后的读要看到刚写入的数据）；
+- 主库上正在进行事务；
+- 同一客户端刚写过数据的短时间内（STICKY_SECONDS），避开副本的复制延迟；
+- 副本连接失败后的 RETRY_SECONDS 内（只有副本会故障转移到主库，主库不会反向切换）。
+
+请求状态由 system.middleware.ReplicaRoutingMiddleware 在请求开始时设置，
+保存在 contextvar 中，异步视图经 sync_to_async 执行的 ORM 调用也能看到同一份状态。
+"""
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DEFAULTS = {
+    'ALIAS': 'replica',
+    # 客户端写入后读操作固定走主库的秒数
+    'STICKY_SECONDS': 5,
+    # 副本连接失败后暂停使用的秒数
+    'RETRY_SECONDS': 30,
+}
+
+STICKY_CACHE_PREFIX = 'db_primary_pin'
+
+# 当前请求的路由状态：{'primary': 是否固定走主库, 'wrote': 是否发生过写操作}
+_request_state = contextvars.ContextVar('db_routing_state', default=None)
+
+# 副本暂停使用的截止时间（进程内，time.monotonic）
+_replica_down_until = 0.0
+_replica_lock = threading.Lock()
+
+
+def get_replica_settings():
+    return {**REPLICA_DEFAULTS, **getattr(settings, 'DATABASE_REPLICA', {})}
+
+
+def replica_alias():
+    """已配置的副本别名，未配置时返回 None"""
+    alias = get_replica_settings()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+def sticky_key(client_key):
+    return f"{STICKY_CACHE_PREFIX}:{client_key}"
+
+
+def client_key(request):
+    """标识同一客户端：JWT 或会话 Cookie 的摘要，匿名请求返回 None
+
+    在认证之前就要判断是否固定走主库，所以不依赖 request.user。
+    """
+    credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return hashlib.sha1(credential.encode()).hexdigest()
+
+
+def begin_request(primary=False):
+    """开始一个请求的路由状态，返回用于 end_request 的 token"""
+    return _request_state.set({'primary': primary, 'wrote': False})
+
+
+def end_request(token):
+    """结束请求，返回请求期间是否发生过写操作"""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return bool(state and state['wrote'])
+
+
+def pin_client(client_key):
+    """客户端写入后，STICKY_SECONDS 内的读操作走主库（多个 worker 通过共享缓存可见）"""
+    seconds = get_replica_settings()['STICKY_SECONDS']
+    if client_key and seconds > 0:
+        cache.set(sticky_key(client_key), 1, seconds)
+
+
+def is_client_pinned(client_key):
+    return bool(client_key) and cache.get(sticky_key(client_key)) is not None
+
+
+def mark_replica_down(alias, error):
+    global _replica_down_until
+    seconds = get_replica_settings()['RETRY_SECONDS']
+    with _replica_lock:
+        _replica_down_until = time.monotonic() + seconds
+    logger.error(f"只读副本 {alias} 不可用，{seconds} 秒内读操作改走主库: {str(error)}")
+
+
+def replica_available(alias):
+    if time.monotonic() < _replica_down_until:
+        return False
+    try:
+        # 已有连接时不做任何事；连接失败说明副本不可用
+        connections[alias].ensure_connection()
+    except SynchronousOnlyOperation:
+        # 在事件循环中判断路由时不能建立连接，交给随后的查询（会在线程中执行）
+        pass
+    except DatabaseError as e:
+        mark_replica_down(alias, e)
+        return False
+    return True
+
+
+class ReplicaRouter:
+    """主库写、副本读的数据库路由"""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias is None:
+            return DEFAULT_DB_ALIAS
+
+        state = _request_state.get()
+        if state is not None and (state['primary'] or state['wrote']):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if not replica_available(alias):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库是同一份数据
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本的表结构和数据都来自主库复制
+        return db != replica_alias()
@@ -0,0 +1,86 @@
+"""存活和就绪检查
+
+/healthz 只说明进程能处理请求，不访问任何外部资源；/readyz 用一条 SELECT 1
+检查主库，并检查媒体目录可写（使用对象存储时检查桶可访问）。两者都由
+HealthCheckMiddleware 在中间件链最前面直接应答，不经过 URL 解析、认证、HTTPS 跳转和
+ALLOWED_HOSTS 校验，负载均衡器或 gunicorn 所在主机用内网地址探测也能拿到结果。
+
+因为任何人都能访问，/readyz 的响应里每项只有 ok 或 fail，错误详情（可能含数据库主机、
+用户名、桶地址）只写日志；检查结果在进程内复用 READINESS_CACHE_SECONDS 秒，
+频繁探测不会每次都查库和请求对象存储。
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATHS = ('/healthz', '/healthz/')
+READINESS_PATHS = ('/readyz', '/readyz/')
+
+# 就绪检查结果的复用时间（秒）
+READINESS_CACHE_SECONDS = 2
+
+_lock = threading.Lock()
+_last = None
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_media():
+    # 对象存储只确认桶可以访问
+    if hasattr(default_storage, 'ping'):
+        default_storage.ping()
+        return
+    # 目录由文件存储在第一次写入时创建，还不存在时检查能否在上级目录中创建
+    path = str(settings.MEDIA_ROOT)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    if not os.path.isdir(path) or not os.access(path, os.W_OK | os.X_OK):
+        raise OSError(f'媒体目录不可写: {path}')
+
+
+READINESS_CHECKS = (
+    ('database', check_database),
+    ('media', check_media),
+)
+
+
+def run_checks():
+    """依次执行就绪检查，返回 (是否就绪, {检查项: 'ok' 或 'fail'})"""
+    ready, results = True, {}
+    for name, check in READINESS_CHECKS:
+        try:
+            check()
+            results[name] = 'ok'
+        except Exception as e:
+            ready = False
+            results[name] = 'fail'
+            logger.warning(f"就绪检查 {name} 失败: {str(e)}")
+    return ready, results
+
+
+def readiness():
+    """就绪检查结果，READINESS_CACHE_SECONDS 秒内复用上一次的结果
+
+    同时到达的探测请求排队等第一个做完检查，之后直接用它的结果。
+    """
+    global _last
+    with _lock:
+        if _last is not None and time.monotonic() - _last[0] < READINESS_CACHE_SECONDS:
+            return _last[1]
+        result = run_checks()
+        _last = (time.monotonic(), result)
+        return result
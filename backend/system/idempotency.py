@@ -0,0 +1,209 @@
+"""Idempotency-Key 幂等请求
+
+车间终端在超时后会原样重发创建订单、入库、出库等请求。请求带上 Idempotency-Key 头时，
+第一次的响应按 (用户, 键) 存进共享缓存，保留 TTL 秒；之后相同键的重试直接返回保存的响应
+（带 Idempotent-Replayed: true 头），只花一次缓存读取，不再解析上传文件、写库或分配订单号。
+
+- 第一次请求还没处理完时，相同键的重试返回 409，客户端稍后再试即可拿到第一次的结果
+- 同一个键用在别的接口、方法或内容不同的请求上返回 422；内容按表单字段（或 JSON 数据）
+  和上传文件的字段名、文件名、大小比较，不读取文件内容
+- 5xx 响应和异常不保存，重试会重新执行
+- 不带该头的请求照常处理
+
+处理中的占位用 cache.add 写入，多个 worker 之间要求 add 是原子的（Redis 等，见 system.checks）。
+
+idempotent 放在鉴权装饰器之后，只对已通过权限检查的请求生效；函数视图、视图方法和
+异步视图都可使用。
+"""
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.http.multipartparser import MultiPartParser, MultiPartParserError
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .renderers import ORJSONRenderer
+
+IDEMPOTENCY_DEFAULTS = {
+    # 保存响应的时间（秒），应长于终端重试的时间窗口
+    'TTL': 24 * 3600,
+    # 第一次请求处理中的占位时间（秒），worker 中途退出时占位到期后才能重新执行
+    'LOCK_TIMEOUT': 300,
+}
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+_renderer = ORJSONRenderer()
+
+
+def get_idempotency_settings():
+    return {**IDEMPOTENCY_DEFAULTS, **getattr(settings, 'IDEMPOTENCY', {})}
+
+
+def _cache_key(user, key):
+    return f"idempotency:{user.pk}:{hashlib.sha1(key.encode()).hexdigest()}"
+
+
+def parse_form(request):
+    """解析 Django 请求的表单和上传文件，结果保存在请求上，重复调用不再读取请求体
+
+    PUT 请求 Django 不会自动解析，这里手动处理 multipart。幂等键的摘要和异步视图共用这一份解析结果。
+    """
+    form = getattr(request, '_idempotency_form', None)
+    if form is None:
+        try:
+            if request.method != 'POST' and request.content_type == 'multipart/form-data':
+                form = MultiPartParser(request.META, request, request.upload_handlers, request.encoding).parse()
+            else:
+                form = (request.POST, request.FILES)
+        except MultiPartParserError as e:
+            # 请求体已经读过，再次解析也拿不到数据，之后的调用抛出同一个错误
+            form = e
+        request._idempotency_form = form
+    if isinstance(form, MultiPartParserError):
+        raise form
+    return form
+
+
+def _body_digest(request):
+    """请求内容摘要：表单字段或 JSON 数据，加上传文件的字段名、文件名和大小"""
+    if isinstance(request, Request):
+        data, files = request.data, request.FILES
+    else:
+        data, files = parse_form(request)
+    if hasattr(data, 'lists'):
+        # DRF 的 multipart 数据中也包含文件，文件单独按名称和大小计入
+        data = sorted((key, values) for key, values in data.lists() if key not in files)
+    uploads = sorted((key, upload.name, upload.size) for key, items in files.lists() for upload in items)
+    raw = json.dumps([data, uploads], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    return f"{request.method} {request.path} {_body_digest(request)}"
+
+
+def _error(message, status_code):
+    return HttpResponse(_renderer.render({'error': message}), status=status_code,
+                        content_type=_renderer.media_type)
+
+
+def _read_key(request):
+    """返回请求的 Idempotency-Key；没有时返回 None，格式不对时返回空字符串"""
+    key = request.META.get(HEADER)
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isascii() or not key.isprintable():
+        return ''
+    return key
+
+
+def _check(entry, fingerprint):
+    """缓存中已有该键时的响应：重放、处理中或键被挪用"""
+    if entry['fingerprint'] != fingerprint:
+        return _error('该 Idempotency-Key 已用于其他请求', status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if entry.get('pending'):
+        return _error('相同 Idempotency-Key 的请求正在处理，请稍后重试', status.HTTP_409_CONFLICT)
+    response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _entry(fingerprint, response):
+    """要保存的响应；不应保存（5xx、流式响应）时返回 None"""
+    if response.status_code >= 500 or getattr(response, 'streaming', False):
+        return None
+    if isinstance(response, Response):
+        content = _renderer.render(response.data)
+        content_type = _renderer.media_type
+    else:
+        content = response.content
+        content_type = response.get('Content-Type', _renderer.media_type)
+    return {
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'content': content,
+        'content_type': content_type,
+    }
+
+
+def idempotent(view_func):
+    """视图装饰器：按 Idempotency-Key 保存并重放响应"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapped(request, *args, **kwargs):
+            key = _read_key(request)
+            if key is None:
+                return await view_func(request, *args, **kwargs)
+            if not key:
+                return _error('Idempotency-Key 格式无效', status.HTTP_400_BAD_REQUEST)
+
+            config = get_idempotency_settings()
+            cache_key = _cache_key(request.user, key)
+            try:
+                # 解析上传文件会写临时文件，放到线程中
+                fingerprint = await sync_to_async(_fingerprint)(request)
+            except MultiPartParserError:
+                # 表单无效，由视图返回 400
+                return await view_func(request, *args, **kwargs)
+            entry = await cache.aget(cache_key)
+            if entry is not None:
+                return _check(entry, fingerprint)
+            pending = {'fingerprint': fingerprint, 'pending': True}
+            if not await cache.aadd(cache_key, pending, config['LOCK_TIMEOUT']):
+                return _check(await cache.aget(cache_key) or pending, fingerprint)
+            try:
+                response = await view_func(request, *args, **kwargs)
+            except BaseException:
+                await cache.adelete(cache_key)
+                raise
+            entry = _entry(fingerprint, response)
+            if entry is None:
+                await cache.adelete(cache_key)
+            else:
+                await cache.aset(cache_key, entry, config['TTL'])
+            return response
+        return async_wrapped
+
+    @wraps(view_func)
+    def wrapped(*args, **kwargs):
+        # 函数视图第一个参数是 request，视图方法第二个参数是 request
+        request = args[0] if hasattr(args[0], 'user') else args[1]
+        key = _read_key(request)
+        if key is None:
+            return view_func(*args, **kwargs)
+        if not key:
+            return _error('Idempotency-Key 格式无效', status.HTTP_400_BAD_REQUEST)
+
+        config = get_idempotency_settings()
+        cache_key = _cache_key(request.user, key)
+        fingerprint = _fingerprint(request)
+        # 重试只需这一次缓存读取
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return _check(entry, fingerprint)
+        pending = {'fingerprint': fingerprint, 'pending': True}
+        if not cache.add(cache_key, pending, config['LOCK_TIMEOUT']):
+            # 另一个相同键的请求刚刚开始处理
+            return _check(cache.get(cache_key) or pending, fingerprint)
+        try:
+            response = view_func(*args, **kwargs)
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        entry = _entry(fingerprint, response)
+        if entry is None:
+            cache.delete(cache_key)
+        else:
+            cache.set(cache_key, entry, config['TTL'])
+        return response
+    return wrapped
@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from contextlib import redirect_stdout
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment,
+)
+
+from system.benchmark import BenchmarkRunner, compare_with_baseline
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+# 压测期间使用独立的进程内缓存，不污染共享缓存
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+# 令牌有效期覆盖整个压测过程
+BENCHMARK_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+}
+
+
+class Command(BaseCommand):
+    help = ('在独立的测试数据库上压测全部 API，输出各接口吞吐量和 p50/p95/p99 延迟；'
+            'orders/urls.py、users/urls.py 中有路由没有压测场景时命令失败')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='完整业务流程的轮数')
+        parser.add_argument('--orders', type=int, default=500, help='预置的历史订单数')
+        parser.add_argument('--users-per-role', type=int, default=2, help='每个角色的用户数')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子，相同种子请求序列相同')
+        parser.add_argument('--concurrency', type=int, default=0,
+                            help='额外在单进程内经 ASGI 同时发起的下载数，0 表示不测')
+        parser.add_argument('--output', help='结果 JSON 输出路径')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='用于比较的基线 JSON')
+        parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基线')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='p95 允许的退化比例')
+        parser.add_argument('--fail-on-regression', action='store_true', help='有接口退化时返回非零退出码')
+
+    def handle(self, *args, **options):
+        runner = BenchmarkRunner(
+            iterations=options['iterations'],
+            orders=options['orders'],
+            users_per_role=options['users_per_role'],
+            seed=options['seed'],
+            concurrency=options['concurrency'],
+        )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                # 视图中的调试 print 照常执行（计入耗时），但不混入报告输出
+                with override_settings(MEDIA_ROOT=media_root, DEBUG=False, CACHES=BENCHMARK_CACHES,
+                                       SIMPLE_JWT=BENCHMARK_JWT), \
+                        open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    results = runner.run()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.print_results(results)
+
+        if options['output']:
+            self.write_json(options['output'], results)
+            self.stdout.write(f"结果已写入 {options['output']}")
+
+        # 新增接口必须同时补上压测场景，不完整的结果也不能存为基线
+        uncovered = results['coverage']['uncovered']
+        if uncovered:
+            raise CommandError(f"以下路由没有压测场景，请在 system/benchmark.py 中补充: {', '.join(uncovered)}")
+
+        if options['save_baseline']:
+            self.write_json(options['baseline'], results)
+            self.stdout.write(f"基线已更新: {options['baseline']}")
+            return
+
+        if os.path.exists(options['baseline']):
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_with_baseline(results, baseline, options['tolerance'])
+            self.print_regressions(regressions, options['tolerance'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} 个接口性能退化超过 {options['tolerance']:.0%}")
+
+    def write_json(self, path, data):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def print_results(self, results):
+        header = f"{'接口':<40} {'次数':>6} {'错误':>5} {'串行req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, item in results['endpoints'].items():
+            line = (f"{name:<40} {item['count']:>6} {item['errors']:>5} {item['serial_rps']:>9.1f} "
+                    f"{item['p50_ms']:>8.1f}ms {item['p95_ms']:>7.1f}ms {item['p99_ms']:>7.1f}ms")
+            self.stdout.write(self.style.ERROR(line) if item['errors'] else line)
+
+        total = results['total']
+        self.stdout.write('-' * len(header))
+        self.stdout.write(
+            f"共 {total['requests']} 个请求，{total['errors']} 个错误，"
+            f"耗时 {total['wall_time_s']}s，整体吞吐 {total['throughput_rps']} req/s"
+        )
+
+        for name, reason in results['coverage']['skipped'].items():
+            self.stdout.write(self.style.WARNING(f"未压测 {name}: {reason}"))
+
+        concurrent = results.get('concurrent_downloads')
+        if concurrent:
+            mode = '异步视图' if concurrent['async_views'] else '同步视图'
+            self.stdout.write(
+                f"单进程并发下载（ASGI，{mode}）: {concurrent['concurrency']} 个并发，"
+                f"{concurrent['errors']} 个错误，耗时 {concurrent['wall_time_s']}s，"
+                f"吞吐 {concurrent['throughput_rps']} req/s，p50 {concurrent['p50_ms']:.1f}ms，"
+                f"p95 {concurrent['p95_ms']:.1f}ms"
+            )
+
+    def print_regressions(self, regressions, tolerance):
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f"与基线相比没有超过 {tolerance:.0%} 的 p95 退化"))
+            return
+        self.stdout.write(self.style.WARNING('与基线相比退化的接口:'))
+        for item in regressions:
+            self.stdout.write(self.style.WARNING(
+                f"  {item['endpoint']}: {item['baseline']:.1f}ms -> {item['current']:.1f}ms (x{item['ratio']})"
+            ))
@@ -0,0 +1,62 @@
+import json
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from orders.archive import ORDER_RELATED
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from system.benchmark import compare_renderers
+from system.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = '用数据库中的订单构造 OrderSerializer 分页响应，比较 DRF JSONRenderer 与 orjson 渲染器的编码耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='20,100,500,2000',
+                            help='逗号分隔的每页订单数，订单不够时循环使用')
+        parser.add_argument('--repeat', type=int, default=50, help='每种渲染器每页重复编码的次数')
+        parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+
+    def handle(self, *args, **options):
+        try:
+            page_sizes = [int(size) for size in options['page_sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--page-sizes 必须是逗号分隔的整数')
+        if not page_sizes or min(page_sizes) <= 0 or options['repeat'] <= 0:
+            raise CommandError('每页订单数和重复次数必须大于 0')
+
+        orders = list(Order.objects.select_related(*ORDER_RELATED).order_by('-created_at')[:max(page_sizes)])
+        if not orders:
+            raise CommandError('数据库中没有订单，请先运行 manage.py seed_orders')
+
+        renderers = {'json': JSONRenderer(), 'orjson': ORJSONRenderer()}
+        report = {}
+        for size in page_sizes:
+            page = list(islice(cycle(orders), size))
+            data = {
+                'count': size,
+                'next': None,
+                'previous': None,
+                'results': OrderSerializer(page, many=True).data,
+            }
+            report[size] = compare_renderers(data, renderers, options['repeat'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        header = f"{'每页':>6} {'渲染器':<8} {'中位数':>10} {'最快':>10} {'大小':>10} {'加速':>7}  一致"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        mismatched = False
+        for size, results in report.items():
+            for name, item in results.items():
+                mismatched = mismatched or not item['identical']
+                line = (f"{size:>6} {name:<8} {item['median_ms']:>8.2f}ms {item['min_ms']:>8.2f}ms "
+                        f"{item['bytes']:>10} {item['speedup']:>6.2f}x  {'是' if item['identical'] else '否'}")
+                self.stdout.write(line if item['identical'] else self.style.ERROR(line))
+        if mismatched:
+            raise CommandError('orjson 渲染器的输出与 DRF JSONRenderer 不一致')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from system.slow_queries import get_slow_query_settings, load_slow_queries
+
+SORT_KEYS = {
+    'total': lambda entry: entry['total_ms'],
+    'max': lambda entry: entry['max_ms'],
+    'count': lambda entry: entry['count'],
+}
+
+
+class Command(BaseCommand):
+    help = '按 SQL 指纹列出最慢的查询及其执行计划'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help='显示条数')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total', help='排序方式')
+        parser.add_argument('--no-plan', action='store_true', help='不显示执行计划')
+        parser.add_argument('--directory', help='慢查询日志目录，默认读取 SLOW_QUERY_LOG 配置')
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or get_slow_query_settings()['DIRECTORY']
+        entries = load_slow_queries(directory)
+        if not entries:
+            self.stdout.write(f"没有慢查询记录（目录: {directory}）")
+            return
+
+        entries.sort(key=SORT_KEYS[options['sort']], reverse=True)
+        for rank, entry in enumerate(entries[:options['limit']], start=1):
+            avg_ms = entry['total_ms'] / entry['count']
+            self.stdout.write(self.style.WARNING(
+                f"#{rank}  次数 {entry['count']}  合计 {entry['total_ms']:.1f}ms  "
+                f"平均 {avg_ms:.1f}ms  最慢 {entry['max_ms']:.1f}ms  ({entry['vendor']})"
+            ))
+            self.stdout.write(f"  指纹: {entry['fingerprint']}")
+            self.stdout.write(f"  最慢语句: {entry['worst_sql']}")
+            if not options['no_plan']:
+                plan = entry.get('plan') or '（无执行计划）'
+                self.stdout.write('  执行计划:')
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write('')
@@ -0,0 +1,78 @@
+import json
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from system.startup import DEFAULT_PATH, profile_startup
+
+PHASES = (
+    ('interpreter_ms', '解释器启动'),
+    ('application_ms', '加载应用'),
+    ('first_request_ms', '第一个请求'),
+    ('warm_request_ms', '预热后请求'),
+    ('time_to_first_response_ms', '到第一个响应'),
+)
+
+
+class Command(BaseCommand):
+    help = '在新进程中测量冷启动：各模块导入耗时和到第一个响应的时间，超出预算时报错'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=DEFAULT_PATH, help='第一个请求的路径')
+        parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi', help='部署方式')
+        parser.add_argument('--runs', type=int, default=3, help='测量次数，结果取中位数')
+        parser.add_argument('--top', type=int, default=15, help='列出的包和模块数')
+        parser.add_argument('--budget-ms', type=float, default=settings.STARTUP_BUDGET_MS,
+                            help='到第一个响应的预算（毫秒），0 表示不检查')
+        parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+
+    def handle(self, *args, **options):
+        reports = []
+        for _ in range(max(options['runs'], 1)):
+            try:
+                reports.append(profile_startup(options['path'], options['mode'], options['top'],
+                                               cwd=settings.BASE_DIR))
+            except RuntimeError as exc:
+                raise CommandError(f'启动测量失败:\n{exc}')
+
+        # 阶段耗时取中位数，导入明细取到第一个响应最接近中位数的一次
+        summary = {key: round(statistics.median(report[key] for report in reports), 1)
+                   for key, _ in PHASES}
+        median_report = min(reports, key=lambda report: abs(
+            report['time_to_first_response_ms'] - summary['time_to_first_response_ms']))
+        summary.update(
+            mode=options['mode'],
+            path=options['path'],
+            runs=len(reports),
+            status_code=median_report['status_code'],
+            budget_ms=options['budget_ms'],
+            imports=median_report['imports'],
+        )
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+        else:
+            self._print(summary)
+
+        budget = options['budget_ms']
+        if budget and summary['time_to_first_response_ms'] > budget:
+            raise CommandError(
+                f"冷启动 {summary['time_to_first_response_ms']:.0f}ms 超出预算 {budget:.0f}ms"
+            )
+
+    def _print(self, summary):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{summary['mode'].upper()} {summary['path']} -> {summary['status_code']}"
+            f"（{summary['runs']} 次中位数）"
+        ))
+        for key, label in PHASES:
+            self.stdout.write(f"  {label:<10} {summary[key]:>8.1f}ms")
+
+        imports = summary['imports']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"导入合计 {imports['total_ms']:.1f}ms，按顶层包:"))
+        for entry in imports['packages']:
+            self.stdout.write(f"  {entry['self_ms']:>8.1f}ms  {entry['package']}")
+        self.stdout.write(self.style.MIGRATE_HEADING('累计耗时最长的直接导入:'))
+        for entry in imports['modules']:
+            self.stdout.write(f"  {entry['cumulative_ms']:>8.1f}ms  {entry['module']}")
@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from system.db.router import replica_alias
+
+
+class Command(BaseCommand):
+    help = '把主库 SQLite 文件完整复制到模拟副本（SQLITE_REPLICA=True 时使用）'
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('未配置只读副本，请设置 SQLITE_REPLICA=True')
+
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError('只支持 SQLite 模拟副本，真实副本由数据库复制同步')
+
+        target.close()
+        with sqlite3.connect(source.settings_dict['NAME']) as src, \
+                sqlite3.connect(target.settings_dict['NAME']) as dst:
+            src.backup(dst)
+        self.stdout.write(self.style.SUCCESS(
+            f"已复制 {source.settings_dict['NAME']} -> {target.settings_dict['NAME']}"
+        ))
@@ -0,0 +1,237 @@
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.utils import timezone
+
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import health
+from .db import router as db_router
+from .profiling import RequestProfile, get_profile_store, get_profiler_settings, get_sampler
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckMiddleware:
+    """直接应答 /healthz 和 /readyz，放在中间件链最前面
+
+    探测请求不经过 HTTPS 跳转、主机名校验、会话和认证；就绪检查的数据库查询
+    在 ASGI 下放到同步线程执行。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.path in health.LIVENESS_PATHS:
+            return self._response(True)
+        if request.path in health.READINESS_PATHS:
+            return self._response(*health.readiness())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path in health.LIVENESS_PATHS:
+            return self._response(True)
+        if request.path in health.READINESS_PATHS:
+            return self._response(*await sync_to_async(health.readiness)())
+        return await self.get_response(request)
+
+    @staticmethod
+    def _response(ok, checks=None):
+        data = {'status': 'ok' if ok else 'unavailable'}
+        if checks is not None:
+            data['checks'] = checks
+        response = JsonResponse(data, status=200 if ok else 503)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """同时支持同步和异步请求的 WhiteNoise
+
+    WhiteNoise 只支持同步调用，放在 ASGI 中间件链里会让 Django 把之后的整条链
+    （包括异步视图）都切回同步线程执行。这里只在命中静态文件时同步处理，
+    其余请求直接 await 下游。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """为 system.db.router.ReplicaRouter 设置每个请求的读写路由状态
+
+    只读请求（GET/HEAD/OPTIONS）的读操作走副本，除非该客户端刚写过数据；
+    其余请求全部走主库。请求期间发生过写操作时，在共享缓存中记下该客户端，
+    STICKY_SECONDS 内它的读请求也走主库。未配置副本时不启用。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if db_router.replica_alias() is None:
+            raise MiddlewareNotUsed('未配置只读副本')
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        client_key = db_router.client_key(request)
+        token = db_router.begin_request(self._use_primary(request, client_key))
+        try:
+            return self.get_response(request)
+        finally:
+            if db_router.end_request(token):
+                db_router.pin_client(client_key)
+
+    async def __acall__(self, request):
+        client_key = db_router.client_key(request)
+        primary = await sync_to_async(self._use_primary)(request, client_key)
+        token = db_router.begin_request(primary)
+        try:
+            return await self.get_response(request)
+        finally:
+            if db_router.end_request(token):
+                await sync_to_async(db_router.pin_client)(client_key)
+
+    @staticmethod
+    def _use_primary(request, client_key):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return True
+        return db_router.is_client_pinned(client_key)
+
+
+class RequestProfilerMiddleware:
+    """慢请求采样分析中间件
+
+    按 SAMPLE_RATE 抽样请求，记录调用栈和 SQL；
+    只有耗时超过 THRESHOLD_MS 的请求才会写入磁盘。
+    异步请求（ASGI 下的异步视图）与其他请求共用事件循环线程，按线程采样的调用栈
+    会混入别的请求，因此只记录 SQL。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = get_profiler_settings()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed('请求分析未开启')
+
+        self.get_response = get_response
+        self.threshold_ms = config['THRESHOLD_MS']
+        self.sample_rate = config['SAMPLE_RATE']
+        self.sampler = get_sampler()
+        self.store = get_profile_store()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        profile = RequestProfile(threading.get_ident())
+        started_at = timezone.now()
+        start = time.perf_counter()
+
+        token = profile.activate()
+        self.sampler.register(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.sampler.unregister(profile)
+            profile.deactivate(token)
+
+        self._finish(request, response, profile, started_at, start)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        started_at = timezone.now()
+        start = time.perf_counter()
+
+        token = profile.activate()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile.deactivate(token)
+
+        await sync_to_async(self._finish)(request, response, profile, started_at, start)
+        return response
+
+    def _finish(self, request, response, profile, started_at, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= self.threshold_ms:
+            try:
+                self._save(request, response, profile, started_at, duration_ms)
+            except Exception as e:
+                logger.error(f"保存请求分析记录失败: {str(e)}")
+
+    def _save(self, request, response, profile, started_at, duration_ms):
+        user = getattr(request, 'user', None)
+        record = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status_code': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'started_at': started_at.isoformat(),
+            'user': user.username if user is not None and user.is_authenticated else None,
+            'query_count': len(profile.queries),
+            'query_time_ms': round(sum(q['duration_ms'] for q in profile.queries), 3),
+            'queries': profile.queries,
+            'duplicate_queries': profile.duplicate_queries(),
+            # 异步请求不采样调用栈
+            'stack_sampled': profile.thread_id is not None,
+            'folded_stacks': profile.folded(),
+        }
+        profile_id = self.store.save(record)
+        logger.warning(
+            f"慢请求 {request.method} {request.path} 耗时 {duration_ms:.0f}ms，"
+            f"{len(profile.queries)} 条SQL，分析记录: {profile_id}"
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('info', '信息'), ('warning', '警告'), ('error', '错误'), ('critical', '严重')], max_length=20, verbose_name='日志类型')),
+                ('module', models.CharField(choices=[('orders', '订单'), ('users', '用户'), ('system', '系统'), ('auth', '认证')], max_length=20, verbose_name='模块')),
+                ('message', models.TextField(verbose_name='日志内容')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP地址')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='操作用户')),
+            ],
+            options={
+                'verbose_name': '系统日志',
+                'verbose_name_plural': '系统日志',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
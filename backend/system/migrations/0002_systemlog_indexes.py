@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['-created_at'], name='systemlog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['type', '-created_at'], name='systemlog_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['module', '-created_at'], name='systemlog_module_created_idx'),
+        ),
+    ]
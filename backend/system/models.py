@@ -29,6 +29,12 @@ class SystemLog(models.Model):
         verbose_name = '系统日志'
         verbose_name_plural = '系统日志'
         ordering = ['-created_at']
+        indexes = [
+            # 后台按时间倒序翻页，以及按类型、模块筛选后翻页
+            models.Index(fields=['-created_at'], name='systemlog_created_idx'),
+            models.Index(fields=['type', '-created_at'], name='systemlog_type_created_idx'),
+            models.Index(fields=['module', '-created_at'], name='systemlog_module_created_idx'),
+        ]
         
     def __str__(self):
         return f"[{self.type}][{self.module}] {self.message[:50]}..."
\ No newline at end of file
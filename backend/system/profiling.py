@@ -0,0 +1,270 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .sql import fingerprint_sql
+
+
+def get_profiler_settings():
+    """读取慢请求分析配置"""
+    defaults = {
+        'ENABLED': False,
+        'THRESHOLD_MS': 500,
+        'SAMPLE_RATE': 1.0,
+        'INTERVAL_MS': 5,
+        'MAX_PROFILES': 50,
+        'DIRECTORY': os.path.join(settings.BASE_DIR, 'profiles'),
+    }
+    defaults.update(getattr(settings, 'REQUEST_PROFILER', {}))
+    return defaults
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+def collapse_stack(frame):
+    """将调用栈折叠成 flamegraph 格式（根在前，以分号分隔）"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+# 当前正在分析的请求。异步视图经 sync_to_async 在线程中执行的 ORM 调用也会复制这份上下文，
+# 因此 SQL 由挂在每个连接上的 profile_sql 按它记录，而不是只包装当前线程的连接
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """单个请求的采样结果：调用栈计数和执行过的 SQL
+
+    thread_id 为处理请求的线程，由 StackSampler 采样调用栈；异步请求在事件循环线程上
+    与其他请求交替执行，按线程采样会混入别的请求，传 None 只记录 SQL。
+    """
+
+    def __init__(self, thread_id=None):
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def add_stack(self, stack):
+        with self._lock:
+            self.stacks[stack] += 1
+
+    def activate(self):
+        """之后本上下文中执行的 SQL 记到该请求，返回用于 deactivate 的 token"""
+        return _current_profile.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current_profile.reset(token)
+
+    def record_query(self, alias, sql, duration_ms, many):
+        self.queries.append({
+            'alias': alias,
+            'sql': sql,
+            'duration_ms': round(duration_ms, 3),
+            'many': many,
+        })
+
+    def duplicate_queries(self):
+        """按指纹统计重复执行的查询（通常意味着 N+1）"""
+        counts = Counter()
+        durations = Counter()
+        for query in self.queries:
+            fingerprint = fingerprint_sql(query['sql'])
+            counts[fingerprint] += 1
+            durations[fingerprint] += query['duration_ms']
+        return [
+            {
+                'fingerprint': fingerprint,
+                'count': count,
+                'total_ms': round(durations[fingerprint], 3),
+            }
+            for fingerprint, count in counts.most_common()
+            if count > 1
+        ]
+
+    def folded(self):
+        """flamegraph.pl / speedscope 可直接读取的折叠栈文本"""
+        with self._lock:
+            return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def paused():
+    """期间执行的 SQL 不记到当前请求，用于慢查询日志自己发出的 EXPLAIN 和保存点"""
+    token = _current_profile.set(None)
+    try:
+        yield
+    finally:
+        _current_profile.reset(token)
+
+
+def profile_sql(execute, sql, params, many, context):
+    """挂在每个数据库连接上的 SQL 记录器，只记录正在分析的请求"""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(context['connection'].alias, sql, (time.perf_counter() - start) * 1000, many)
+
+
+def install_request_profiler(sender, connection, **kwargs):
+    """connection_created 信号处理：开启请求分析时为新连接挂上 SQL 记录器"""
+    if get_profiler_settings()['ENABLED'] and profile_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_sql)
+
+
+class StackSampler:
+    """进程内共享的调用栈采样线程
+
+    只对注册过的请求线程采样，没有请求在分析时线程处于空闲等待状态。
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(self, profile):
+        if profile.thread_id is None:
+            return
+        with self._lock:
+            self._profiles[profile.thread_id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='request-profiler', daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def unregister(self, profile):
+        with self._lock:
+            self._profiles.pop(profile.thread_id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                profiles = list(self._profiles.values())
+            if not profiles:
+                self._wakeup.clear()
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            for profile in profiles:
+                frame = frames.get(profile.thread_id)
+                if frame is not None:
+                    profile.add_stack(collapse_stack(frame))
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """磁盘上的环形分析记录存储，超过上限时删除最旧的记录"""
+
+    SUFFIX = '.json'
+
+    def __init__(self, directory, max_profiles):
+        self.directory = str(directory)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id):
+        return os.path.join(self.directory, f"{profile_id}{self.SUFFIX}")
+
+    def _filenames(self):
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(self.SUFFIX)]
+        except FileNotFoundError:
+            return []
+        # 文件名以时间戳开头，字典序即时间顺序
+        return sorted(names)
+
+    def save(self, record):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+        record['id'] = profile_id
+        tmp_path = self._path(profile_id) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(profile_id))
+
+        with self._lock:
+            names = self._filenames()
+            for name in names[:max(len(names) - self.max_profiles, 0)]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+        return profile_id
+
+    def list(self):
+        """返回所有记录的摘要，最新的在前"""
+        summaries = []
+        for name in reversed(self._filenames()):
+            record = self.get(name[:-len(self.SUFFIX)])
+            if record is None:
+                continue
+            summaries.append({
+                key: record.get(key)
+                for key in ('id', 'method', 'path', 'status_code', 'duration_ms',
+                            'query_count', 'query_time_ms', 'user', 'started_at')
+            })
+        return summaries
+
+    def get(self, profile_id):
+        # 只允许时间戳-随机串格式，避免路径穿越
+        if not profile_id or not all(c.isalnum() or c == '-' for c in profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            config = get_profiler_settings()
+            _sampler = StackSampler(config['INTERVAL_MS'] / 1000)
+        return _sampler
+
+
+_store = None
+
+
+def get_profile_store():
+    """进程内唯一的分析记录存储，清理旧记录的锁才能在并发的请求之间生效"""
+    global _store
+    with _sampler_lock:
+        if _store is None:
+            config = get_profiler_settings()
+            _store = ProfileStore(config['DIRECTORY'], config['MAX_PROFILES'])
+        return _store
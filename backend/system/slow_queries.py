@@ -0,0 +1,217 @@
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import profiling
+from .sql import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+# 只对这些语句执行 EXPLAIN（EXPLAIN 本身不会真正执行语句）
+EXPLAINABLE_PREFIXES = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+def get_slow_query_settings():
+    """读取慢查询日志配置"""
+    defaults = {
+        'ENABLED': False,
+        'THRESHOLD_MS': 100,
+        'EXPLAIN': True,
+        'FLUSH_INTERVAL': 30,
+        'DIRECTORY': os.path.join(settings.BASE_DIR, 'slow_queries'),
+    }
+    defaults.update(getattr(settings, 'SLOW_QUERY_LOG', {}))
+    return defaults
+
+
+class SlowQueryLog:
+    """按 SQL 指纹聚合的慢查询统计
+
+    作为 connection.execute_wrappers 挂在每个数据库连接上。每个进程在内存中聚合，
+    定期写入 DIRECTORY 下以主机名和进程号命名的 JSON 文件，由 slow_queries 命令合并展示。
+    """
+
+    def __init__(self, threshold_ms, directory, explain=True, flush_interval=30):
+        self.threshold_ms = threshold_ms
+        self.directory = str(directory)
+        self.explain = explain
+        self.flush_interval = flush_interval
+        self._stats = {}
+        # 正在由某个线程 EXPLAIN 的指纹，避免并发的同一慢查询重复 EXPLAIN
+        self._explaining = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_flush = time.monotonic()
+        self._dirty = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # EXPLAIN 自身也会经过本包装器，直接放行
+        if getattr(self._local, 'explaining', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= self.threshold_ms:
+            try:
+                self.record(context['connection'], sql, params, many, duration_ms)
+            except Exception as e:
+                logger.error(f"记录慢查询失败: {str(e)}")
+        return result
+
+    def record(self, connection, sql, params, many, duration_ms):
+        fingerprint = fingerprint_sql(sql)
+        now = timezone.now().isoformat()
+
+        with self._lock:
+            entry = self._stats.get(fingerprint)
+            if entry is None:
+                entry = self._stats[fingerprint] = {
+                    'fingerprint': fingerprint,
+                    'vendor': connection.vendor,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'worst_sql': sql,
+                    'plan': None,
+                    'first_seen': now,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['last_seen'] = now
+            if duration_ms >= entry['max_ms']:
+                entry['max_ms'] = duration_ms
+                entry['worst_sql'] = sql
+            # executemany 的参数是多组，无法 EXPLAIN；等该指纹出现单条执行时再取计划
+            explain = (self.explain and not many and entry['plan'] is None
+                       and fingerprint not in self._explaining)
+            if explain:
+                self._explaining.add(fingerprint)
+            self._dirty = True
+
+        if explain:
+            try:
+                # 不可 EXPLAIN 的语句（INSERT 等）得到 None，只做前缀判断，不访问数据库
+                entry['plan'] = self._explain(connection, sql, params)
+            finally:
+                with self._lock:
+                    self._explaining.discard(fingerprint)
+
+        logger.warning(f"慢查询 {duration_ms:.0f}ms: {fingerprint[:200]}")
+        self.maybe_flush()
+
+    def _explain(self, connection, sql, params):
+        if not sql.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            return None
+
+        # SQLite 为 EXPLAIN QUERY PLAN，PostgreSQL 为 EXPLAIN
+        prefix = connection.ops.explain_query_prefix()
+        self._local.explaining = True
+        # 慢查询在事务中时用保存点隔离：PostgreSQL 上 EXPLAIN 出错会让整个事务进入 aborted 状态，
+        # 请求之后的查询都会失败；回滚到保存点后调用方的事务不受影响
+        if connection.in_atomic_block:
+            savepoint = transaction.atomic(using=connection.alias, savepoint=True)
+        else:
+            savepoint = nullcontext()
+        try:
+            # EXPLAIN 和保存点语句不属于请求本身，不记入请求分析
+            with profiling.paused(), savepoint, connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+        except Exception as e:
+            return f"EXPLAIN 失败: {str(e)}"
+        finally:
+            self._local.explaining = False
+
+    def _path(self):
+        return os.path.join(self.directory, f"{socket.gethostname()}-{os.getpid()}.json")
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = [dict(entry) for entry in self._stats.values()]
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path() + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path())
+        except OSError as e:
+            logger.error(f"写入慢查询日志失败: {str(e)}")
+
+
+def load_slow_queries(directory):
+    """合并所有进程写出的慢查询统计"""
+    merged = {}
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith('.json')]
+    except FileNotFoundError:
+        return []
+
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        for entry in entries:
+            current = merged.get(entry['fingerprint'])
+            if current is None:
+                merged[entry['fingerprint']] = dict(entry)
+                continue
+            current['count'] += entry['count']
+            current['total_ms'] += entry['total_ms']
+            current['first_seen'] = min(current['first_seen'], entry['first_seen'])
+            current['last_seen'] = max(current['last_seen'], entry['last_seen'])
+            if entry['max_ms'] > current['max_ms']:
+                current['max_ms'] = entry['max_ms']
+                current['worst_sql'] = entry['worst_sql']
+            current['plan'] = current['plan'] or entry['plan']
+
+    return list(merged.values())
+
+
+_slow_query_log = None
+
+
+def get_slow_query_log():
+    """进程内唯一的慢查询日志实例，未开启时返回 None"""
+    global _slow_query_log
+    if _slow_query_log is None:
+        config = get_slow_query_settings()
+        if not config['ENABLED']:
+            return None
+        _slow_query_log = SlowQueryLog(
+            threshold_ms=config['THRESHOLD_MS'],
+            directory=config['DIRECTORY'],
+            explain=config['EXPLAIN'],
+            flush_interval=config['FLUSH_INTERVAL'],
+        )
+        atexit.register(_slow_query_log.flush)
+    return _slow_query_log
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """connection_created 信号处理：为新连接挂上慢查询包装器"""
+    slow_query_log = get_slow_query_log()
+    if slow_query_log is not None and slow_query_log not in connection.execute_wrappers:
+        # 插在最外层，避免与 execute_wrapper() 上下文管理器的 append/pop 交错
+        connection.execute_wrappers.insert(0, slow_query_log)
@@ -0,0 +1,17 @@
+import re
+
+# SQL 指纹归一化：去掉字面量和参数，使同一形状的查询归为一类
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint_sql(sql):
+    """将 SQL 归一化为指纹，例如 WHERE id = 3 与 WHERE id = 5 得到相同结果"""
+    normalized = _STRING_RE.sub('?', sql)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _PLACEHOLDER_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
@@ -0,0 +1,158 @@
+"""冷启动耗时分析
+
+在一个全新的子进程（python -X importtime）中按部署方式加载应用并处理第一个请求，
+记录各阶段耗时；父进程解析解释器输出的导入耗时，按模块和顶层包汇总。
+子进程直接调用 WSGI/ASGI 应用对象，不经过 django.test，导入的模块与真实 worker 一致。
+
+    python -X importtime -m system.startup --path /api/users/me/ --mode wsgi
+"""
+import argparse
+import importlib
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+
+DEFAULT_PATH = '/api/users/me/'
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def _ms(start, end):
+    return round((end - start) * 1000, 1)
+
+
+def _wsgi_request(application, path):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost', 'SERVER_NAME': 'localhost'}
+    setup_testing_defaults(environ)
+    status = []
+    response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        b''.join(response)
+    finally:
+        getattr(response, 'close', lambda: None)()
+    return int(status[0].split()[0])
+
+
+def _asgi_request(application, path):
+    import asyncio
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    asyncio.run(application(scope, receive, send))
+    return status[0]
+
+
+def probe(path=DEFAULT_PATH, mode='wsgi'):
+    """在当前进程中加载 fire_door_oa.wsgi / fire_door_oa.asgi 并请求两次 path
+
+    只应在新进程中调用，否则测到的是已预热的结果。
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    # 与 gunicorn 一样导入部署入口模块，包括入口模块里设置的环境变量
+    application = importlib.import_module(f'fire_door_oa.{mode}').application
+    request = _asgi_request if mode == 'asgi' else _wsgi_request
+    app_done = time.perf_counter()
+
+    status_code = request(application, path)
+    first_done = time.perf_counter()
+    first_response_at = time.time()
+    request(application, path)
+    second_done = time.perf_counter()
+
+    return {
+        'mode': mode,
+        'path': path,
+        'status_code': status_code,
+        'application_ms': _ms(start, app_done),
+        'first_request_ms': _ms(app_done, first_done),
+        'warm_request_ms': _ms(first_done, second_done),
+        'started_at': started_at,
+        'first_response_at': first_response_at,
+    }
+
+
+def parse_importtime(output):
+    """解析 -X importtime 的输出，返回 [(模块名, 自身微秒, 累计微秒, 嵌套深度)]"""
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def summarize_imports(modules, top=15):
+    """按顶层包汇总自身耗时，并列出累计耗时最长的直接导入（深度 0）"""
+    packages = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.split('.')[0]] += self_us
+    return {
+        'total_ms': round(sum(packages.values()) / 1000, 1),
+        'packages': [
+            {'package': name, 'self_ms': round(us / 1000, 1)}
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        'modules': [
+            {'module': name, 'cumulative_ms': round(cumulative_us / 1000, 1)}
+            for name, _, cumulative_us, depth in sorted(modules, key=lambda item: -item[2])
+            if depth == 0
+        ][:top],
+    }
+
+
+def profile_startup(path=DEFAULT_PATH, mode='wsgi', top=15, cwd=None):
+    """启动一个子进程测量冷启动，返回阶段耗时和导入汇总
+
+    interpreter_ms 为启动解释器到开始加载应用的时间；time_to_first_response_ms
+    从启动解释器算起，到第一个响应体读完为止。-X importtime 本身会让导入略慢一些。
+    """
+    import subprocess
+
+    started_at = time.time()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'system.startup', '--path', path, '--mode', mode],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    # stdout 只有最后一行是结果，应用启动时打印的其他内容忽略
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        errors = [line for line in result.stderr.splitlines() if not _IMPORT_LINE.match(line)]
+        raise RuntimeError('\n'.join(errors[-20:]) or f'子进程退出码 {result.returncode}')
+
+    report = json.loads(lines[-1])
+    report['interpreter_ms'] = round((report.pop('started_at') - started_at) * 1000, 1)
+    report['time_to_first_response_ms'] = round((report.pop('first_response_at') - started_at) * 1000, 1)
+    report['imports'] = summarize_imports(parse_importtime(result.stderr), top=top)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='在当前进程中测量应用加载和第一个请求的耗时')
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi')
+    args = parser.parse_args(argv)
+    report = probe(args.path, args.mode)
+    sys.stdout.write('\n' + json.dumps(report) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import io
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from system import benchmark
+from system.benchmark import BenchmarkRunner
+
+
+class BenchmarkCoverageTests(TestCase):
+
+    def run_benchmark(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                redirect_stdout(io.StringIO()):
+            return BenchmarkRunner(iterations=1, orders=30, users_per_role=1).run()
+
+    def test_every_route_is_benchmarked_without_errors(self):
+        results = self.run_benchmark()
+        self.assertEqual(results['total']['errors'], 0, results['endpoints'])
+        self.assertEqual(results['coverage']['uncovered'], [])
+        # 默认本地磁盘存储，直传相关接口说明原因后跳过
+        self.assertEqual(set(results['coverage']['skipped']), {'order-upload-url', 'order-download-url'})
+        self.assertEqual(results['coverage']['routes'], len(benchmark.route_names()))
+
+    def test_route_without_scenario_is_reported(self):
+        routes = benchmark.route_names() | {'order-new-endpoint'}
+        with mock.patch.object(benchmark, 'route_names', return_value=routes):
+            results = self.run_benchmark()
+        self.assertEqual(results['coverage']['uncovered'], ['order-new-endpoint'])
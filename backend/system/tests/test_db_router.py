@@ -0,0 +1,116 @@
+import io
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import RequestFactory, TransactionTestCase
+
+from orders.dashboard import order_counts
+from orders.inbox import get_inbox
+from orders.models import Order
+from system.db import router as db_router
+from system.middleware import ReplicaRoutingMiddleware
+from users.authentication import get_cached_user
+from users.models import User
+
+
+@unittest.skipUnless(db_router.replica_alias(), '需要 fire_door_oa.test_settings 中的两个 SQLite 数据库')
+class ReplicaRouterTests(TransactionTestCase):
+    databases = '__all__'
+    factory = RequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(db_router, '_replica_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync_replica(self):
+        call_command('sync_sqlite_replica', stdout=io.StringIO())
+
+    def get(self, token, view):
+        """以 token 身份发一个 GET 请求，view 在请求内执行"""
+        request = self.factory.get('/api/orders/my/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ReplicaRoutingMiddleware(lambda request: view())(request)
+
+    def usernames(self):
+        return set(User.objects.values_list('username', flat=True))
+
+    def test_read_only_request_reads_replica(self):
+        self.assertEqual(self.get('a', lambda: router.db_for_read(User)), 'replica')
+
+    def test_write_request_reads_primary(self):
+        request = self.factory.post('/api/orders/new/', HTTP_AUTHORIZATION='Bearer a')
+        middleware = ReplicaRoutingMiddleware(lambda request: router.db_for_read(User))
+        self.assertEqual(middleware(request), DEFAULT_DB_ALIAS)
+
+    def test_reads_inside_atomic_block_use_primary(self):
+        def view():
+            with transaction.atomic():
+                inside = router.db_for_read(User)
+            return inside, router.db_for_read(User)
+
+        self.assertEqual(self.get('a', view), (DEFAULT_DB_ALIAS, 'replica'))
+
+    def test_client_sticks_to_primary_after_write(self):
+        User.objects.create_user('synced')
+        self.sync_replica()
+
+        def write():
+            before = router.db_for_read(User)
+            User.objects.create_user('fresh')
+            return before, router.db_for_read(User)
+
+        # 写入之后同一请求内的读也走主库
+        self.assertEqual(self.get('writer', write), ('replica', DEFAULT_DB_ALIAS))
+
+        # 刚写过的客户端读主库，能看到自己的写入；其他客户端读副本，副本还没有同步到
+        self.assertEqual(self.get('writer', self.usernames), {'synced', 'fresh'})
+        self.assertEqual(self.get('other', self.usernames), {'synced'})
+
+        # STICKY_SECONDS 过后回到副本
+        cache.clear()
+        self.assertEqual(self.get('writer', self.usernames), {'synced'})
+
+    def test_replica_failover(self):
+        replica = connections['replica']
+        name = replica.settings_dict['NAME']
+        replica.close()
+        replica.settings_dict['NAME'] = '/nonexistent/replica.sqlite3'
+        self.addCleanup(replica.settings_dict.__setitem__, 'NAME', name)
+
+        with self.assertLogs('system.db.router', 'ERROR'):
+            self.assertEqual(self.get('a', lambda: router.db_for_read(User)), DEFAULT_DB_ALIAS)
+
+        # RETRY_SECONDS 内不再尝试连接副本
+        replica.settings_dict['NAME'] = name
+        with mock.patch.object(replica, 'ensure_connection') as ensure_connection:
+            self.assertEqual(self.get('a', lambda: router.db_for_read(User)), DEFAULT_DB_ALIAS)
+        ensure_connection.assert_not_called()
+
+        # 之后恢复使用副本
+        monotonic = db_router.time.monotonic() + db_router.get_replica_settings()['RETRY_SECONDS'] + 1
+        with mock.patch.object(db_router.time, 'monotonic', return_value=monotonic):
+            self.assertEqual(self.get('a', lambda: router.db_for_read(User)), 'replica')
+
+    def test_cache_refills_read_primary_not_lagging_replica(self):
+        user = User.objects.create_user('worker')
+        reviewer = User.objects.create_user('reviewer', role='reviewer')
+        Order.objects.create(order_number='YP2026100001', user=user, project_name='测试项目', ordered_by='张三')
+        self.sync_replica()
+
+        # 写入后清除了缓存，副本还没有同步到这些写入
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        cache.clear()
+        Order.objects.create(order_number='YP2026100002', user=user, project_name='测试项目', ordered_by='张三')
+        cache.clear()
+
+        self.assertFalse(self.get('a', lambda: get_cached_user(user.pk)).is_active)
+        self.assertEqual(self.get('a', lambda: order_counts()['by_status']['pending']), 2)
+        inbox = self.get('a', lambda: get_inbox(reviewer))
+        self.assertEqual(inbox['queues'][0]['count'], 2)
+
+    def test_writes_always_go_to_primary(self):
+        self.assertEqual(self.get('a', lambda: router.db_for_write(User)), DEFAULT_DB_ALIAS)
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from system import health
+
+
+def failing_check():
+    raise OSError('could not connect to server: db.internal.example:5432 user=fire_door_oa_user')
+
+
+class ReadinessTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(health, '_last', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failure_detail_is_logged_not_returned(self):
+        checks = (('database', failing_check), ('media', lambda: None))
+        with mock.patch.object(health, 'READINESS_CHECKS', checks), \
+                self.assertLogs('system.health', 'WARNING') as logs:
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn(b'db.internal.example', response.content)
+        self.assertEqual(response.json()['checks'], {'database': 'fail', 'media': 'ok'})
+        self.assertIn('db.internal.example', logs.output[0])
+
+    def test_result_is_reused_within_cache_window(self):
+        check = mock.Mock()
+        with mock.patch.object(health, 'READINESS_CHECKS', (('database', check),)):
+            for _ in range(5):
+                response = self.client.get('/readyz')
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(check.call_count, 1)
+
+            with mock.patch.object(health.time, 'monotonic', return_value=health.time.monotonic() + 60):
+                self.client.get('/readyz')
+            self.assertEqual(check.call_count, 2)
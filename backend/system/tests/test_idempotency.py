@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from orders.models import Order
+from system.idempotency import REPLAYED_HEADER, idempotent
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'idempotency-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class IdempotentEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.clerk = User.objects.create_user('clerk', 'secret', role='order_clerk')
+        self.warehouse = User.objects.create_user('warehouse', 'secret', role='warehouse_clerk')
+        self.client = APIClient()
+
+    def create(self, key, project_name='测试项目', filename='cutting.csv'):
+        self.client.force_authenticate(self.clerk)
+        return self.client.post('/api/orders/new/', {
+            'project_name': project_name,
+            'ordered_by': '张三',
+            'order_file': SimpleUploadedFile(filename, b'a,b\n1,2\n'),
+        }, format='multipart', HTTP_IDEMPOTENCY_KEY=key)
+
+    def inbound(self, order, key):
+        self.client.force_authenticate(self.warehouse)
+        return self.client.post(f'/api/orders/{order.pk}/inbound/', HTTP_IDEMPOTENCY_KEY=key)
+
+    def in_production(self, seq):
+        return Order.objects.create(order_number=f'YP202610{seq:04d}', user=self.clerk, status='in_production',
+                                    project_name='测试项目', ordered_by='张三')
+
+    def test_create_retry_replays_first_response(self):
+        first = self.create('create-1')
+        retry = self.create('create-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry[REPLAYED_HEADER], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_same_key_with_different_body_is_422(self):
+        self.assertEqual(self.create('create-1').status_code, 201)
+        self.assertEqual(self.create('create-1', project_name='另一个项目').status_code, 422)
+        self.assertEqual(self.create('create-1', filename='other.csv').status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_inbound_retry_replays_first_response(self):
+        order = self.in_production(1)
+        first = self.inbound(order, 'inbound-1')
+        retry = self.inbound(order, 'inbound-1')
+        self.assertEqual(first.status_code, 200)
+        # 订单已经入库，不带幂等键重复提交会返回 400；重试拿到的是第一次的结果
+        self.assertEqual((retry.status_code, retry.content), (200, first.content))
+
+    def test_key_reused_on_another_endpoint_is_422(self):
+        self.assertEqual(self.inbound(self.in_production(1), 'key-1').status_code, 200)
+        response = self.inbound(self.in_production(2), 'key-1')
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('error', response.json())
+        self.assertEqual(Order.objects.get(order_number='YP2026100002').status, 'in_production')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class IdempotentDecoratorTests(TestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('clerk', 'secret')
+
+    def call(self, view, key='key-1', data=None):
+        request = self.factory.post('/api/orders/new/', data or {'a': '1'}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(request, self.user)
+        return view(request)
+
+    def test_concurrent_retry_while_pending_is_409(self):
+        seen = []
+
+        @api_view(['POST'])
+        @idempotent
+        def view(request):
+            # 第一次请求还在处理时到达的重试
+            seen.append(self.call(view).status_code)
+            return Response({'ok': True})
+
+        self.assertEqual(self.call(view).status_code, 200)
+        self.assertEqual(seen, [409])
+
+    def test_server_errors_are_not_stored(self):
+        statuses = [500, 201]
+
+        @api_view(['POST'])
+        @idempotent
+        def view(request):
+            return Response({'status': statuses[0]}, status=statuses.pop(0))
+
+        self.assertEqual(self.call(view).status_code, 500)
+        retry = self.call(view)
+        self.assertEqual(retry.status_code, 201)
+        self.assertFalse(retry.has_header(REPLAYED_HEADER))
+        self.assertEqual(self.call(view)[REPLAYED_HEADER], 'true')
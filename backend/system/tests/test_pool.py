@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+import unittest
+from itertools import count
+
+from django.test import SimpleTestCase
+
+from system.db import pool as pool_module
+from system.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    """代替数据库连接，只记录是否已关闭"""
+    _ids = count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        connection = FakeConnection()
+        self.created.append(connection)
+        return connection
+
+
+def check(connection):
+    if connection.broken:
+        raise ConnectionError('server closed the connection unexpectedly')
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **options):
+        self.factory = FakeFactory()
+        return ConnectionPool(factory=self.factory, check=check, reset=check, name='test', **options)
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['in_use'], stats['idle']), (1, 1, 1, 0))
+
+    def test_most_recently_released_connection_first(self):
+        pool = self.make_pool()
+        a, b = pool.acquire(), pool.acquire()
+        pool.release(a)
+        pool.release(b)
+        self.assertIs(pool.acquire(), b)
+
+    def test_full_pool_times_out(self):
+        pool = self.make_pool(MAX_SIZE=2, TIMEOUT=0.05)
+        pool.acquire(), pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(len(self.factory.created), 2)
+
+    def test_full_pool_blocks_until_release(self):
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=5)
+        held = pool.acquire()
+        timer = threading.Timer(0.1, pool.release, [held])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start = time.monotonic()
+        self.assertIs(pool.acquire(), held)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(len(self.factory.created), 1)
+
+    def test_concurrent_acquire_never_exceeds_max_size(self):
+        pool = self.make_pool(MAX_SIZE=3, TIMEOUT=5)
+        in_use, peak, lock = set(), [0], threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                connection = pool.acquire()
+                with lock:
+                    in_use.add(connection.id)
+                    peak[0] = max(peak[0], len(in_use))
+                time.sleep(0.001)
+                with lock:
+                    in_use.discard(connection.id)
+                pool.release(connection)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(peak[0], 3)
+        self.assertLessEqual(len(self.factory.created), 3)
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_connection_failing_reset_is_discarded(self):
+        pool = self.make_pool()
+        broken = pool.acquire()
+        broken.broken = True
+        with self.assertLogs('system.db.pool', 'WARNING'):
+            pool.release(broken)
+        self.assertTrue(broken.closed)
+        self.assertIsNot(pool.acquire(), broken)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_idle_connection_failing_check_is_replaced(self):
+        pool = self.make_pool(CHECK_IDLE=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        # 归还后服务端断开了连接
+        connection.broken = True
+        with self.assertLogs('system.db.pool', 'WARNING'):
+            replacement = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        stats = pool.stats()
+        self.assertEqual((stats['check_failures'], stats['size']), (1, 1))
+
+    def test_explicit_discard_and_max_lifetime(self):
+        pool = self.make_pool(MAX_LIFETIME=0.01)
+        connection = pool.acquire()
+        pool.release(connection, discard=True)
+        self.assertTrue(connection.closed)
+
+        old = pool.acquire()
+        time.sleep(0.02)
+        pool.release(old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_failed_factory_frees_slot(self):
+        pool = self.make_pool(MAX_SIZE=1, TIMEOUT=0.05)
+
+        def refuse():
+            raise ConnectionError('connection refused')
+
+        with self.assertRaises(ConnectionError):
+            pool.acquire(refuse)
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsInstance(pool.acquire(), FakeConnection)
+
+    def test_foreign_connection_is_closed_on_release(self):
+        pool = self.make_pool()
+        stranger = FakeConnection()
+        pool.release(stranger)
+        self.assertTrue(stranger.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_close_all_closes_idle_connections(self):
+        pool = self.make_pool()
+        idle, busy = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.close_all()
+        self.assertTrue(idle.closed)
+        self.assertFalse(busy.closed)
+
+
+class ForkSafetyTests(SimpleTestCase):
+    alias = 'fork-safety-test'
+
+    def setUp(self):
+        self.addCleanup(pool_module._pools.pop, self.alias, None)
+
+    def create(self):
+        return ConnectionPool(factory=FakeFactory(), name=self.alias)
+
+    def test_same_process_reuses_pool(self):
+        self.assertIs(get_pool(self.alias, self.create), get_pool(self.alias, self.create))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), '需要 os.fork')
+    def test_forked_child_gets_new_pool_and_leaves_parent_connections_open(self):
+        parent_pool = get_pool(self.alias, self.create)
+        connection = parent_pool.acquire()
+        parent_pool.release(connection)
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # 子进程：拿到新池，父进程的连接既不复用也不关闭
+            try:
+                child_pool = get_pool(self.alias, self.create)
+                ok = (child_pool is not parent_pool and child_pool.acquire() is not connection
+                      and not connection.closed and pool_module.pool_stats()[self.alias]['created'] == 1)
+                os.write(write_fd, b'1' if ok else b'0')
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b'1')
+        self.assertIs(get_pool(self.alias, self.create), parent_pool)
+        self.assertFalse(connection.closed)
+        self.assertIs(parent_pool.acquire(), connection)
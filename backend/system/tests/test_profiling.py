@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from system import profiling
+from system.middleware import RequestProfilerMiddleware
+from users.models import User
+
+
+class RequestProfilerTests(TestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        config = override_settings(REQUEST_PROFILER={
+            'ENABLED': True, 'THRESHOLD_MS': 0, 'INTERVAL_MS': 1, 'DIRECTORY': directory,
+        })
+        config.enable()
+        self.addCleanup(config.disable)
+        for name in ('_sampler', '_store'):
+            patcher = mock.patch.object(profiling, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # 测试数据库的连接在开启分析之前就已建立
+        profiling.install_request_profiler(None, connection)
+        self.addCleanup(connection.execute_wrappers.remove, profiling.profile_sql)
+
+    def saved_profile(self):
+        store = profiling.get_profile_store()
+        summaries = store.list()
+        self.assertEqual(len(summaries), 1)
+        return store.get(summaries[0]['id'])
+
+    def test_sync_request_records_stacks_and_sql(self):
+        def view(request):
+            User.objects.count()
+            time.sleep(0.05)
+            return HttpResponse('ok')
+
+        RequestProfilerMiddleware(view)(self.factory.get('/api/orders/my/'))
+        record = self.saved_profile()
+        self.assertTrue(record['stack_sampled'])
+        self.assertIn('test_profiling:view', record['folded_stacks'])
+        self.assertEqual(record['query_count'], 1)
+        self.assertIn('users_user', record['queries'][0]['sql'])
+
+    def test_async_request_records_sql_without_stacks(self):
+        async def view(request):
+            await sync_to_async(User.objects.count)()
+            return HttpResponse('ok')
+
+        middleware = RequestProfilerMiddleware(view)
+        with mock.patch.object(middleware.sampler, 'register') as register:
+            async_to_sync(middleware)(self.factory.get('/api/orders/my/'))
+        register.assert_not_called()
+
+        record = self.saved_profile()
+        self.assertFalse(record['stack_sampled'])
+        self.assertEqual(record['folded_stacks'], '')
+        self.assertEqual(record['query_count'], 1)
+
+    def test_queries_outside_profiled_requests_are_not_recorded(self):
+        profile = profiling.RequestProfile()
+        token = profile.activate()
+        User.objects.exists()
+        profile.deactivate(token)
+        User.objects.exists()
+        self.assertEqual(len(profile.queries), 1)
+
+    def test_profile_store_is_shared(self):
+        self.assertIs(profiling.get_profile_store(), profiling.get_profile_store())
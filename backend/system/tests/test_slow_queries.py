@@ -0,0 +1,68 @@
+import tempfile
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from system import profiling
+from system.slow_queries import SlowQueryLog
+from system.sql import fingerprint_sql
+from users.models import User
+
+
+class ExplainTests(TestCase):
+
+    def setUp(self):
+        self.log = SlowQueryLog(threshold_ms=0, directory=tempfile.mkdtemp())
+
+    def test_explain_in_transaction_uses_savepoint(self):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                plan = self.log._explain(connection, 'SELECT missing_column FROM users_user', None)
+            self.assertTrue(plan.startswith('EXPLAIN 失败'))
+            executed = [query['sql'] for query in queries]
+            self.assertTrue(any(sql.startswith('SAVEPOINT') for sql in executed))
+            self.assertTrue(any(sql.startswith('ROLLBACK TO SAVEPOINT') for sql in executed))
+            # 调用方的事务照常可用
+            self.assertFalse(connection.needs_rollback)
+            User.objects.create_user('after-explain')
+        self.assertTrue(User.objects.filter(username='after-explain').exists())
+
+    def test_explain_returns_plan(self):
+        plan = self.log._explain(connection, 'SELECT id FROM users_user WHERE username = %s', ['x'])
+        self.assertIn('users_user', plan)
+
+
+class RecordTests(TestCase):
+
+    def setUp(self):
+        self.log = SlowQueryLog(threshold_ms=0, directory=tempfile.mkdtemp(), flush_interval=3600)
+
+    def test_plan_taken_when_first_occurrence_is_executemany(self):
+        sql = 'SELECT id FROM users_user WHERE username = %s'
+        self.log.record(connection, sql, [['a'], ['b']], True, 1.0)
+        entry = self.log._stats[fingerprint_sql(sql)]
+        self.assertIsNone(entry['plan'])
+
+        self.log.record(connection, sql, ['a'], False, 1.0)
+        self.assertIn('users_user', entry['plan'])
+        self.assertEqual(entry['count'], 2)
+
+    def test_plan_taken_once(self):
+        sql = 'SELECT id FROM users_user WHERE username = %s'
+        self.log.record(connection, sql, ['a'], False, 1.0)
+        with CaptureQueriesContext(connection) as queries:
+            self.log.record(connection, sql, ['b'], False, 1.0)
+        self.assertEqual(len(queries), 0)
+
+    def test_explain_not_recorded_in_request_profile(self):
+        profile = profiling.RequestProfile()
+        # 在事务中记录，EXPLAIN 会用保存点隔离
+        with transaction.atomic(), connection.execute_wrapper(profiling.profile_sql):
+            token = profile.activate()
+            try:
+                self.log.record(connection, 'SELECT id FROM users_user WHERE username = %s', ['a'], False, 1.0)
+            finally:
+                profiling.RequestProfile.deactivate(token)
+        # EXPLAIN、SAVEPOINT 和 RELEASE SAVEPOINT 都不记入请求
+        self.assertEqual(profile.queries, [])
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # 慢请求分析
+    path('profiles/', views.ProfileListView.as_view(), name='profile-list'),
+    path('profiles/<str:profile_id>/', views.ProfileDetailView.as_view(), name='profile-detail'),
+    path('profiles/<str:profile_id>/flamegraph/', views.ProfileFlamegraphView.as_view(), name='profile-flamegraph'),
+
+    # 数据库连接池
+    path('db-pool/', views.DatabasePoolView.as_view(), name='db-pool'),
+]
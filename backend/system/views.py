@@ -0,0 +1,59 @@
+import os
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.permissions import IsAdminUser
+from .db.pool import pool_stats
+from .profiling import get_profile_store
+
+
+class ProfileListView(APIView):
+    """慢请求分析记录列表 - 仅管理员"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_profile_store().list())
+
+
+class ProfileDetailView(APIView):
+    """慢请求分析记录详情（含 SQL 和调用栈）- 仅管理员"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        record = get_profile_store().get(profile_id)
+        if record is None:
+            return Response({
+                'error': '分析记录不存在'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response(record)
+
+
+class ProfileFlamegraphView(APIView):
+    """折叠栈文本，可直接交给 flamegraph.pl 或 speedscope - 仅管理员"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        record = get_profile_store().get(profile_id)
+        if record is None:
+            return HttpResponse("分析记录不存在。", status=status.HTTP_404_NOT_FOUND)
+
+        response = HttpResponse(record.get('folded_stacks', ''), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+        return response
+
+
+class DatabasePoolView(APIView):
+    """当前 worker 进程的数据库连接池指标 - 仅管理员
+
+    每个进程有独立的连接池，多 worker 部署时每次请求只反映处理它的那个进程。
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'pid': os.getpid(),
+            'pools': pool_stats(),
+        })
@@ -0,0 +1,105 @@
+"""worker 预热
+
+gunicorn 在 worker 加载完应用、开始接收请求之前调用 warm_up()（见 gunicorn.conf.py），
+把原本由第一个请求承担的一次性工作提前完成：
+
+- 编译全部 URL 正则，同时导入各视图模块（包括 simplejwt）
+- 构建各序列化器的字段，填充模型元数据缓存并触发 DRF 内部的延迟导入
+- 填充控制台统计缓存（已在共享缓存中时只读一次）
+- 建立数据库连接；使用连接池后端时把连接归还到池中，处理请求的线程直接借用
+
+每一步单独计时，失败只记日志，不影响 worker 启动。
+"""
+import logging
+import time
+
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def warm_urls():
+    """编译全部 URL 正则并建立反向解析表，返回路由数"""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    return sum(1 for _ in _patterns(resolver.url_patterns))
+
+
+def warm_serializers():
+    """构建项目中每个序列化器的字段，返回构建成功的序列化器数
+
+    在 warm_urls 之后调用：视图模块已导入，序列化器类都已定义。
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    count = 0
+    for serializer_class in set(_subclasses(BaseSerializer)):
+        if serializer_class.__module__.startswith('rest_framework.'):
+            continue
+        try:
+            serializer_class().fields
+            count += 1
+        except Exception as e:
+            logger.debug(f"预热序列化器 {serializer_class.__qualname__} 跳过: {str(e)}")
+    return count
+
+
+def warm_stats():
+    """填充控制台统计缓存"""
+    from orders.dashboard import dashboard_summary
+
+    dashboard_summary()
+
+
+def warm_database():
+    """连接每个数据库，返回连接成功的数据库别名"""
+    connected = []
+    for alias in connections:
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+        except Exception as e:
+            logger.warning(f"预热时连接数据库 {alias} 失败: {str(e)}")
+            continue
+        if getattr(connection, 'pool', None) is not None:
+            connection.close()
+        connected.append(alias)
+    return connected
+
+
+STEPS = (
+    ('urls', warm_urls),
+    ('serializers', warm_serializers),
+    ('database', warm_database),
+    ('stats', warm_stats),
+)
+
+
+def warm_up():
+    """依次执行全部预热步骤，返回 {步骤: {'ms': 耗时, 'result': 结果或 'error'}}"""
+    report = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            result = step()
+        except Exception as e:
+            logger.warning(f"预热步骤 {name} 失败: {str(e)}")
+            result = 'error'
+        report[name] = {'ms': round((time.perf_counter() - start) * 1000, 1), 'result': result}
+    logger.info(f"worker 预热完成: {report}")
+    return report
@@ -0,0 +1,88 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f"auth_user:{user_id}"
+
+
+def cached_user_fields():
+    """缓存除密码哈希外的全部字段，序列化当前用户时无需再查库"""
+    return [f.attname for f in User._meta.concrete_fields if f.attname != 'password']
+
+
+def invalidate_user_cache(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def get_cached_user(user_id):
+    """按用户ID取用户，优先读共享缓存；用户不存在时返回 None
+
+    返回的是真实的 User 实例（可直接用于外键赋值），只有 password 字段是延迟加载的。
+    缓存未命中时从主库读取：停用账户清除缓存后，不能从有复制延迟的副本把旧状态写回缓存。
+    """
+    key = user_cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values(*cached_user_fields()).first()
+        if values is None:
+            return None
+        cache.set(key, values, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300))
+    return User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT 认证，用户身份跨请求缓存
+
+    用户保存或删除时由 users.signals 清除缓存，停用账户会立即失去访问权限。
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != User._meta.pk.name:
+            # 需要比对密码哈希或按非主键字段查找时沿用原实现
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _session_user(request):
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+async def aauthenticate(request):
+    """异步视图使用的认证，与 REST_FRAMEWORK 默认认证顺序一致
+
+    先认证 JWT；没有令牌时只在安全方法下接受 session 登录（异步视图不做 CSRF 校验）。
+    返回已登录用户或 None，令牌无效或用户已停用时抛出 AuthenticationFailed。
+    """
+    result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    if result is not None:
+        return result[0]
+    if request.method in SAFE_METHODS:
+        return await sync_to_async(_session_user)(request)
+    return None
@@ -0,0 +1,99 @@
+import atexit
+import logging
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from .authentication import user_cache_key
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def get_client_ip(request):
+    """客户端IP，与登录限流的取法相同
+
+    按 REST_FRAMEWORK['NUM_PROXIES'] 取 X-Forwarded-For 中可信代理追加的地址；
+    第一项是客户端自己填写的，可以任意伪造，不能作为最后登录IP。
+    """
+    return BaseThrottle().get_ident(request)
+
+
+class LoginRecorder:
+    """登录记录（最后登录时间和IP）的延迟批量写入
+
+    登录请求只把记录放进内存，由后台线程按间隔合并成一条 bulk_update，
+    同一用户在一个间隔内多次登录只写最后一次。
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, user_id, ip):
+        with self._lock:
+            self._pending[user_id] = (timezone.now(), ip)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='login-recorder', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 攒够一个间隔再写，让换班时的登录高峰合并成少量 UPDATE
+            threading.Event().wait(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"写入登录记录失败: {str(e)}")
+            finally:
+                # 后台线程的数据库连接不归请求周期管理，用完即关
+                connections.close_all()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        users = [
+            User(pk=user_id, last_login=last_login, last_login_ip=ip)
+            for user_id, (last_login, ip) in pending.items()
+        ]
+        with transaction.atomic():
+            User.objects.bulk_update(users, ['last_login', 'last_login_ip'])
+            # bulk_update 不触发 post_save，需要手动让认证缓存失效；提交后再清除，
+            # 避免并发请求在提交前把旧记录重新缓存
+            keys = [user_cache_key(user_id) for user_id in pending]
+            transaction.on_commit(partial(cache.delete_many, keys))
+        return len(users)
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_login_recorder():
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = LoginRecorder(getattr(settings, 'LOGIN_RECORD_FLUSH_INTERVAL', 5))
+            atexit.register(_recorder.flush)
+        return _recorder
+
+
+def record_login(user, request):
+    """记录一次成功登录，不在请求线程中写库"""
+    get_login_recorder().record(user.pk, get_client_ip(request))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='department',
+            field=models.CharField(blank=True, db_index=True, max_length=50, verbose_name='部门'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='full_name',
+            field=models.CharField(blank=True, db_index=True, max_length=100, verbose_name='姓名'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'is_active', '-created_at'], name='user_role_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+        ),
+    ]
@@ -1,49 +1,62 @@
-from rest_framework import permissions
-
-
-class IsAdminUser(permissions.BasePermission):
-    """只有管理员可以访问"""
-    def has_permission(self, request, view):
-        return (request.user and 
-                request.user.is_authenticated and 
-                request.user.role == 'admin')
-
-
-class IsAdminOrReviewer(permissions.BasePermission):
-    """管理员或审核员权限"""
-    def has_permission(self, request, view):
-        return (request.user.is_authenticated and 
-                request.user.role in ['admin', 'reviewer'])
-
-
-class IsOrderClerk(permissions.BasePermission):
-    """下单员权限"""
-    def has_permission(self, request, view):
-        return (request.user.is_authenticated and 
-                request.user.role in ['admin', 'order_clerk'])
-
-
-class IsTechnician(permissions.BasePermission):
-    """技术员权限"""
-    def has_permission(self, request, view):
-        return (request.user.is_authenticated and 
-                request.user.role in ['admin', 'technician'])
-    
-class IsWarehouseClerk(permissions.BasePermission):
-    """仓库员权限"""
-    def has_permission(self, request, view):
-        return (request.user.is_authenticated and 
-                request.user.role in ['admin', 'warehouse_clerk'])
-
-
-class CanViewOwnOrders(permissions.BasePermission):
-    """可以查看自己的订单"""
-    def has_permission(self, request, view):
-        return request.user.is_authenticated
-
-
-class CanDownloadOrderFiles(permissions.BasePermission):
-    """可以下载订单文件"""
-    def has_permission(self, request, view):
-        return (request.user.is_authenticated and 
-                request.user.role in ['admin', 'technician', 'reviewer', 'order_clerk', 'warehouse_clerk', 'workshop_tracker'])
\ No newline at end of file
+from functools import lru_cache, wraps
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+
+from .roles import permission_mask, role_has_permission, roles_with_permission
+
+
+@lru_cache(maxsize=None)
+def permission_required(*names, message='您没有权限执行此操作'):
+    """权限类工厂：拥有 names 中任一权限的已登录用户可以访问
+
+    每组权限只生成一个类，鉴权时只做一次位掩码与运算。
+    """
+    mask = permission_mask(*names)
+
+    class RolePermission(permissions.BasePermission):
+        required_mask = mask
+
+        def has_permission(self, request, view):
+            user = request.user
+            return bool(user and user.is_authenticated and role_has_permission(user.role, mask))
+
+    RolePermission.message = message
+    RolePermission.__name__ = RolePermission.__qualname__ = f"HasPermission_{'_or_'.join(names)}"
+    RolePermission.__doc__ = f"需要权限: {', '.join(names)}"
+    return RolePermission
+
+
+def role_required(*names, message='您没有权限执行此操作'):
+    """视图装饰器：函数视图和视图方法都可使用，无权限时返回前端约定的 error/detail 格式"""
+    mask = permission_mask(*names)
+    required_roles = ' 或 '.join(roles_with_permission(mask))
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(*args, **kwargs):
+            # 函数视图第一个参数是 request，视图方法第二个参数是 request
+            request = args[0] if hasattr(args[0], 'user') else args[1]
+            user = request.user
+            if not (user and user.is_authenticated):
+                return Response({
+                    'error': '请先登录'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            if not role_has_permission(user.role, mask):
+                return Response({
+                    'error': message,
+                    'detail': f'当前角色: {user.role}, 需要角色: {required_roles}'
+                }, status=status.HTTP_403_FORBIDDEN)
+            return view_func(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+# 常用权限类
+IsAdminUser = permission_required('manage_users', message='只有管理员可以执行此操作')
+IsAdminOrReviewer = permission_required('review_orders', message='需要管理员或审核员权限')
+IsOrderClerk = permission_required('create_order', message='需要管理员或下单员权限')
+IsTechnician = permission_required('upload_production_sheets', message='需要管理员或技术员权限')
+IsWarehouseClerk = permission_required('manage_inventory', message='需要管理员或出入库员权限')
+CanViewOwnOrders = permission_required('view_orders', message='请先登录')
+CanDownloadOrderFiles = permission_required('download_order_files', message='您没有权限下载订单文件')
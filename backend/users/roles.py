@@ -0,0 +1,94 @@
+"""角色与权限注册表
+
+所有角色判断都以这里为准：User.has_permission、权限类工厂、视图装饰器
+和登录返回的权限标记。启动时编译为每个角色一个位掩码，鉴权只需一次整数与运算。
+新增角色只需修改本文件。
+"""
+
+ADMIN_ROLE = 'admin'
+
+ROLES = (
+    # (角色, 显示名称, 图标)
+    ('admin', '管理员', 'bi-shield-fill-check'),
+    ('order_clerk', '下单员', 'bi-plus-circle'),
+    ('reviewer', '审核员', 'bi-clipboard-check'),
+    ('technician', '技术员', 'bi-wrench-adjustable'),
+    ('warehouse_clerk', '出入库员', 'bi-box-seam'),
+    ('workshop_tracker', '车间跟单员', 'bi-gear'),
+)
+
+ROLE_CHOICES = tuple((role, label) for role, label, _ in ROLES)
+ROLE_ICONS = {role: icon for role, _, icon in ROLES}
+
+_ALL_ROLES = tuple(role for role, _, _ in ROLES if role != ADMIN_ROLE)
+
+# 权限 -> 拥有该权限的角色；管理员拥有全部权限，不必列出
+PERMISSIONS = {
+    # 订单查看
+    'view_orders': _ALL_ROLES,
+    'view_own_orders': ('order_clerk',),
+    'view_all_orders': ('reviewer',),
+    'view_approved_orders': ('technician', 'warehouse_clerk', 'workshop_tracker'),
+    'download_order_files': _ALL_ROLES,
+    # 下单
+    'create_order': ('order_clerk',),
+    'edit_rejected_orders': ('order_clerk',),
+    # 审核
+    'review_orders': ('reviewer',),
+    'approve_orders': ('reviewer',),
+    'reject_orders': ('reviewer',),
+    # 技术
+    'upload_production_sheets': ('technician',),
+    'update_production_status': ('technician',),
+    'view_ready_for_production': ('technician', 'warehouse_clerk'),
+    # 出入库
+    'start_production': ('warehouse_clerk',),
+    'manage_inventory': ('warehouse_clerk',),
+    'mark_shipped': ('warehouse_clerk',),
+    # 车间跟单
+    'track_production': ('workshop_tracker',),
+    'update_progress': ('workshop_tracker',),
+    # 管理
+    'access_admin': ('reviewer',),
+    'manage_users': (),
+    'delete_orders': (),
+    'export_orders': ('reviewer',),
+}
+
+
+def _compile():
+    roles = {role for role, _, _ in ROLES}
+    bits = {}
+    masks = dict.fromkeys(roles, 0)
+    for index, (permission, granted) in enumerate(PERMISSIONS.items()):
+        bits[permission] = 1 << index
+        for role in granted:
+            if role not in roles:
+                raise ValueError(f"权限 {permission} 引用了未定义的角色 {role}")
+            masks[role] |= bits[permission]
+    masks[ADMIN_ROLE] = (1 << len(PERMISSIONS)) - 1
+    return bits, masks
+
+
+PERMISSION_BITS, ROLE_MASKS = _compile()
+
+
+def permission_mask(*permissions):
+    """多个权限合并成一个掩码；未注册的权限名直接报错，避免拼写错误被静默放过"""
+    mask = 0
+    for permission in permissions:
+        try:
+            mask |= PERMISSION_BITS[permission]
+        except KeyError:
+            raise ValueError(f"未注册的权限: {permission}")
+    return mask
+
+
+def role_has_permission(role, mask):
+    """角色是否拥有掩码中的任一权限"""
+    return bool(ROLE_MASKS.get(role, 0) & mask)
+
+
+def roles_with_permission(mask):
+    """拥有掩码中任一权限的角色，用于错误提示"""
+    return [role for role, _, _ in ROLES if ROLE_MASKS[role] & mask]
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .login_tracking import record_login
+
 User = get_user_model()
 
 
@@ -91,19 +93,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                 'can_create_order': self.user.has_permission('create_order'),
                 'can_review_order': self.user.has_permission('review_orders'),
                 'can_access_admin': self.user.can_access_admin(),
-                'can_manage_users': self.user.role == 'admin',
+                'can_manage_users': self.user.has_permission('manage_users'),
             }
         }
         
-        # 记录登录IP
+        # 记录登录时间和IP（后台批量写入，不阻塞登录请求）
         request = self.context.get('request')
         if request:
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip = x_forwarded_for.split(',')[0]
-            else:
-                ip = request.META.get('REMOTE_ADDR')
-            self.user.last_login_ip = ip
-            self.user.save(update_fields=['last_login_ip'])
+            record_login(self.user, request)
         
         return data
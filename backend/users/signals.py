@@ -0,0 +1,22 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, dispatch_uid='users.invalidate_user_cache_on_save')
+@receiver(post_delete, sender=User, dispatch_uid='users.invalidate_user_cache_on_delete')
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    """用户信息、角色、激活状态或密码变化后清除认证缓存
+
+    在事务提交后清除：提交前清除的话，并发请求会把尚未提交的旧数据重新写入缓存并保留到过期。
+    不在事务中时立即清除。
+    """
+    # 认证模块会导入 simplejwt（连带 pkg_resources），推迟到第一次需要时再加载
+    from .authentication import invalidate_user_cache
+
+    transaction.on_commit(partial(invalidate_user_cache, instance.pk), using=using)
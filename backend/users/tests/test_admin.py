@@ -0,0 +1,49 @@
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+
+
+class UserAdminSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('root', 'secret')
+        User.objects.create_user('zhangsan', 'secret', full_name='张三')
+        User.objects.create_user('zhangwei', 'secret', full_name='张伟')
+        User.objects.create_user('lisi', 'secret', full_name='李四')
+
+    def search(self, term):
+        model_admin = site._registry[User]
+        request = RequestFactory().get('/admin/users/user/', {'q': term})
+        request.user = self.admin_user
+        queryset, may_have_duplicates = model_admin.get_search_results(request, User.objects.all(), term)
+        self.assertFalse(may_have_duplicates)
+        return set(queryset.values_list('username', flat=True))
+
+    def test_prefix_matches_username_or_full_name(self):
+        self.assertEqual(self.search('zhang'), {'zhangsan', 'zhangwei'})
+        self.assertEqual(self.search('张'), {'zhangsan', 'zhangwei'})
+        self.assertEqual(self.search(' 李四 '), {'lisi'})
+        self.assertEqual(self.search('san'), set())
+
+    def test_empty_term_returns_everything(self):
+        self.assertEqual(len(self.search('')), 4)
+
+    def test_search_uses_range_not_like(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search('zhang')
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('LIKE', sql.upper())
+        self.assertNotIn('UPPER(', sql.upper())
+
+    def test_autocomplete_uses_prefix_search(self):
+        self.client.force_login(self.admin_user)
+        response = self.client.get('/admin/autocomplete/', {
+            'term': '张', 'app_label': 'system', 'model_name': 'systemlog', 'field_name': 'user',
+        })
+        self.assertEqual(response.status_code, 200)
+        expected = {str(pk) for pk in User.objects.filter(full_name__startswith='张').values_list('pk', flat=True)}
+        self.assertEqual({item['id'] for item in response.json()['results']}, expected)
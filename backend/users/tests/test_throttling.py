@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from system.checks import check_shared_cache_is_atomic
+from users.login_tracking import get_client_ip
+from users.throttling import LoginIPThrottle, LoginUsernameThrottle
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttling-tests'}}
+
+LOGIN_THROTTLE = {
+    'ip': {'CAPACITY': 60, 'REFILL_PER_MINUTE': 60},
+    # 测试期间基本不回填
+    'username': {'CAPACITY': 5, 'REFILL_PER_MINUTE': 0.001},
+}
+
+
+class SlowCache:
+    """读取后停顿一下，模拟网络缓存的往返，让并发请求的读改写交错"""
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+    def get(self, *args, **kwargs):
+        value = cache.get(*args, **kwargs)
+        time.sleep(0.002)
+        return value
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOGIN_THROTTLE=LOGIN_THROTTLE)
+class TokenBucketThrottleTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def login_request(self, username='worker', **extra):
+        request = self.factory.post('/api/users/login/', {'username': username}, format='json', **extra)
+        # 限流读取的是 DRF Request.data
+        request.data = {'username': username}
+        return request
+
+    def test_parallel_requests_never_exceed_capacity(self):
+        workers = 40
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def attempt():
+            request = self.login_request()
+            throttle = LoginUsernameThrottle()
+            barrier.wait()
+            results.append(throttle.allow_request(request, None))
+
+        threads = [threading.Thread(target=attempt) for _ in range(workers)]
+        with mock.patch('users.throttling.cache', SlowCache()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(results), workers)
+        self.assertEqual(results.count(True), 5)
+
+    def test_rejected_request_reports_wait(self):
+        throttle = LoginUsernameThrottle()
+        for _ in range(5):
+            self.assertTrue(throttle.allow_request(self.login_request(), None))
+        self.assertFalse(throttle.allow_request(self.login_request(), None))
+        self.assertGreater(throttle.wait(), 0)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_spoofed_forwarded_for_shares_proxy_bucket(self):
+        throttle = LoginIPThrottle()
+        keys = {
+            throttle.get_cache_key(self.login_request(
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 203.0.113.7', REMOTE_ADDR='10.1.1.1'), None)
+            for i in range(10)
+        }
+        self.assertEqual(keys, {'throttle:login:ip:203.0.113.7'})
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 0})
+    def test_forwarded_for_ignored_without_proxies(self):
+        throttle = LoginIPThrottle()
+        key = throttle.get_cache_key(self.login_request(
+            HTTP_X_FORWARDED_FOR='198.51.100.1', REMOTE_ADDR='203.0.113.7'), None)
+        self.assertEqual(key, 'throttle:login:ip:203.0.113.7')
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_login_ip_uses_proxy_appended_address(self):
+        request = self.login_request(HTTP_X_FORWARDED_FOR='10.0.0.1, 203.0.113.7', REMOTE_ADDR='10.1.1.1')
+        self.assertEqual(get_client_ip(request), '203.0.113.7')
+
+    def test_zero_refill_rate_is_rejected(self):
+        throttle = {**LOGIN_THROTTLE, 'username': {'CAPACITY': 5, 'REFILL_PER_MINUTE': 0}}
+        with override_settings(LOGIN_THROTTLE=throttle), self.assertRaises(ImproperlyConfigured):
+            LoginUsernameThrottle()
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    @override_settings(WEB_CONCURRENCY=2, CACHES=LOCMEM_CACHE)
+    def test_multiple_workers_need_atomic_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache_is_atomic(None)], ['system.E001'])
+
+    @override_settings(WEB_CONCURRENCY=2, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/0',
+    }})
+    def test_redis_cache_passes(self):
+        self.assertEqual(check_shared_cache_is_atomic(None), [])
+
+    @override_settings(WEB_CONCURRENCY=1, CACHES=LOCMEM_CACHE)
+    def test_single_worker_passes(self):
+        self.assertEqual(check_shared_cache_is_atomic(None), [])
@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from orders.dashboard import user_counts
+from users.authentication import get_cached_user, user_cache_key
+from users.login_tracking import LoginRecorder
+from users.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'user-cache-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class UserCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('worker', 'secret')
+
+    def test_invalidated_after_commit_not_before(self):
+        get_cached_user(self.user.pk)
+        user_counts()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            # 事务提交前缓存不动，并发请求不会把旧数据重新写进缓存
+            self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertTrue(callbacks)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertFalse(get_cached_user(self.user.pk).is_active)
+        self.assertEqual(user_counts()['inactive'], 1)
+
+    def test_login_flush_invalidates_after_commit(self):
+        get_cached_user(self.user.pk)
+        recorder = LoginRecorder(interval=0)
+        recorder._pending[self.user.pk] = (self.user.created_at, '203.0.113.7')
+        with self.captureOnCommitCallbacks(execute=True):
+            recorder.flush()
+            self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(get_cached_user(self.user.pk).last_login_ip, '203.0.113.7')
@@ -0,0 +1,104 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_LOGIN_THROTTLE = {
+    # 同一出口IP（车间终端通常共用一个）：允许换班时的集中登录
+    'ip': {'CAPACITY': 60, 'REFILL_PER_MINUTE': 60},
+    # 同一用户名：限制暴力破解
+    'username': {'CAPACITY': 5, 'REFILL_PER_MINUTE': 5},
+}
+
+
+class LoginThrottled(Throttled):
+    default_detail = '登录尝试过于频繁，请稍后再试。'
+    extra_detail_singular = extra_detail_plural = '请在 {wait} 秒后重试。'
+
+
+# 读改写桶状态期间持有的锁：最长持有时间（秒），worker 中途退出时到期自动释放
+LOCK_TIMEOUT = 2
+# 等锁的最长时间和重试间隔（秒），等不到时按被限流处理
+LOCK_WAIT = 1
+LOCK_RETRY_INTERVAL = 0.005
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """令牌桶限流，桶状态存放在共享缓存中，多个 worker 共用
+
+    在视图处理前执行，被拒绝的请求不会进入密码哈希。桶状态的读改写用 cache.add
+    加锁，并发请求不会读到同一个令牌数而超出容量。Redis 的 add 是原子的；
+    文件缓存的 add 不能跨进程互斥，多 worker 部署必须配置 REDIS_URL（见 system.checks）。
+    """
+    scope = None
+
+    def __init__(self):
+        config = getattr(settings, 'LOGIN_THROTTLE', DEFAULT_LOGIN_THROTTLE)[self.scope]
+        if config['CAPACITY'] < 1 or config['REFILL_PER_MINUTE'] <= 0:
+            raise ImproperlyConfigured(
+                f"LOGIN_THROTTLE['{self.scope}'] 的 CAPACITY 应不小于 1，REFILL_PER_MINUTE 应大于 0"
+            )
+        self.capacity = config['CAPACITY']
+        self.refill_rate = config['REFILL_PER_MINUTE'] / 60
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + LOCK_WAIT
+        while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                # 同一个桶上的并发请求太多，不放行
+                self.wait_seconds = LOCK_WAIT
+                return False
+            time.sleep(LOCK_RETRY_INTERVAL)
+        try:
+            return self._take(key)
+        finally:
+            cache.delete(lock_key)
+
+    def _take(self, key):
+        """取一个令牌，调用方持有该桶的锁"""
+        now = time.time()
+        tokens, updated_at = cache.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / self.refill_rate
+            return False
+
+        # 桶完全回满后记录即可过期
+        cache.set(key, (tokens - 1, now), math.ceil(self.capacity / self.refill_rate))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'ip'
+
+    def get_cache_key(self, request, view):
+        # get_ident 按 REST_FRAMEWORK['NUM_PROXIES'] 取 X-Forwarded-For 中可信代理追加的地址，
+        # 客户端自己填写的部分不会换出新的桶
+        return f"throttle:login:ip:{self.get_ident(request)}"
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    scope = 'username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not username:
+            return None
+        return f"throttle:login:user:{str(username).strip().lower()}"
@@ -2,20 +2,27 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
 
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
     PasswordChangeSerializer, CustomTokenObtainPairSerializer
 )
 from .permissions import IsAdminUser
+from .throttling import LoginIPThrottle, LoginThrottled, LoginUsernameThrottle
 
 User = get_user_model()
 
 
 class LoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
+    
+    def throttled(self, request, wait):
+        raise LoginThrottled(wait)
 
 
 class UserView(APIView):
@@ -27,9 +34,21 @@ class UserView(APIView):
         return Response(serializer.data)
 
 
+class UserCursorPagination(CursorPagination):
+    """用户目录游标分页：翻页不做 COUNT，也不随页数变慢"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
 class UserListCreateView(generics.ListCreateAPIView):
-    """管理员查看和创建用户"""
+    """管理员查看和创建用户
+
+    支持 role、department、is_active 筛选和 search（用户名或姓名前缀）。
+    """
     permission_classes = [IsAdminUser]
+    pagination_class = UserCursorPagination
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -37,28 +56,30 @@ class UserListCreateView(generics.ListCreateAPIView):
         return UserSerializer
     
     def get_queryset(self):
-        return User.objects.all().order_by('-created_at')
+        queryset = User.objects.all()
+        params = self.request.query_params
+        
+        if params.get('role'):
+            queryset = queryset.filter(role=params['role'])
+        if params.get('department'):
+            queryset = queryset.filter(department=params['department'])
+        is_active = params.get('is_active', '').lower()
+        if is_active in ('true', '1'):
+            queryset = queryset.filter(is_active=True)
+        elif is_active in ('false', '0'):
+            queryset = queryset.filter(is_active=False)
+        
+        # 前缀匹配（LIKE 'xxx%'）可以走 username/full_name 上的索引
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(Q(username__startswith=search) | Q(full_name__startswith=search))
+        return queryset
     
     def list(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if request.user.role != 'admin':
-                return Response({
-                    'error': '您没有权限查看用户列表',
-                    'detail': f'当前角色: {request.user.role}, 需要角色: admin'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            
-            print(f"用户列表查询成功，共 {queryset.count()} 个用户")
-            
-            return Response(serializer.data)
+            page = self.paginate_queryset(self.get_queryset())
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
         except Exception as e:
             import traceback
@@ -70,17 +91,6 @@ class UserListCreateView(generics.ListCreateAPIView):
     
     def create(self, request, *args, **kwargs):
         try:
-            # 检查权限
-            if not request.user.is_authenticated:
-                return Response({
-                    'error': '请先登录'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if request.user.role != 'admin':
-                return Response({
-                    'error': '您没有权限创建用户'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
             serializer = self.get_serializer(data=request.data)
             if not serializer.is_valid():
                 return Response({
@@ -170,7 +180,7 @@ class PasswordChangeView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            user.save(update_fields=['password'])
             
             return Response({
                 'message': '密码修改成功'
@@ -214,25 +224,13 @@ class ResetPasswordView(APIView):
 def user_stats(request):
     """获取用户统计数据"""
     try:
-        total_users = User.objects.count()
-        admin_users = User.objects.filter(role='admin').count()
-        reviewer_users = User.objects.filter(role='reviewer').count()
-        order_clerk_users = User.objects.filter(role='order_clerk').count()
-        technician_users = User.objects.filter(role='technician').count()
-        warehouse_clerk_users = User.objects.filter(role='warehouse_clerk').count()
-        workshop_tracker_users = User.objects.filter(role='workshop_tracker').count()
-        active_users = User.objects.filter(is_active=True).count()
-        
-        stats = {
-            'total_users': total_users,
-            'admin_users': admin_users,
-            'reviewer_users': reviewer_users,
-            'order_clerk_users': order_clerk_users,
-            'technician_users': technician_users,
-            'warehouse_clerk_users': warehouse_clerk_users,
-            'workshop_tracker_users': workshop_tracker_users,
-            'active_users': active_users,
-        }
+        # 一条条件聚合代替逐个角色 COUNT
+        counts = {f"{role}_users": Count('pk', filter=Q(role=role)) for role, _ in User.ROLE_CHOICES}
+        stats = User.objects.aggregate(
+            total_users=Count('pk'),
+            active_users=Count('pk', filter=Q(is_active=True)),
+            **counts,
+        )
         
         return Response(stats, status=status.HTTP_200_OK)
         
@@ -3,6 +3,22 @@ import { Link, useHistory } from 'react-router-dom';
 import { AuthContext } from '../../context/AuthContext';
 import api from '../../utils/api';
 
+const QUEUE_LABELS = [
+  ['pending', '待审核'],
+  ['approved', '已批准'],
+  ['ready_for_production', '待生产'],
+  ['in_production', '生产中'],
+  ['in_warehouse', '已入库'],
+];
+
+const THROUGHPUT_LABELS = [
+  ['created', '新建订单'],
+  ['reviewed', '审核'],
+  ['production_started', '开始生产'],
+  ['inbound', '入库'],
+  ['outbound', '出库'],
+];
+
 const AdminDashboard = () => {
   const { user } = useContext(AuthContext);
   const history = useHistory();
@@ -16,6 +32,8 @@ const AdminDashboard = () => {
     total_users: 0,
     last_updated: null
   });
+  const [queues, setQueues] = useState({});
+  const [throughput, setThroughput] = useState({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -35,21 +53,24 @@ const AdminDashboard = () => {
       
       console.log('开始获取统计数据...', user);
       
-      // 所有登录用户都可以查看统计数据
-      const res = await api.get('/api/orders/admin/stats/');
-      console.log('统计API响应:', res.data);
+      // 控制台所需数据一次请求返回
+      const res = await api.get('/api/orders/admin/summary/');
+      console.log('控制台汇总API响应:', res.data);
       
       if (res.data) {
+        const byStatus = res.data.orders?.by_status || {};
         setStats({
-          total_orders: res.data.total_orders || 0,
-          pending_orders: res.data.pending_orders || 0,
-          approved_orders: res.data.approved_orders || 0,
-          rejected_orders: res.data.rejected_orders || 0,
-          in_production_orders: res.data.in_production_orders || 0, // 新增
-          completed_orders: res.data.completed_orders || 0,
-          total_users: res.data.total_users || 0,
+          total_orders: res.data.orders?.total || 0,
+          pending_orders: byStatus.pending || 0,
+          approved_orders: byStatus.approved || 0,
+          rejected_orders: byStatus.rejected || 0,
+          in_production_orders: byStatus.in_production || 0,
+          completed_orders: byStatus.completed || 0,
+          total_users: res.data.users?.total || 0,
           last_updated: res.data.last_updated || new Date().toISOString()
         });
+        setQueues(res.data.queues || {});
+        setThroughput(res.data.throughput || {});
       }
       
     } catch (err) {
@@ -372,6 +393,54 @@ const AdminDashboard = () => {
         </div>
       </div>
 
+      {/* 今日吞吐和各队列最新订单 */}
+      <div className="row mb-4">
+        <div className="col-md-4">
+          <div className="card h-100">
+            <div className="card-header bg-light">
+              <h5 className="card-title mb-0">
+                <i className="bi bi-activity me-2"></i>
+                今日吞吐
+              </h5>
+            </div>
+            <ul className="list-group list-group-flush">
+              {THROUGHPUT_LABELS.map(([key, label]) => (
+                <li key={key} className="list-group-item d-flex justify-content-between">
+                  <span>{label}</span>
+                  <span className="badge bg-primary">{throughput[key] || 0}</span>
+                </li>
+              ))}
+            </ul>
+          </div>
+        </div>
+        <div className="col-md-8">
+          <div className="card h-100">
+            <div className="card-header bg-light">
+              <h5 className="card-title mb-0">
+                <i className="bi bi-inbox me-2"></i>
+                各队列最新订单
+              </h5>
+            </div>
+            <div className="card-body p-0">
+              <table className="table table-sm mb-0">
+                <tbody>
+                  {QUEUE_LABELS.map(([key, label]) => (queues[key] || []).map((order, index) => (
+                    <tr key={order.id}>
+                      {index === 0 && (
+                        <th rowSpan={queues[key].length} className="text-nowrap align-middle">{label}</th>
+                      )}
+                      <td><Link to={`/orders/${order.id}`}>{order.order_number}</Link></td>
+                      <td>{order.project_name}</td>
+                      <td className="text-muted small">{order.user}</td>
+                    </tr>
+                  )))}
+                </tbody>
+              </table>
+            </div>
+          </div>
+        </div>
+      </div>
+
       {/* 使用说明 */}
       <div className="row">
         <div className="col">
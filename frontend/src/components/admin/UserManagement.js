@@ -5,6 +5,15 @@ import api from '../../utils/api';
 const UserManagement = () => {
   const { user } = useContext(AuthContext);
   const [users, setUsers] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [hasLoaded, setHasLoaded] = useState(false);
+  const [filters, setFilters] = useState({
+    search: '',
+    role: '',
+    department: '',
+    is_active: ''
+  });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showCreateModal, setShowCreateModal] = useState(false);
@@ -31,8 +40,10 @@ const UserManagement = () => {
   ];
 
   useEffect(() => {
-    fetchUsers();
-  }, []);
+    // 输入搜索词时稍作延迟，避免每个字符都请求一次
+    const timer = setTimeout(fetchUsers, filters.search ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [filters]);
 
   const fetchUsers = async () => {
     try {
@@ -51,15 +62,19 @@ const UserManagement = () => {
         throw new Error('您没有管理员权限');
       }
       
-      const response = await api.get('/api/users/admin/users/');
+      // 只把有值的筛选条件带给后端
+      const params = Object.fromEntries(
+        Object.entries(filters).filter(([, value]) => value !== '')
+      );
+      const response = await api.get('/api/users/admin/users/', { params });
       
       console.log('用户列表响应:', response.data);
       console.log('响应状态:', response.status);
       console.log('响应头:', response.headers);
       
-      // 确保响应数据是数组
-      const userData = Array.isArray(response.data) ? response.data : [];
-      setUsers(userData);
+      setUsers(response.data.results || []);
+      setNextPage(response.data.next);
+      setHasLoaded(true);
       setLoading(false);
       
     } catch (err) {
@@ -92,6 +107,25 @@ const UserManagement = () => {
     }
   };
 
+  const loadMoreUsers = async () => {
+    if (!nextPage) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get(nextPage);
+      setUsers(prev => [...prev, ...(response.data.results || [])]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      setError(err.response?.data?.error || '加载更多用户失败');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const handleFilterChange = (e) => {
+    const { name, value } = e.target;
+    setFilters(prev => ({ ...prev, [name]: value }));
+  };
+
   const handleCreateUser = async (e) => {
     e.preventDefault();
     
@@ -222,7 +256,8 @@ const UserManagement = () => {
     );
   };
 
-  if (loading) {
+  // 只有首次加载显示整页加载动画，筛选时保留输入框
+  if (loading && !hasLoaded) {
     return (
       <div className="container mt-5">
         <div className="d-flex justify-content-center">
@@ -263,10 +298,48 @@ const UserManagement = () => {
         <div className="card-header">
           <h5 className="card-title mb-0">
             <i className="bi bi-people me-2"></i>
-            用户列表 ({users.length})
+            用户列表 ({users.length}{nextPage ? '+' : ''})
           </h5>
         </div>
         <div className="card-body">
+          <div className="row g-2 mb-3">
+            <div className="col-md-4">
+              <input
+                type="text"
+                className="form-control"
+                name="search"
+                placeholder="按用户名或姓名开头搜索"
+                value={filters.search}
+                onChange={handleFilterChange}
+              />
+            </div>
+            <div className="col-md-3">
+              <select className="form-select" name="role" value={filters.role} onChange={handleFilterChange}>
+                <option value="">全部角色</option>
+                <option value="admin">管理员</option>
+                {roleOptions.map(role => (
+                  <option key={role.value} value={role.value}>{role.label}</option>
+                ))}
+              </select>
+            </div>
+            <div className="col-md-3">
+              <input
+                type="text"
+                className="form-control"
+                name="department"
+                placeholder="部门"
+                value={filters.department}
+                onChange={handleFilterChange}
+              />
+            </div>
+            <div className="col-md-2">
+              <select className="form-select" name="is_active" value={filters.is_active} onChange={handleFilterChange}>
+                <option value="">全部状态</option>
+                <option value="true">激活</option>
+                <option value="false">禁用</option>
+              </select>
+            </div>
+          </div>
           {users.length === 0 ? (
             <div className="text-center text-muted py-5">
               <i className="bi bi-people" style={{fontSize: '3rem'}}></i>
@@ -335,6 +408,13 @@ const UserManagement = () => {
                   ))}
                 </tbody>
               </table>
+              {nextPage && (
+                <div className="text-center">
+                  <button className="btn btn-outline-secondary btn-sm" onClick={loadMoreUsers} disabled={loadingMore}>
+                    {loadingMore ? '加载中...' : '加载更多'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
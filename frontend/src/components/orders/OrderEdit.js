@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useHistory, Link } from 'react-router-dom';
 import api from '../../utils/api';
+import { appendUpload } from '../../utils/fileTransfer';
 
 const OrderEdit = () => {
   const { id } = useParams();
@@ -75,7 +76,7 @@ const OrderEdit = () => {
       
       // 只有在选择了新文件时才添加文件
       if (orderFile) {
-        submitData.append('order_file', orderFile);
+        await appendUpload(submitData, 'order_file', orderFile, id);
       }
 
       // 调用重新提交API
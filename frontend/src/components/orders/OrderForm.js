@@ -2,6 +2,7 @@ import React, { useState, useContext } from 'react';
 import { useHistory } from 'react-router-dom';
 import { AuthContext } from '../../context/AuthContext';
 import api from '../../utils/api';
+import { appendUpload } from '../../utils/fileTransfer';
 
 const OrderForm = () => {
   const { user } = useContext(AuthContext);
@@ -56,7 +57,7 @@ const OrderForm = () => {
       const submitData = new FormData();
       submitData.append('project_name', formData.project_name.trim());
       submitData.append('ordered_by', formData.ordered_by.trim());
-      submitData.append('order_file', orderFile);
+      await appendUpload(submitData, 'order_file', orderFile);
 
       console.log('提交数据:', {
         project_name: formData.project_name,
@@ -16,6 +16,8 @@ const OrderList = () => {
   const [searchType, setSearchType] = useState('all');
   const [statusFilter, setStatusFilter] = useState('all');
   const [dateRange, setDateRange] = useState({ start: '', end: '' });
+  // 服务端搜索结果（包含已归档订单），未输入关键字时为 null
+  const [searchResults, setSearchResults] = useState(null);
   
   // 批量操作
   const [selectedOrders, setSelectedOrders] = useState([]);
@@ -29,9 +31,31 @@ const OrderList = () => {
     fetchOrdersFromAPI();
   }, []);
   
+  useEffect(() => {
+    const term = searchTerm.trim();
+    if (!term) {
+      setSearchResults(null);
+      return undefined;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const params = { q: term };
+        if (searchType !== 'all') {
+          params.field = searchType;
+        }
+        const res = await api.get('/api/orders/search/', { params });
+        setSearchResults(res.data.results || []);
+      } catch (err) {
+        console.error('搜索订单失败:', err);
+        setSearchResults(null);
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm, searchType]);
+  
   useEffect(() => {
     filterOrders();
-  }, [orders, searchTerm, searchType, statusFilter, dateRange]);
+  }, [orders, searchResults, searchTerm, searchType, statusFilter, dateRange]);
 
   const fetchOrdersFromAPI = async () => {
     try {
@@ -89,7 +113,8 @@ const OrderList = () => {
       return;
     }
     
-    let filtered = [...orders];
+    // 有关键字时在服务端搜索结果上过滤，已归档的订单也能搜到
+    let filtered = [...(searchResults || orders)];
     
     // 按状态过滤
     if (statusFilter !== 'all') {
@@ -507,7 +532,10 @@ const OrderList = () => {
                           {order.user?.username || '未知用户'}
                         </small>
                       </td>
-                      <td>{getStatusBadge(order.status)}</td>
+                      <td>
+                        {getStatusBadge(order.status)}
+                        {order.archived && <span className="badge bg-light text-dark ms-1">已归档</span>}
+                      </td>
                       <td>
                         <small className="text-muted">
                           {order.created_at ? new Date(order.created_at).toLocaleDateString('zh-CN') : '-'}
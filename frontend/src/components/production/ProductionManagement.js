@@ -2,6 +2,7 @@ import React, { useState, useEffect, useContext } from 'react';
 import { Link } from 'react-router-dom';
 import { AuthContext } from '../../context/AuthContext';
 import api from '../../utils/api';
+import { appendUpload } from '../../utils/fileTransfer';
 
 const ProductionManagement = () => {
   const { user } = useContext(AuthContext);
@@ -56,7 +57,7 @@ const ProductionManagement = () => {
       setIsUploading(true);
       
       const formData = new FormData();
-      formData.append('production_sheet', productionSheet);
+      await appendUpload(formData, 'production_sheet', productionSheet, uploadingOrder.id);
       formData.append('production_notes', productionNotes);
 
       await api.put(`/api/orders/${uploadingOrder.id}/upload-production-sheet/`, formData, {
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useContext } from 'react';
 import { Link } from 'react-router-dom';
 import { AuthContext } from '../../context/AuthContext';
 import api from '../../utils/api';
+import { appendUpload, openDirectDownload } from '../../utils/fileTransfer';
 
 const WarehouseControl = () => {
   const { user } = useContext(AuthContext);
@@ -75,10 +76,38 @@ const WarehouseControl = () => {
     }
   };
 
+  // 一次下载订单的下料单、生产面单和出库单（服务端打包成 ZIP）
+  const handleDownloadBundle = async (orderId, order_number) => {
+    try {
+      const response = await api.get(`/api/orders/${orderId}/bundle/`, {
+        responseType: 'blob',
+      });
+      const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/zip' }));
+      const link = document.createElement('a');
+      link.href = url;
+      link.setAttribute('download', `订单文件_${order_number}.zip`);
+      document.body.appendChild(link);
+      link.click();
+      setTimeout(() => {
+        document.body.removeChild(link);
+        window.URL.revokeObjectURL(url);
+      }, 100);
+    } catch (err) {
+      console.error('打包下载失败:', err);
+      alert('打包下载失败，请稍后重试');
+    }
+  };
+
   const handleDownloadOutboundFile = async (orderId, order_number) => {
     try {
         console.log(`开始下载 order_id: ${orderId}, order_number: ${order_number}...`);
-        
+
+        // 对象存储：浏览器直接从预签名地址下载。下面的 XHR 带 Authorization 头，
+        // 跟随 302 跳到跨域的预签名地址会被 CORS 拦截，只用于本地文件存储
+        if (await openDirectDownload(orderId, 'outbound_file')) {
+            return;
+        }
+
         const response = await api.get(`/api/orders/${orderId}/download/outbound_file/`, {
             responseType: 'blob',
         });
@@ -225,7 +254,7 @@ const WarehouseControl = () => {
       setIsProcessing(true);
       
       const formData = new FormData();
-      formData.append('outbound_file', outboundFile);
+      await appendUpload(formData, 'outbound_file', outboundFile, outboundingOrder.id);
       formData.append('outbound_notes', outboundNotes);
 
       await api.post(`/api/orders/${outboundingOrder.id}/outbound/`, formData, {
@@ -732,6 +761,14 @@ const WarehouseControl = () => {
                                     下载出库单
                                 </button>
                                 )}
+                                <button
+                                    className="btn btn-outline-secondary btn-sm"
+                                    title="下载该订单的全部文件"
+                                    onClick={() => handleDownloadBundle(order.id, order.order_number)}
+                                >
+                                    <i className="bi bi-file-earmark-zip me-1"></i>
+                                    打包下载
+                                </button>
                               </div>
                             </td>
                           </tr>
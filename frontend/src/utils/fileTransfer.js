@@ -0,0 +1,61 @@
+import axios from 'axios';
+import api from './api';
+
+// 对象存储直传：文件不经过 Django，浏览器直接 PUT 到预签名地址 / 从预签名地址下载。
+// 本地文件存储不支持直传时，接口返回 400，调用方回退到原来的表单上传和下载接口。
+
+const isUnsupported = (error) => error.response?.status === 400;
+
+// 把文件放进表单：能直传时先上传到对象存储，表单里只提交 <字段名>_upload 令牌；
+// 大小上限和令牌由提交接口核对，错误照常通过 err.response.data.error 返回
+export const appendUpload = async (formData, field, file, orderId = null) => {
+  let upload;
+  try {
+    const response = await api.post('/api/orders/uploads/', {
+      field,
+      filename: file.name,
+      ...(orderId ? { order_id: orderId } : {}),
+    });
+    upload = response.data;
+  } catch (err) {
+    if (isUnsupported(err)) {
+      // 不支持直传（或参数不被接受），按原方式随表单上传，由提交接口给出具体错误
+      formData.append(field, file);
+      return;
+    }
+    throw err;
+  }
+
+  // 预签名地址跨域，不能带 Authorization 头，也不经过 api 实例的拦截器
+  await axios({
+    method: upload.method,
+    url: upload.url,
+    data: file,
+    headers: upload.headers,
+  });
+  formData.append(`${field}_upload`, upload.upload);
+};
+
+// 下载订单文件：能直传时取预签名地址交给浏览器下载，返回 true；
+// 不支持时返回 false，调用方改用 /download/ 接口
+export const openDirectDownload = async (orderId, fileType) => {
+  let data;
+  try {
+    const response = await api.get(`/api/orders/${orderId}/download-url/${fileType}/`);
+    data = response.data;
+  } catch (err) {
+    if (isUnsupported(err)) {
+      return false;
+    }
+    throw err;
+  }
+
+  // 普通导航，不是 XHR，跨域地址不需要 CORS；文件名由预签名地址的 Content-Disposition 指定
+  const link = document.createElement('a');
+  link.href = data.url;
+  link.rel = 'noopener noreferrer';
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  return true;
+};